@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Alert Engine
+Event-sourced alert state machine, one instance per validator and condition
+(jailed, missed blocks rising, catching up, stuck height, ...).
+
+Every state change is an event. The current state is the fold of all
+events; a compact snapshot of it is kept in state.json, and the events are
+appended to a JSON-lines log (which starts with a snapshot after rotation,
+so the state can be rebuilt from the log alone).
+
+Per condition:
+  ok -> pending   condition observed, waiting for raise_after (minimum duration)
+  pending -> firing   held long enough, notify
+  firing -> clearing  condition gone, waiting for clear_after (hysteresis)
+  clearing -> firing  came back before clear_after: no new notification
+  clearing -> ok      stayed away long enough, notify resolution
+While firing: reminders every remind_every unless acknowledged, escalation
+to a higher level after escalate_after.
+
+Evaluation touches one small record per condition, O(1) per sample.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+LEVEL_RANK = {'HEALTHY': 0, 'WARNING': 1, 'ALERT': 2, 'FATAL': 3}
+
+PENDING = 'pending'
+FIRING = 'firing'
+CLEARING = 'clearing'
+
+# Record layout (a list, to keep state.json small)
+_PHASE, _SINCE, _MARK, _NOTIFIED, _REMINDERS, _ACKED, _LEVEL = range(7)
+
+DEFAULT_MAX_LOG_BYTES = 1024 * 1024
+
+
+class Rule(NamedTuple):
+    """How one condition is alerted on. Durations are in seconds."""
+    level: str
+    raise_after: float = 0       # must hold this long before firing
+    clear_after: float = 0       # must be gone this long before clearing
+    remind_every: float = 0      # reminder interval while firing (0 = never)
+    escalate_after: float = 0    # firing this long escalates (0 = never)
+    escalate_to: str = ''
+
+
+class Event(NamedTuple):
+    """One state change of a (validator, condition) alert"""
+    ts: float
+    validator: str
+    condition: str
+    kind: str   # pending, dropped, raised, escalated, reminder, acked, clearing, recovered, cleared
+    level: str
+
+
+# Events worth a notification
+NOTIFY_KINDS = ('raised', 'escalated', 'reminder')
+
+
+class AlertEngine:
+    """Alert state of all validators, backed by a snapshot dict and an event log"""
+
+    def __init__(self, snapshot: Dict[str, Any], rules: Mapping[str, Rule],
+                 log_path: Optional[Path] = None, max_log_bytes: int = DEFAULT_MAX_LOG_BYTES):
+        # snapshot: {validator: {condition: record}}, mutated in place
+        self.snapshot = snapshot
+        self.rules = rules
+        self.log_path = Path(log_path) if log_path else None
+        self.max_log_bytes = max_log_bytes
+        self._pending_events: List[Event] = []
+
+    # -------------------------------------------------------------------------
+    # Event sourcing
+    # -------------------------------------------------------------------------
+
+    def apply(self, event: Event) -> None:
+        """Fold one event into the snapshot"""
+        records = self.snapshot.setdefault(event.validator, {})
+        record = records.get(event.condition)
+        kind, ts = event.kind, event.ts
+
+        if kind == 'pending':
+            records[event.condition] = [PENDING, ts, 0, 0, 0, False, event.level]
+        elif kind == 'raised':
+            records[event.condition] = [FIRING, ts, 0, ts, 0, False, event.level]
+        elif record is None:
+            return
+        elif kind in ('dropped', 'cleared'):
+            del records[event.condition]
+            if not records:
+                del self.snapshot[event.validator]
+        elif kind == 'escalated':
+            record[_LEVEL] = event.level
+            record[_NOTIFIED] = ts
+            record[_REMINDERS] = 0
+            record[_ACKED] = False
+        elif kind == 'reminder':
+            record[_NOTIFIED] = ts
+            record[_REMINDERS] += 1
+        elif kind == 'acked':
+            record[_ACKED] = True
+        elif kind == 'clearing':
+            record[_PHASE] = CLEARING
+            record[_MARK] = ts
+        elif kind == 'recovered':
+            record[_PHASE] = FIRING
+            record[_MARK] = 0
+
+    def _emit(self, events: List[Event], ts: float, validator: str, condition: str,
+              kind: str, level: str) -> None:
+        event = Event(ts, validator, condition, kind, level)
+        self.apply(event)
+        self._pending_events.append(event)
+        events.append(event)
+
+    @classmethod
+    def replay(cls, log_path: Path, rules: Mapping[str, Rule]) -> 'AlertEngine':
+        """Rebuild the state from the event log (last snapshot plus later events)"""
+        engine = cls({}, rules, log_path)
+        path = Path(log_path)
+        if not path.exists():
+            return engine
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(item, dict) and 'snapshot' in item:
+                    engine.snapshot = item['snapshot']
+                elif isinstance(item, list) and len(item) == 5:
+                    engine.apply(Event(*item))
+        return engine
+
+    def flush(self) -> None:
+        """Append new events to the log; rotate it into a snapshot when too large"""
+        if not self.log_path or not self._pending_events:
+            self._pending_events = []
+            return
+        lines = ''.join(json.dumps(list(event), separators=(',', ':')) + '\n'
+                        for event in self._pending_events)
+        self._pending_events = []
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        size = self.log_path.stat().st_size if self.log_path.exists() else 0
+        if size + len(lines) > self.max_log_bytes:
+            # Start over with the folded state, older events are no longer needed
+            temp_file = self.log_path.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                f.write(json.dumps({'snapshot': self.snapshot}, separators=(',', ':')) + '\n')
+            os.replace(temp_file, self.log_path)
+            return
+        with open(self.log_path, 'a') as f:
+            f.write(lines)
+
+    # -------------------------------------------------------------------------
+    # Evaluation
+    # -------------------------------------------------------------------------
+
+    def evaluate(self, validator: str, observations: Mapping[str, bool], now: float) -> List[Event]:
+        """
+        Advance every condition of a validator by one sample.
+        Conditions missing from observations count as not observed.
+        """
+        events: List[Event] = []
+        records = self.snapshot.get(validator, {})
+        for condition, rule in self.rules.items():
+            active = bool(observations.get(condition, False))
+            record = records.get(condition)
+
+            if record is None:
+                if active:
+                    kind = 'raised' if rule.raise_after <= 0 else 'pending'
+                    self._emit(events, now, validator, condition, kind, rule.level)
+                continue
+
+            phase, since, mark, notified, _, acked, level = record
+            if phase == PENDING:
+                if not active:
+                    self._emit(events, now, validator, condition, 'dropped', level)
+                elif now - since >= rule.raise_after:
+                    self._emit(events, now, validator, condition, 'raised', level)
+            elif phase == FIRING:
+                if not active:
+                    kind = 'cleared' if rule.clear_after <= 0 else 'clearing'
+                    self._emit(events, now, validator, condition, kind, level)
+                elif (rule.escalate_after > 0 and rule.escalate_to
+                      and LEVEL_RANK[rule.escalate_to] > LEVEL_RANK[level]
+                      and now - since >= rule.escalate_after):
+                    self._emit(events, now, validator, condition, 'escalated', rule.escalate_to)
+                elif rule.remind_every > 0 and not acked and now - notified >= rule.remind_every:
+                    self._emit(events, now, validator, condition, 'reminder', level)
+            elif phase == CLEARING:
+                if active:
+                    self._emit(events, now, validator, condition, 'recovered', level)
+                elif now - mark >= rule.clear_after:
+                    self._emit(events, now, validator, condition, 'cleared', level)
+        return events
+
+    def acknowledge(self, validator: str, condition: Optional[str], now: float,
+                    fired_before: Optional[float] = None) -> List[Event]:
+        """
+        Stop reminders of a firing condition (all conditions if None) until
+        it clears. With fired_before, only conditions already firing at that
+        time are acknowledged.
+        """
+        events: List[Event] = []
+        for name, record in list(self.snapshot.get(validator, {}).items()):
+            if condition is not None and name != condition:
+                continue
+            if fired_before is not None and record[_SINCE] > fired_before:
+                continue
+            if record[_PHASE] != PENDING and not record[_ACKED]:
+                self._emit(events, now, validator, name, 'acked', record[_LEVEL])
+        return events
+
+    # -------------------------------------------------------------------------
+    # Queries
+    # -------------------------------------------------------------------------
+
+    def active(self, validator: str) -> Dict[str, str]:
+        """Firing (or clearing) conditions of a validator -> level"""
+        return {
+            condition: record[_LEVEL]
+            for condition, record in self.snapshot.get(validator, {}).items()
+            if record[_PHASE] != PENDING
+        }
+
+    def level(self, validator: str) -> str:
+        """Highest level among the validator's firing conditions, HEALTHY if none"""
+        return max(self.active(validator).values(), key=LEVEL_RANK.__getitem__, default='HEALTHY')
+
+    def reminders(self, validator: str, condition: str) -> int:
+        """Reminders sent since the condition fired (or last escalated)"""
+        record = self.snapshot.get(validator, {}).get(condition)
+        return record[_REMINDERS] if record else 0
+
+    def firing_since(self, validator: str, condition: str) -> Optional[float]:
+        """When a condition started firing"""
+        record = self.snapshot.get(validator, {}).get(condition)
+        if record is None or record[_PHASE] == PENDING:
+            return None
+        return record[_SINCE]
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark chain response decoding: plain json.loads + full dicts (previous
+code path) vs fast_json projections (current code path).
+
+Usage: python bench_decode.py [delegations_count] [validators_count]
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+import fast_json
+from monitor import parse_delegated_balance, parse_validator_info, CONFIG
+
+DENOM = CONFIG.denom
+
+
+def make_delegations(count: int) -> str:
+    """delegation_responses fixture shaped like `query staking delegations`"""
+    return json.dumps({
+        'delegation_responses': [
+            {
+                'delegation': {
+                    'delegator_address': f"republic1delegator{i:020d}",
+                    'validator_address': f"republicvaloper1validator{i % 100:016d}",
+                    'shares': f"{i * 1000}.000000000000000000",
+                },
+                'balance': {'denom': DENOM, 'amount': str(i * 10 ** 15)},
+            }
+            for i in range(count)
+        ],
+        'pagination': {'next_key': None, 'total': str(count)},
+    }, indent=2)
+
+
+def make_validator() -> str:
+    """Single validator fixture shaped like `query staking validator`"""
+    return json.dumps({'validator': {
+        'operator_address': 'republicvaloper1xxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxxx',
+        'consensus_pubkey': {'@type': '/cosmos.crypto.ed25519.PubKey', 'key': 'A' * 43 + '='},
+        'jailed': False,
+        'status': 'BOND_STATUS_BONDED',
+        'tokens': '1000000000000000000000',
+        'delegator_shares': '1000000000000000000000.000000000000000000',
+        'description': {'moniker': 'bench', 'details': 'x' * 2000, 'website': 'https://example.com'},
+        'unbonding_height': '0',
+        'commission': {'commission_rates': {'rate': '0.1', 'max_rate': '0.2', 'max_change_rate': '0.01'}},
+        'min_self_delegation': '1',
+    }}, indent=2)
+
+
+def make_validators(count: int) -> str:
+    """Validator set fixture shaped like `query staking validators`"""
+    validator = json.loads(make_validator())['validator']
+    return json.dumps({'validators': [dict(validator, operator_address=f"republicvaloper1v{i:030d}")
+                                      for i in range(count)],
+                       'pagination': {'total': str(count)}}, indent=2)
+
+
+def old_delegated(text: str) -> int:
+    """Previous get_delegated_balance() parsing"""
+    result = json.loads(text)
+    total = 0
+    for delegation in result.get('delegation_responses', []):
+        balance = delegation.get('balance', {})
+        if isinstance(balance, dict) and balance.get('denom') == DENOM:
+            total += int(balance.get('amount', '0'))
+    return total
+
+
+def old_validator(text: str) -> dict:
+    """Previous get_validator_info() parsing (merged the whole validator dict)"""
+    data = json.loads(text)
+    validator_data = data.get('validator', data)
+    return {
+        'status': validator_data.get('status'),
+        'jailed': validator_data.get('jailed', False),
+        'moniker': validator_data.get('description', {}).get('moniker', 'Unknown'),
+        **validator_data
+    }
+
+
+def old_validators(text: str) -> list:
+    """Full parse of a validator set"""
+    return [v.get('status') for v in json.loads(text)['validators']]
+
+
+def new_validators(text: str) -> list:
+    """Projected parse of a validator set"""
+    return [v.get('status') for v in fast_json.decode('validators', text)['validators']]
+
+
+def measure(func, arg, repeat: int = 5):
+    """Best wall time (ms) and peak traced memory (MB)"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(arg)
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    result = func(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024 / 1024, result
+
+
+def main():
+    delegations_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    validators_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    fixtures = [
+        ('validator', make_validator(),
+         old_validator, lambda t: parse_validator_info(fast_json.decode('validator', t))),
+        (f"delegations x{delegations_count}", make_delegations(delegations_count),
+         old_delegated, lambda t: parse_delegated_balance(fast_json.decode('delegations', t))),
+        (f"validators x{validators_count}", make_validators(validators_count),
+         old_validators, new_validators),
+    ]
+
+    print(f"orjson: {'yes' if fast_json.HAVE_ORJSON else 'no (stdlib json, streaming above '}"
+          f"{'' if fast_json.HAVE_ORJSON else str(fast_json.STREAM_THRESHOLD // 1024) + ' KiB)'}")
+    print(f"{'fixture':24} {'size':>9} {'old ms':>9} {'new ms':>9} {'old MB':>8} {'new MB':>8}")
+    for name, text, old, new in fixtures:
+        old_ms, old_mb, old_result = measure(old, text)
+        new_ms, new_mb, new_result = measure(new, text)
+        if name.startswith('delegations') and old_result != new_result:
+            print(f"MISMATCH in {name}: {old_result} != {new_result}")
+        print(f"{name:24} {len(text) / 1024 / 1024:8.2f}M {old_ms:9.1f} {new_ms:9.1f} {old_mb:8.1f} {new_mb:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,61 +4,92 @@ RAI Sentinel - Simple Telegram Bot
 Python 3.10+ required
 
 Simple mode:
-- Only responds to /status and /help
-- No buttons, keyboards, or charts
+- Responds to /status, /chart, /uptime, /ack, /mute, /silence and /help
+- No buttons or keyboards
 - Uses requests library only
+- Receives updates by long polling (default) or as a webhook
+  (BOT_MODE=webhook, local HTTP server behind a TLS reverse proxy)
 """
 
-import os
+import dataclasses
+import hmac
+import json
+import signal
 import sys
+import threading
 import time
 import subprocess
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Optional, Dict, Any
-from dotenv import load_dotenv
+from typing import Optional, Dict, Any, Iterator, Tuple
 
-# Load environment variables
-load_dotenv()
+import config
+import event_log
+import silences
+import traffic
+from bot_state import BotState
+from records import CHART_METRICS
 
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 
-# Required environment variables
-REQUIRED_VARS = {
-    'TG_TOKEN': os.getenv('TG_TOKEN'),
-    'TG_CHAT_ID': os.getenv('TG_CHAT_ID'),
-}
+# All settings from .env and the environment (config.py); reloaded on SIGHUP
+try:
+    CONFIG = config.load()
+except config.ConfigError as e:
+    print(f"ERROR: Invalid configuration: {e}", file=sys.stderr)
+    sys.exit(1)
+REQUIRED_SETTINGS = ['tg_token', 'tg_chat_id']
+# Only read at startup: a reload keeps their running values
+RESTART_SETTINGS = ('bot_mode', 'webhook_listen', 'webhook_workers')
 
-# Optional
-BOT_POLL_TIMEOUT = int(os.getenv('BOT_POLL_TIMEOUT', '30'))
-BOT_COOLDOWN_SECONDS = int(os.getenv('BOT_COOLDOWN_SECONDS', '10'))
 MONITOR_SCRIPT = Path(__file__).parent / 'monitor.py'
-
-# Telegram API
-TG_API_BASE = f"https://api.telegram.org/bot{REQUIRED_VARS.get('TG_TOKEN', '')}"
-
-# State
-last_command_time = {}
-cooldown_per_chat = {}
-CLEANUP_INTERVAL = 3600  # Cleanup old entries every hour
-last_cleanup = 0
+# A replay writes to a scratch directory, shared with the monitor.py runs it starts
+HISTORY_DIR = traffic.replay_dir() if CONFIG.traffic_replay else MONITOR_SCRIPT.parent / 'history'
+SILENCES_FILE = HISTORY_DIR / 'silences.json'
+BOT_STATE_FILE = HISTORY_DIR / 'bot_state.json'
+EVENT_LOG_FILE = HISTORY_DIR / 'events.jsonl'
+WEBHOOK_MAX_BODY = 1024 * 1024
+# Seconds a monitor.py run gets for its own work; /status adds the time the
+# run may wait for a check already in progress (RUN_LOCK_TIMEOUT)
+MONITOR_RUN_SECONDS = 60
+
+# Telegram API: base URL with the token, and one keep-alive session for all
+# calls (replaced only when the URL or token changes)
+TG_API_BASE = f"{CONFIG.tg_api_url}/bot{CONFIG.tg_token}"
+telegram_session = requests.Session()
+
+# Traffic capture/replay (see traffic.py); monitor.py runs started by the bot
+# inherit these and record into / replay from the same archive
+TRAFFIC = traffic.open_traffic('bot', CONFIG.traffic_capture, CONFIG.traffic_replay,
+                               CONFIG.traffic_replay_speed)
+
+# Structured event log (event_log.py), shared with monitor.py; every update
+# gets a correlation ID that the monitor.py runs it starts inherit
+EVENTS = event_log.open_event_log('bot', EVENT_LOG_FILE, CONFIG.event_log_level, CONFIG.event_echo_level,
+                                  CONFIG.event_rate_limit)
+
+# State (offset, handled update IDs and cooldowns survive restarts)
+bot_state = BotState(BOT_STATE_FILE)
 
 
 # =============================================================================
 # VALIDATION
 # =============================================================================
 
-def validate_config() -> bool:
+def validate_config(cfg: config.Config) -> bool:
     """Validate required environment variables"""
-    missing = [var for var, value in REQUIRED_VARS.items() if not value]
+    missing = cfg.missing(REQUIRED_SETTINGS)
     if missing:
         print(f"ERROR: Missing required environment variables: {', '.join(missing)}", file=sys.stderr)
         return False
     
     # Validate Telegram token format
-    token = REQUIRED_VARS['TG_TOKEN']
+    token = cfg.tg_token
     if ':' not in token or len(token) < 20:
         print("ERROR: Invalid Telegram token format", file=sys.stderr)
         return False
@@ -68,16 +99,28 @@ def validate_config() -> bool:
         print(f"ERROR: Monitor script not found: {MONITOR_SCRIPT}", file=sys.stderr)
         return False
     
+    if cfg.bot_mode == 'webhook':
+        # Telegram allows 1-256 characters A-Z, a-z, 0-9, _ and -
+        secret_ok = 0 < len(cfg.webhook_secret) <= 256 and all(
+            ch.isascii() and (ch.isalnum() or ch in '_-') for ch in cfg.webhook_secret
+        )
+        if not secret_ok:
+            print("ERROR: WEBHOOK_SECRET (1-256 chars of A-Z, a-z, 0-9, _ and -) is required in webhook mode",
+                  file=sys.stderr)
+            return False
+        if not cfg.webhook_path.startswith('/'):
+            print("ERROR: WEBHOOK_PATH must start with /", file=sys.stderr)
+            return False
+    
     return True
 
 
 def test_telegram_api() -> bool:
     """Test Telegram API connectivity"""
     try:
-        url = f"{TG_API_BASE}/getMe"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
+        status, data = telegram_api('getMe', 10)
+        if status >= 400:
+            raise RuntimeError(f"HTTP {status}: {data.get('description', '')}")
         if data.get('ok'):
             bot_info = data.get('result', {})
             print(f"Bot connected: @{bot_info.get('username', 'unknown')}")
@@ -92,51 +135,99 @@ def test_telegram_api() -> bool:
 # TELEGRAM API
 # =============================================================================
 
+def telegram_api(method: str, timeout: float, **kwargs) -> Tuple[int, Dict[str, Any]]:
+    """
+    POST to a Bot API method (kwargs as for requests.post).
+    Returns (HTTP status, decoded reply); captured/replayed as one call.
+    """
+    def post():
+        response = telegram_session.post(f"{TG_API_BASE}/{method}", timeout=timeout, **kwargs)
+        try:
+            reply = response.json()
+        except ValueError:
+            reply = {}
+        return [response.status_code, reply]
+    
+    status, reply = TRAFFIC.call('telegram', method, post, request=kwargs.get('json') or kwargs.get('data'))
+    return status, reply
+
+
+def telegram_call(method: str, timeout: float, **kwargs) -> Dict[str, Any]:
+    """telegram_api() that raises on HTTP errors"""
+    status, reply = telegram_api(method, timeout, **kwargs)
+    if status >= 400:
+        raise RuntimeError(f"HTTP {status}: {reply.get('description', '')}")
+    return reply
+
 def send_message(chat_id: str, text: str) -> bool:
     """Send message to Telegram chat"""
     try:
-        url = f"{TG_API_BASE}/sendMessage"
         payload = {
             'chat_id': chat_id,
             'text': text
         }
-        response = requests.post(url, json=payload, timeout=10)
-        response.raise_for_status()
+        telegram_call('sendMessage', 10, json=payload)
         return True
     except Exception as e:
-        print(f"ERROR: Failed to send message: {e}", file=sys.stderr)
+        EVENTS.error("Failed to send message", error=str(e))
         return False
 
 
 def get_updates(offset: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """Get updates from Telegram"""
     try:
-        url = f"{TG_API_BASE}/getUpdates"
         params = {
-            'timeout': BOT_POLL_TIMEOUT,
+            'timeout': CONFIG.bot_poll_timeout,
             'allowed_updates': ['message']
         }
         if offset:
             params['offset'] = offset
         
-        response = requests.get(url, params=params, timeout=BOT_POLL_TIMEOUT + 5)
-        response.raise_for_status()
-        return response.json()
+        return telegram_call('getUpdates', CONFIG.bot_poll_timeout + 5, json=params)
     except Exception as e:
-        print(f"ERROR: Failed to get updates: {e}", file=sys.stderr)
+        EVENTS.error("Failed to get updates", error=str(e))
         return None
 
 
+def set_webhook(url: str) -> bool:
+    """Register the webhook URL (with secret token) at Telegram"""
+    try:
+        payload = {
+            'url': url,
+            'secret_token': CONFIG.webhook_secret,
+            'allowed_updates': ['message'],
+            'max_connections': CONFIG.webhook_workers,
+        }
+        return bool(telegram_call('setWebhook', 10, json=payload).get('ok'))
+    except Exception as e:
+        EVENTS.error("Failed to set webhook", error=str(e))
+        return False
+
+
+def delete_webhook() -> bool:
+    """Remove a registered webhook; getUpdates is refused while one is set"""
+    try:
+        return bool(telegram_call('deleteWebhook', 10, json={}).get('ok'))
+    except Exception as e:
+        EVENTS.error("Failed to delete webhook", error=str(e))
+        return False
+
+
 # =============================================================================
 # COMMAND HANDLERS
 # =============================================================================
 
 def handle_help(chat_id: str) -> None:
     """Handle /help command"""
-    message = """🤖 RAI Sentinel Bot
+    message = f"""🤖 RAI Sentinel Bot
 
 Commands:
 /status - Run validator monitor and get current status
+/chart <metric> <window> - Chart history (metrics: {', '.join(CHART_METRICS)}; window: 1h..90d)
+/uptime [window] - Signing uptime report (window: 1d..90d or all, default 30d)
+/ack [condition|all] [valoper] - Stop reminders of firing alerts until they clear
+/mute <condition|all> <duration> [valoper] - Mute alerts, e.g. /mute missed_rising 2h
+/silence [duration|off] - Maintenance window for all alerts, or list active silences
 /help   - Show this help message
 
 The bot monitors your RAI validator and sends alerts via Telegram.
@@ -146,42 +237,20 @@ For status updates, use /status command."""
     send_message(chat_id, message)
 
 
-def cleanup_old_entries():
-    """Clean up old entries from last_command_time to prevent memory leak"""
-    global last_cleanup, last_command_time
-    current_time = time.time()
-    
-    # Only cleanup once per hour
-    if current_time - last_cleanup < CLEANUP_INTERVAL:
-        return
-    
-    # Remove entries older than 24 hours
-    cutoff_time = current_time - 86400  # 24 hours
-    old_keys = [k for k, v in last_command_time.items() if v < cutoff_time]
-    for k in old_keys:
-        del last_command_time[k]
-    
-    last_cleanup = current_time
+def check_cooldown(chat_id: str) -> bool:
+    """Check and update per-chat cooldown. Returns False if still cooling down."""
+    remaining = bot_state.try_command(chat_id, CONFIG.bot_cooldown_seconds)
+    if remaining <= 0:
+        return True
+    send_message(chat_id, f"⏳ Please wait {int(remaining)} seconds before requesting again.")
+    return False
 
 
 def handle_status(chat_id: str) -> bool:
     """Handle /status command - run monitor.py --force"""
-    # Cleanup old entries periodically
-    cleanup_old_entries()
-    
     # Check cooldown
-    chat_id_int = int(chat_id) if chat_id.lstrip('-').isdigit() else hash(chat_id)
-    current_time = time.time()
-    
-    if chat_id_int in last_command_time:
-        time_since = current_time - last_command_time[chat_id_int]
-        if time_since < BOT_COOLDOWN_SECONDS:
-            remaining = int(BOT_COOLDOWN_SECONDS - time_since)
-            send_message(chat_id, f"⏳ Please wait {remaining} seconds before requesting status again.")
-            return False
-    
-    # Update last command time
-    last_command_time[chat_id_int] = current_time
+    if not check_cooldown(chat_id):
+        return False
     
     # Send acknowledgment
     send_message(chat_id, "🔄 Running validator check... Please wait.")
@@ -193,8 +262,9 @@ def handle_status(chat_id: str) -> bool:
             cmd,
             capture_output=True,
             text=True,
-            timeout=60,
-            cwd=str(MONITOR_SCRIPT.parent)
+            timeout=CONFIG.run_lock_timeout + MONITOR_RUN_SECONDS,
+            cwd=str(MONITOR_SCRIPT.parent),
+            env=EVENTS.child_env()
         )
         
         if result.returncode == 0:
@@ -216,6 +286,166 @@ def handle_status(chat_id: str) -> bool:
     return True
 
 
+def handle_chart(chat_id: str, args: list) -> bool:
+    """
+    Handle /chart <metric> <window> - monitor.py --chart renders and uploads
+    it, re-sending images uploaded before (to any chat) by their file_id
+    """
+    if len(args) < 2:
+        send_message(chat_id, "Usage: /chart <metric> <window>\nExample: /chart rewards 7d")
+        return False
+    
+    if not check_cooldown(chat_id):
+        return False
+    
+    metric, window = args[0].lower(), args[1].lower()
+    try:
+        cmd = [sys.executable, str(MONITOR_SCRIPT), '--chart', metric, window, '--send', '--chat', chat_id]
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=MONITOR_RUN_SECONDS,
+            cwd=str(MONITOR_SCRIPT.parent),
+            env=EVENTS.child_env()
+        )
+        
+        if result.returncode != 0:
+            error_msg = result.stderr.strip()[:500] if result.stderr else "Unknown error"
+            send_message(chat_id, f"❌ Chart failed:\n{error_msg}")
+            return False
+        return True
+        
+    except subprocess.TimeoutExpired:
+        send_message(chat_id, "⏱️ Chart rendering timed out. Please try again later.")
+        return False
+    except Exception as e:
+        send_message(chat_id, f"❌ Error rendering chart: {str(e)[:200]}")
+        return False
+
+
+def handle_uptime(chat_id: str, args: list) -> bool:
+    """Handle /uptime [window] - report via monitor.py --uptime"""
+    if not check_cooldown(chat_id):
+        return False
+    
+    cmd = [sys.executable, str(MONITOR_SCRIPT), '--uptime']
+    if args:
+        cmd.append(args[0].lower())
+    try:
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=MONITOR_RUN_SECONDS,
+            cwd=str(MONITOR_SCRIPT.parent),
+            env=EVENTS.child_env()
+        )
+        
+        if result.returncode != 0:
+            error_msg = result.stderr.strip()[:500] if result.stderr else "Unknown error"
+            send_message(chat_id, f"❌ Uptime report failed:\n{error_msg}")
+            return False
+        return send_message(chat_id, result.stdout.strip()[:4000])
+        
+    except subprocess.TimeoutExpired:
+        send_message(chat_id, "⏱️ Uptime report timed out. Please try again later.")
+        return False
+    except Exception as e:
+        send_message(chat_id, f"❌ Error building uptime report: {str(e)[:200]}")
+        return False
+
+
+def is_authorized(chat_id: str) -> bool:
+    """Only the configured alert chat may change alert state"""
+    if chat_id == CONFIG.tg_chat_id:
+        return True
+    send_message(chat_id, "⛔ This command is only available in the alert chat.")
+    return False
+
+
+def parse_condition(chat_id: str, name: str) -> Optional[str]:
+    """Validate a condition argument ('all' -> '*')"""
+    name = name.lower()
+    if name in ('all', silences.ANY):
+        return silences.ANY
+    if name in silences.CONDITIONS:
+        return name
+    send_message(chat_id, f"❓ Unknown condition: {name}\nConditions: {', '.join(silences.CONDITIONS)}, all")
+    return None
+
+
+def format_silence(entry: Dict[str, Any]) -> str:
+    """One line describing a silence window"""
+    remaining = max(0, int(entry['until'] - time.time()))
+    hours, rest = divmod(remaining, 3600)
+    condition = 'all alerts' if entry['condition'] == silences.ANY else entry['condition']
+    validator = '' if entry['validator'] == silences.ANY else f" of {entry['validator']}"
+    return f"#{entry['id']} {condition}{validator} — {hours}h {rest // 60}m left"
+
+
+def handle_ack(chat_id: str, args: list) -> bool:
+    """Handle /ack [condition|all] [valoper] - acknowledged on the next monitor run"""
+    if not is_authorized(chat_id):
+        return False
+    condition = parse_condition(chat_id, args[0]) if args else silences.ANY
+    if condition is None:
+        return False
+    validator = args[1] if len(args) > 1 else silences.ANY
+    silences.add_ack(SILENCES_FILE, condition, validator, by=chat_id)
+    target = 'all alerts' if condition == silences.ANY else condition
+    send_message(chat_id, f"👍 Acknowledged {target}. Reminders stop until the condition clears.")
+    return True
+
+
+def handle_mute(chat_id: str, args: list) -> bool:
+    """Handle /mute <condition|all> <duration> [valoper]"""
+    if not is_authorized(chat_id):
+        return False
+    if len(args) < 2:
+        send_message(chat_id, "Usage: /mute <condition|all> <duration> [valoper]\nExample: /mute missed_rising 2h")
+        return False
+    condition = parse_condition(chat_id, args[0])
+    if condition is None:
+        return False
+    seconds = silences.parse_duration(args[1])
+    if seconds is None:
+        send_message(chat_id, "❌ Duration must be like 30m, 2h or 1d (max 30d)")
+        return False
+    validator = args[2] if len(args) > 2 else silences.ANY
+    entry = silences.add_silence(SILENCES_FILE, seconds, condition, validator, by=chat_id)
+    send_message(chat_id, f"🔇 Muted: {format_silence(entry)}")
+    return True
+
+
+def handle_silence(chat_id: str, args: list) -> bool:
+    """Handle /silence (list), /silence <duration> (all alerts), /silence off [id]"""
+    if not args:
+        entries = silences.active(silences.load(SILENCES_FILE))
+        if not entries:
+            send_message(chat_id, "🔔 No active silences.")
+        else:
+            send_message(chat_id, "🔇 Active silences:\n" + '\n'.join(format_silence(entry) for entry in entries))
+        return True
+    
+    if not is_authorized(chat_id):
+        return False
+    
+    if args[0].lower() == 'off':
+        silence_id = int(args[1].lstrip('#')) if len(args) > 1 and args[1].lstrip('#').isdigit() else None
+        removed = silences.clear_silences(SILENCES_FILE, silence_id)
+        send_message(chat_id, f"🔔 Removed {removed} silence(s).")
+        return True
+    
+    seconds = silences.parse_duration(args[0])
+    if seconds is None:
+        send_message(chat_id, "Usage: /silence [duration|off [id]]\nExample: /silence 1h")
+        return False
+    entry = silences.add_silence(SILENCES_FILE, seconds, by=chat_id)
+    send_message(chat_id, f"🔇 Maintenance window: {format_silence(entry)}. Heartbeats are paused too.")
+    return True
+
+
 def handle_unknown_command(chat_id: str, command: str) -> None:
     """Handle unknown commands"""
     message = f"❓ Unknown command: {command}\n\nUse /help to see available commands."
@@ -245,18 +475,256 @@ def process_message(message: Dict[str, Any]) -> None:
         handle_help(chat_id)
     elif command == '/status':
         handle_status(chat_id)
+    elif command == '/chart':
+        handle_chart(chat_id, parts[1:])
+    elif command == '/uptime':
+        handle_uptime(chat_id, parts[1:])
+    elif command == '/ack':
+        handle_ack(chat_id, parts[1:])
+    elif command == '/mute':
+        handle_mute(chat_id, parts[1:])
+    elif command == '/silence':
+        handle_silence(chat_id, parts[1:])
     else:
         handle_unknown_command(chat_id, command)
 
 
+def handle_update(update: Dict[str, Any]) -> None:
+    """Process an update unless its command is too old to still matter"""
+    message = update.get('message')
+    if not message:
+        return
+    
+    with EVENTS.bound(corr=event_log.new_correlation_id(), update=update.get('update_id')):
+        # After downtime or a crash loop, pending commands would all run at once.
+        # A replay judges the age at the recorded time.
+        age = TRAFFIC.now() - message.get('date', 0)
+        if age > CONFIG.bot_stale_seconds:
+            EVENTS.warning("Skipping stale update", age=int(age), text=message.get('text', '')[:50])
+            return
+        
+        started = time.monotonic()
+        process_message(message)
+        EVENTS.info("Update handled", text=message.get('text', '')[:50],
+                    seconds=round(time.monotonic() - started, 3))
+
+
+# =============================================================================
+# WEBHOOK
+# =============================================================================
+
+class WebhookDispatcher:
+    """Runs pushed updates on a bounded worker pool, each update_id at most once"""
+    
+    def __init__(self, state: BotState, workers: int):
+        self.state = state
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='update')
+        # Running plus queued updates; beyond that Telegram is asked to retry later
+        self.capacity = workers * 2
+        self.slots = threading.BoundedSemaphore(self.capacity)
+        self.draining = threading.Event()
+    
+    def submit(self, update: Dict[str, Any]) -> int:
+        """Queue an update. Returns the HTTP status for Telegram."""
+        if self.draining.is_set() or not self.slots.acquire(blocking=False):
+            return 503
+        if not self.state.claim_update(update['update_id']):
+            # Redelivery of an update we already have
+            self.slots.release()
+            return 200
+        self.state.save()
+        self.pool.submit(self._run, update)
+        return 200
+    
+    def _run(self, update: Dict[str, Any]) -> None:
+        try:
+            handle_update(update)
+            self.state.save()
+        except Exception as e:
+            EVENTS.error("Failed to handle update", update=update.get('update_id'), error=str(e))
+        finally:
+            self.slots.release()
+    
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """Wait for the running and queued updates; new ones get 503 until the block ends"""
+        self.draining.set()
+        for _ in range(self.capacity):
+            self.slots.acquire()
+        try:
+            yield
+        finally:
+            for _ in range(self.capacity):
+                self.slots.release()
+            self.draining.clear()
+    
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """Webhook server that applies a SIGHUP reload between dispatches"""
+    
+    daemon_threads = True
+    reloader: Optional[threading.Thread] = None
+    
+    def service_actions(self) -> None:
+        # Called by serve_forever in the main thread about twice a second.
+        # The reload waits for the pool on its own thread, so this thread
+        # keeps accepting and new updates are answered 503 meanwhile.
+        if config.reload_requested() and not (self.reloader and self.reloader.is_alive()):
+            self.reloader = threading.Thread(target=self._reload, name='reload', daemon=True)
+            self.reloader.start()
+    
+    def _reload(self) -> None:
+        with self.dispatcher.paused():
+            config.apply_reload(reload_config)
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """Accepts updates POSTed by Telegram; answers fast, handling runs on the pool"""
+    
+    server_version = 'RAISentinel'
+    
+    def do_POST(self):
+        if self.path.split('?', 1)[0] != CONFIG.webhook_path:
+            return self._reply(404)
+        
+        secret = self.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+        if not hmac.compare_digest(secret.encode(), CONFIG.webhook_secret.encode()):
+            return self._reply(403)
+        
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            return self._reply(411)
+        if length > WEBHOOK_MAX_BODY:
+            return self._reply(413)
+        
+        try:
+            update = json.loads(self.rfile.read(length))
+        except ValueError:
+            return self._reply(400)
+        if not isinstance(update, dict) or not isinstance(update.get('update_id'), int):
+            return self._reply(400)
+        
+        self._reply(self.server.dispatcher.submit(update))
+    
+    def do_GET(self):
+        self._reply(405)
+    
+    def _reply(self, code: int) -> None:
+        self.send_response(code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+    
+    def log_message(self, format, *args):
+        # Telegram posts every update; keep the journal quiet
+        pass
+
+
+def run_webhook() -> None:
+    """Serve the webhook until interrupted"""
+    host, _, port = CONFIG.webhook_listen.rpartition(':')
+    server = WebhookServer((host or '127.0.0.1', int(port)), WebhookHandler)
+    server.dispatcher = WebhookDispatcher(bot_state, CONFIG.webhook_workers)
+    
+    if CONFIG.webhook_url and not set_webhook(CONFIG.webhook_url):
+        print("Webhook registration failed. Exiting.", file=sys.stderr)
+        sys.exit(1)
+    
+    print(f"Webhook listening on http://{CONFIG.webhook_listen}{CONFIG.webhook_path} "
+          f"({CONFIG.webhook_workers} workers)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        server.dispatcher.shutdown()
+
+
 # =============================================================================
 # MAIN LOOP
 # =============================================================================
 
+def run_polling() -> None:
+    """Long-poll getUpdates until interrupted"""
+    # A webhook left over from webhook mode would make getUpdates fail
+    if not delete_webhook():
+        EVENTS.warning("Could not delete webhook, getUpdates may be refused")
+    
+    # A replay ends once every recorded getUpdates has been served
+    while not TRAFFIC.done:
+        # Updates are handled in this thread, so nothing uses the session here
+        config.apply_reload(reload_config)
+        
+        # Get updates, continuing from the persisted offset after a restart
+        updates = get_updates(bot_state.offset)
+        
+        if not updates or not updates.get('ok'):
+            time.sleep(5)
+            continue
+        
+        batch = updates.get('result', [])
+        
+        # Confirm the batch before handling it: a command that crashes the
+        # bot must not run again on every restart
+        for update in batch:
+            bot_state.advance_offset(update.get('update_id'))
+        bot_state.save()
+        
+        # Process updates
+        for update in batch:
+            if bot_state.claim_update(update.get('update_id')):
+                handle_update(update)
+        bot_state.save()
+        
+        # Small delay to prevent tight loop
+        time.sleep(0.1)
+
+
+def reload_config() -> None:
+    """
+    SIGHUP, applied between updates (top of the polling loop, or with the
+    webhook dispatcher idle): re-read .env and swap in the new config. The
+    Telegram session is kept unless the API URL or token changed; a changed
+    webhook secret or URL is registered again. Invalid settings keep the running config.
+    """
+    global CONFIG, TG_API_BASE, telegram_session, TRAFFIC
+    try:
+        new = config.load()
+    except config.ConfigError as e:
+        EVENTS.error("Config reload failed, keeping the running config", error=str(e))
+        return
+    if not validate_config(new):
+        EVENTS.error("Config reload failed, keeping the running config")
+        return
+    old = CONFIG
+    # Settings only read at startup keep their running values
+    pending = [name.upper() for name in RESTART_SETTINGS if config.changed(old, new, name)]
+    new = dataclasses.replace(new, **{name: getattr(old, name) for name in RESTART_SETTINGS})
+    
+    if config.changed(old, new, 'tg_api_url', 'tg_token'):
+        session, telegram_session = telegram_session, requests.Session()
+        TG_API_BASE = f"{new.tg_api_url}/bot{new.tg_token}"
+        session.close()
+    if config.changed(old, new, 'traffic_capture', 'traffic_replay', 'traffic_replay_speed'):
+        TRAFFIC.flush()
+        TRAFFIC = traffic.open_traffic('bot', new.traffic_capture, new.traffic_replay, new.traffic_replay_speed)
+    if config.changed(old, new, 'event_log_level', 'event_echo_level', 'event_rate_limit'):
+        EVENTS.configure(new.event_log_level, new.event_echo_level, new.event_rate_limit)
+    
+    CONFIG = new
+    print(f"Config reloaded ({', '.join(config.diff(old, new)) or 'no changes'})")
+    if pending:
+        print(f"WARNING: Restart the bot to apply {', '.join(pending)}", file=sys.stderr)
+    if new.bot_mode == 'webhook' and new.webhook_url and config.changed(old, new, 'webhook_url', 'webhook_secret'):
+        set_webhook(new.webhook_url)
+
+
 def main():
     """Main bot loop"""
     # Validate configuration
-    if not validate_config():
+    if not validate_config(CONFIG):
         print("Configuration validation failed. Exiting.", file=sys.stderr)
         sys.exit(1)
     
@@ -265,38 +733,20 @@ def main():
         print("Telegram API test failed. Exiting.", file=sys.stderr)
         sys.exit(1)
     
-    print("Bot started. Listening for commands...")
-    print(f"Commands: /status, /help")
-    print(f"Cooldown: {BOT_COOLDOWN_SECONDS} seconds between /status commands")
+    config.install_reload()
+    # systemd stops the bot with SIGTERM: exit normally, so atexit writes
+    # out the buffered traffic capture and events
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Bot started ({CONFIG.bot_mode}). Listening for commands...")
+    print(f"Commands: /status, /chart, /uptime, /ack, /mute, /silence, /help")
+    print(f"Cooldown: {CONFIG.bot_cooldown_seconds} seconds between /status commands")
     print("Press Ctrl+C to stop")
     
-    last_update_id = None
-    
     try:
-        while True:
-            # Get updates
-            updates = get_updates(last_update_id)
-            
-            if not updates or not updates.get('ok'):
-                time.sleep(5)
-                continue
-            
-            # Process updates
-            for update in updates.get('result', []):
-                update_id = update.get('update_id')
-                
-                # Update offset
-                if last_update_id is None or update_id > last_update_id:
-                    last_update_id = update_id + 1
-                
-                # Process message
-                message = update.get('message')
-                if message:
-                    process_message(message)
-            
-            # Small delay to prevent tight loop
-            time.sleep(0.1)
-            
+        if CONFIG.bot_mode == 'webhook':
+            run_webhook()
+        else:
+            run_polling()
     except KeyboardInterrupt:
         print("\nBot stopped by user")
         sys.exit(0)
@@ -307,4 +757,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Bot State
+Small durable store for bot.py in history/bot_state.json, so a restart
+continues where the previous process stopped.
+
+- getUpdates offset: updates handled (or skipped) before a restart are not
+  fetched again
+- Most recent update IDs, so an update delivered twice (webhook retries,
+  restarts) is only handled once
+- Per-chat command cooldowns, so a restart does not reset the rate limit
+- Thread-safe; the file is only rewritten when something changed
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_SEEN = 1000
+COOLDOWN_TTL = 86400  # cooldown entries older than this are dropped
+
+
+class BotState:
+    """Persisted bot state"""
+
+    def __init__(self, path: Path, max_seen: int = DEFAULT_MAX_SEEN):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._offset: Optional[int] = None
+        self._seen_order: deque = deque(maxlen=max_seen)
+        self._seen: set = set()
+        self._cooldowns: Dict[str, float] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data.get('offset'), int):
+            self._offset = data['offset']
+        for update_id in data.get('seen_updates', []):
+            self._remember(int(update_id))
+        cutoff = time.time() - COOLDOWN_TTL
+        self._cooldowns = {
+            str(chat_id): float(ts) for chat_id, ts in data.get('cooldowns', {}).items() if ts > cutoff
+        }
+
+    def _remember(self, update_id: int) -> None:
+        if len(self._seen_order) == self._seen_order.maxlen:
+            self._seen.discard(self._seen_order[0])
+        self._seen_order.append(update_id)
+        self._seen.add(update_id)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        cutoff = time.time() - COOLDOWN_TTL
+        self._cooldowns = {chat_id: ts for chat_id, ts in self._cooldowns.items() if ts > cutoff}
+        return {
+            'offset': self._offset,
+            'seen_updates': list(self._seen_order),
+            'cooldowns': dict(self._cooldowns),
+        }
+
+    @property
+    def offset(self) -> Optional[int]:
+        """Next getUpdates offset, None before the first update"""
+        return self._offset
+
+    def advance_offset(self, update_id: int) -> None:
+        """Confirm an update (and all earlier ones)"""
+        with self._lock:
+            if self._offset is None or update_id >= self._offset:
+                self._offset = update_id + 1
+                self._dirty = True
+
+    def claim_update(self, update_id: int) -> bool:
+        """Mark an update as handled. False if it was handled before."""
+        with self._lock:
+            if update_id in self._seen:
+                return False
+            self._remember(update_id)
+            self._dirty = True
+        return True
+
+    def try_command(self, chat_id: str, cooldown: float, now: Optional[float] = None) -> float:
+        """
+        Rate limit per chat. Records the command and returns 0 if allowed,
+        otherwise the seconds left until the next command is allowed.
+        """
+        now = now if now is not None else time.time()
+        with self._lock:
+            elapsed = now - self._cooldowns.get(chat_id, 0)
+            if elapsed < cooldown:
+                return cooldown - elapsed
+            self._cooldowns[chat_id] = now
+            self._dirty = True
+        return 0
+
+    def save(self) -> None:
+        """Write the state file if anything changed since the last save"""
+        # Snapshot and write under one lock, so an older snapshot can never
+        # replace a newer one
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = self._snapshot()
+                self._dirty = False
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = self.path.with_suffix('.tmp')
+            with open(temp_file, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(temp_file, self.path)
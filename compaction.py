@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - History Compaction
+Rolls raw history.csv samples up into 5-minute, hourly and daily aggregates
+and enforces retention on raw data.
+
+The job is incremental: a checkpoint remembers the byte offset already
+processed in history.csv plus the still-open bucket of every tier, so each
+run only reads the rows appended since the previous run.
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+# Tier name -> (bucket seconds, retention days; 0 = keep forever)
+TIERS = {
+    '5m': (300, 14),
+    '1h': (3600, 365),
+    '1d': (86400, 0),
+}
+
+ROLLUP_FIELDS = [
+    'bucket', 'samples', 'height_last',
+    'missed_min', 'missed_max', 'missed_last', 'missed_delta',
+    'rewards_last', 'reward_accrual', 'balance_last', 'delegated_last',
+    'accrued_last',
+]
+
+CHECKPOINT_NAME = 'compaction.json'
+
+# Only rewrite a file for retention once it holds this much expired data,
+# so retention does not rewrite the file on every run
+RETENTION_SLACK_SECONDS = 86400
+
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _to_epoch(timestamp: str) -> float:
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _to_iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _to_int(value: Any) -> int:
+    try:
+        return int(str(value).split('.')[0])
+    except (ValueError, TypeError):
+        return 0
+
+
+def rollup_path(history_dir: Path, tier: str) -> Path:
+    """Path of the rollup CSV for a tier"""
+    return Path(history_dir) / f"rollup_{tier}.csv"
+
+
+def read_header(path: Path) -> List[str]:
+    """Column names of a CSV file (reads the first line only)"""
+    with open(path, 'r', newline='') as f:
+        return next(csv.reader([f.readline()]), [])
+
+
+def _load_checkpoint(path: Path) -> Dict[str, Any]:
+    try:
+        if path.exists():
+            with open(path, 'r') as f:
+                return json.load(f)
+    except Exception:
+        pass
+    return {}
+
+
+def _save_checkpoint(path: Path, checkpoint: Dict[str, Any]) -> None:
+    temp_file = path.with_suffix('.tmp')
+    with open(temp_file, 'w') as f:
+        json.dump(checkpoint, f)
+    shutil.move(str(temp_file), str(path))
+
+
+def _new_bucket(start: float, sample: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        'start': start,
+        'samples': 0,
+        'height_last': 0,
+        'missed_min': sample['missed'],
+        'missed_max': sample['missed'],
+        'missed_last': sample['missed'],
+        'missed_delta': 0,
+        'rewards_last': 0,
+        'reward_accrual': 0,
+        'balance_last': 0,
+        'delegated_last': 0,
+        'accrued_last': 0,
+    }
+
+
+def _bucket_row(bucket: Dict[str, Any]) -> List[Any]:
+    return [
+        _to_iso(bucket['start']), bucket['samples'], bucket['height_last'],
+        bucket['missed_min'], bucket['missed_max'], bucket['missed_last'], bucket['missed_delta'],
+        bucket['rewards_last'], bucket['reward_accrual'], bucket['balance_last'], bucket['delegated_last'],
+        bucket.get('accrued_last', 0),
+    ]
+
+
+def _last_bucket(path: Path) -> Optional[float]:
+    """Start of the last bucket in a rollup file (reads the tail only)"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 4096))
+        lines = f.read().splitlines()
+    for line in reversed(lines):
+        try:
+            return _to_epoch(line.split(b',', 1)[0].decode())
+        except ValueError:
+            continue  # header, or a line cut by the seek
+    return None
+
+
+def _append_rows(path: Path, rows: List[List[Any]]) -> None:
+    """
+    Append closed buckets. Buckets not newer than the file's last one are
+    skipped, so rows rolled up again after a crash (before the checkpoint
+    was saved) are not written twice.
+    """
+    file_exists = path.exists() and path.stat().st_size > 0
+    last = _last_bucket(path) if file_exists else None
+    if last is not None:
+        rows = [row for row in rows if _to_epoch(row[0]) > last]
+    if not rows:
+        return
+    if file_exists and read_header(path) != ROLLUP_FIELDS:
+        upgrade_header(path, ROLLUP_FIELDS)
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(ROLLUP_FIELDS)
+        writer.writerows(rows)
+
+
+def _first_row(path: Path) -> bytes:
+    """First data row of a CSV file (b'' if none)"""
+    with open(path, 'rb') as f:
+        f.readline()
+        return f.readline()
+
+
+def _retention_cut(path: Path, cutoff: float, offset: int = 0) -> int:
+    """
+    Bytes of rows (after the header) whose first column is older than
+    cutoff, 0 until there is RETENTION_SLACK_SECONDS worth of them. Only
+    the region before offset is eligible.
+    """
+    if not path.exists():
+        return 0
+
+    with open(path, 'rb') as f:
+        header = f.readline()
+        first = f.readline()
+        if not first:
+            return 0
+        try:
+            if _to_epoch(first.split(b',', 1)[0].decode()) >= cutoff - RETENTION_SLACK_SECONDS:
+                return 0
+        except ValueError:
+            return 0
+
+        f.seek(len(header))
+        removed = 0
+        limit = offset - len(header) if offset else None
+        while True:
+            line = f.readline()
+            if not line or (limit is not None and removed + len(line) > limit):
+                break
+            try:
+                if _to_epoch(line.split(b',', 1)[0].decode()) >= cutoff:
+                    break
+            except ValueError:
+                pass
+            removed += len(line)
+    return removed
+
+
+def _cut(path: Path, removed: int) -> None:
+    """Rewrite a CSV file without the first removed bytes after the header"""
+    temp_file = path.with_suffix('.compact.tmp')
+    with open(path, 'rb') as f, open(temp_file, 'wb') as out:
+        header = f.readline()
+        out.write(header)
+        f.seek(len(header) + removed)
+        shutil.copyfileobj(f, out)
+    os.replace(temp_file, path)
+
+
+def _drop_before(path: Path, cutoff: float, offset: int = 0) -> int:
+    """
+    Drop CSV rows whose first column is older than cutoff.
+    Only the region before offset is eligible. Returns bytes removed.
+    """
+    removed = _retention_cut(path, cutoff, offset)
+    if removed:
+        _cut(path, removed)
+    return removed
+
+
+def upgrade_header(csv_path: Path, fieldnames: List[str], history_dir: Optional[Path] = None) -> None:
+    """
+    Rewrite a CSV under a new header when columns were appended.
+    Existing rows are padded with empty values. For history.csv pass
+    history_dir, so the compaction checkpoint offset is moved to the same
+    row in the rewritten file.
+    """
+    csv_path = Path(csv_path)
+    checkpoint_file = Path(history_dir) / CHECKPOINT_NAME if history_dir else None
+    checkpoint = _load_checkpoint(checkpoint_file) if checkpoint_file else {}
+    old_offset = int(checkpoint.get('offset', 0))
+    new_offset = None
+
+    temp_file = csv_path.with_suffix('.upgrade.tmp')
+    with open(csv_path, 'rb') as f, open(temp_file, 'wb') as out:
+        old_header = f.readline()
+        old_count = len(next(csv.reader([old_header.decode()])))
+        padding = b',' * max(0, len(fieldnames) - old_count)
+        out.write(','.join(fieldnames).encode() + b'\r\n')
+        consumed = len(old_header)
+        for line in f:
+            if consumed == old_offset:
+                new_offset = out.tell()
+            consumed += len(line)
+            if line.endswith(b'\n'):
+                body = line.rstrip(b'\r\n')
+                out.write(body + padding + line[len(body):])
+            else:
+                out.write(line)
+        if consumed == old_offset:
+            new_offset = out.tell()
+
+    os.replace(temp_file, csv_path)
+    if checkpoint and new_offset is not None:
+        checkpoint['offset'] = new_offset
+        _save_checkpoint(checkpoint_file, checkpoint)
+
+
+# =============================================================================
+# COMPACTION
+# =============================================================================
+
+def compact(history_csv: Path, history_dir: Path, raw_retention_days: float,
+            now: Optional[float] = None) -> Dict[str, int]:
+    """
+    Roll new raw samples into every tier, then apply retention.
+    Returns per-tier count of buckets closed in this run.
+    """
+    history_csv = Path(history_csv)
+    history_dir = Path(history_dir)
+    checkpoint_file = history_dir / CHECKPOINT_NAME
+    checkpoint = _load_checkpoint(checkpoint_file)
+    closed_counts = {tier: 0 for tier in TIERS}
+
+    if not history_csv.exists():
+        return closed_counts
+
+    offset = int(checkpoint.get('offset', 0))
+    trim = checkpoint.pop('trim', None)
+    if trim and _first_row(history_csv).startswith(trim['first_row'].encode()):
+        # The previous run cut history.csv but stopped before saving the new offset
+        offset -= trim['bytes']
+    if offset > history_csv.stat().st_size:
+        # history.csv was replaced behind our back, start over
+        offset = 0
+        checkpoint = {}
+
+    open_buckets: Dict[str, Dict[str, Any]] = checkpoint.get('buckets', {})
+    prev = checkpoint.get('prev')
+
+    with open(history_csv, 'rb') as f:
+        header_line = f.readline()
+        if not header_line:
+            return closed_counts
+        fieldnames = next(csv.reader([header_line.decode()]))
+        if offset < len(header_line):
+            offset = len(header_line)
+        f.seek(offset)
+        data = f.read()
+
+    # Only consume complete lines, a concurrent writer may be mid-row
+    end = data.rfind(b'\n') + 1
+    if end == 0:
+        return closed_counts
+    chunk = data[:end]
+
+    closed_rows: Dict[str, List[List[Any]]] = {tier: [] for tier in TIERS}
+    for row in csv.DictReader(io.StringIO(chunk.decode()), fieldnames=fieldnames):
+        try:
+            ts = _to_epoch(row['timestamp'])
+        except (KeyError, ValueError, TypeError):
+            continue
+        sample = {
+            'height': _to_int(row.get('height')),
+            'missed': _to_int(row.get('missed_blocks')),
+            'rewards': _to_int(row.get('rewards')),
+            'balance': _to_int(row.get('balance')),
+            'delegated': _to_int(row.get('delegated')),
+            'accrued': _to_int(row.get('accrued')) if row.get('accrued') else None,
+        }
+        missed_delta = max(0, sample['missed'] - prev['missed']) if prev else 0
+        if prev and sample['accrued'] is not None and prev.get('accrued') is not None:
+            # Withdrawal-aware accrual from the rewards accounting stage
+            reward_delta = max(0, sample['accrued'] - prev['accrued'])
+        else:
+            reward_delta = max(0, sample['rewards'] - prev['rewards']) if prev else 0
+
+        for tier, (seconds, _) in TIERS.items():
+            start = ts - (ts % seconds)
+            bucket = open_buckets.get(tier)
+            if bucket and bucket['start'] != start:
+                closed_rows[tier].append(_bucket_row(bucket))
+                bucket = None
+            if not bucket:
+                bucket = _new_bucket(start, sample)
+                open_buckets[tier] = bucket
+            bucket['samples'] += 1
+            bucket['height_last'] = sample['height']
+            bucket['missed_min'] = min(bucket['missed_min'], sample['missed'])
+            bucket['missed_max'] = max(bucket['missed_max'], sample['missed'])
+            bucket['missed_last'] = sample['missed']
+            bucket['missed_delta'] += missed_delta
+            bucket['rewards_last'] = sample['rewards']
+            bucket['reward_accrual'] += reward_delta
+            bucket['balance_last'] = sample['balance']
+            bucket['delegated_last'] = sample['delegated']
+            bucket['accrued_last'] = sample['accrued'] or 0
+
+        prev = sample
+
+    # Rollup appends skip buckets already written, so a crash before the
+    # checkpoint is saved only means rolling the same rows up again
+    for tier, rows in closed_rows.items():
+        _append_rows(rollup_path(history_dir, tier), rows)
+        closed_counts[tier] = len(rows)
+
+    offset += end
+    checkpoint = {'offset': offset, 'buckets': open_buckets, 'prev': prev}
+
+    # Retention. The cut of history.csv is announced in the checkpoint
+    # first (with the row the file will then start with), so the offset is
+    # right whether or not a crash comes between the rewrite and the save.
+    now = now if now is not None else datetime.now(timezone.utc).timestamp()
+    removed = _retention_cut(history_csv, now - raw_retention_days * 86400, offset) if raw_retention_days > 0 else 0
+    if removed:
+        with open(history_csv, 'rb') as f:
+            f.seek(len(f.readline()) + removed)
+            first_row = f.readline()
+        _save_checkpoint(checkpoint_file, {**checkpoint, 'trim': {'bytes': removed, 'first_row': first_row.decode()}})
+        _cut(history_csv, removed)
+        checkpoint['offset'] -= removed
+    _save_checkpoint(checkpoint_file, checkpoint)
+
+    for tier, (_, retention_days) in TIERS.items():
+        if retention_days > 0:
+            _drop_before(rollup_path(history_dir, tier), now - retention_days * 86400)
+    return closed_counts
+
+
+def load_rollup(history_dir: Path, tier: str, since: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    Load rollup buckets of a tier (closed buckets plus the open one).
+    Values are ints, 'bucket' is a unix timestamp.
+    """
+    history_dir = Path(history_dir)
+    buckets = []
+    path = rollup_path(history_dir, tier)
+    if path.exists():
+        with open(path, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    start = _to_epoch(row['bucket'])
+                except (KeyError, ValueError):
+                    continue
+                if since is not None and start + TIERS[tier][0] <= since:
+                    continue
+                bucket = {name: _to_int(row.get(name)) for name in ROLLUP_FIELDS[1:]}
+                bucket['bucket'] = start
+                buckets.append(bucket)
+
+    open_bucket = _load_checkpoint(history_dir / CHECKPOINT_NAME).get('buckets', {}).get(tier)
+    if open_bucket and (since is None or open_bucket['start'] + TIERS[tier][0] > since):
+        bucket = {name: open_bucket.get(name, 0) for name in ROLLUP_FIELDS[1:]}
+        bucket['bucket'] = open_bucket['start']
+        buckets.append(bucket)
+
+    return buckets
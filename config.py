@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Configuration
+All settings of monitor.py and bot.py as one immutable, validated object,
+built from .env (next to the scripts) and the process environment (which
+wins).
+
+- Every field maps to the environment variable of the same name in upper
+  case; values are converted to the field's type once, here
+- Invalid values are reported together in one ConfigError instead of a
+  ValueError on the first bad line at import
+- Long-running processes reload on SIGHUP, at their next safe point: a
+  new Config is built and swapped in as a whole, so readers see either the
+  old or the new one. A reload with invalid values keeps the running config.
+
+The .env file is read directly and never copied into os.environ, so
+monitor.py runs started by the bot read the current file, not the one the
+bot saw at startup.
+"""
+
+import os
+import signal
+import threading
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from dotenv import dotenv_values
+
+ENV_FILE = Path(__file__).parent / '.env'
+
+# Environment of the process before anything else could change it
+_PROCESS_ENV = dict(os.environ)
+
+CHOICES = {
+    'query_backend': ('auto', 'grpc', 'cli'),
+    'bot_mode': ('polling', 'webhook'),
+    'tg_parse_mode': ('', 'MarkdownV2', 'HTML'),
+    'event_log_level': ('debug', 'info', 'warning', 'error', 'critical'),
+    'event_echo_level': ('debug', 'info', 'warning', 'error', 'critical'),
+}
+LOWERCASE = ('query_backend', 'bot_mode', 'event_log_level', 'event_echo_level')
+AT_LEAST_ONE = ('cli_workers', 'backfill_workers', 'webhook_workers', 'ring_capacity', 'digest_max_messages',
+                'fleet_workers', 'fleet_shard_size')
+NOT_NEGATIVE = ('decimals', 'heartbeat_hours', 'reward_drop_pct', 'stuck_minutes', 'alert_remind_hours',
+                'alert_clear_minutes', 'alert_min_minutes', 'alert_escalate_hours', 'disk_full_hours',
+                'disk_min_free_pct', 'run_lock_timeout', 'history_retention_days', 'backfill_rps',
+                'traffic_replay_speed', 'fleet_queue_timeout', 'event_rate_limit', 'bot_poll_timeout',
+                'bot_cooldown_seconds', 'bot_stale_seconds')
+
+
+class ConfigError(ValueError):
+    """One or more settings are invalid"""
+
+    def __init__(self, problems: List[str]):
+        super().__init__('; '.join(problems))
+        self.problems = problems
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Settings; field FOO_BAR is read from environment variable FOO_BAR"""
+    # Required (which ones depends on the script)
+    tg_token: str = ''
+    tg_chat_id: str = ''
+    valoper: str = ''
+    wallet: str = ''
+
+    # Chain and node
+    republic_home: Path = Path('/root/.republicd')
+    chain_id: str = ''
+    denom: str = 'arai'
+    decimals: int = 18
+    republicd_binary: str = 'republicd'
+    cli_workers: int = 4
+    rpc_url: str = 'http://localhost:26657'
+    lcd_url: str = 'http://localhost:1317'
+    grpc_url: str = 'localhost:9090'
+    query_backend: str = 'auto'  # auto (LCD, CLI fallback), grpc (gRPC, CLI fallback), cli
+    consaddr: str = ''  # republicvalcons1..., derived from the pubkey if empty
+    fleet_validators: str = ''  # more validators: comma separated valoper[:wallet]
+    fleet_workers: int = 1  # processes collecting fleet shards (1 = all in this process)
+    fleet_shard_size: int = 25  # most validators per shard
+    fleet_queue_dir: str = ''  # spool directory served by monitor.py --worker processes
+    fleet_queue_timeout: float = 60  # then unfinished shards run in the coordinator
+
+    # Alerting
+    heartbeat_hours: float = 3
+    reward_drop_pct: float = 5
+    stuck_minutes: int = 10
+    alert_remind_hours: float = 6
+    alert_clear_minutes: float = 30
+    alert_min_minutes: float = 5
+    alert_escalate_hours: float = 2
+    node_process: str = 'republicd'  # process probed in /proc ('' = off)
+    disk_full_hours: float = 48  # alert when the disk is predicted full sooner
+    disk_min_free_pct: float = 5  # or has less free space than this
+    digest_max_messages: int = 2  # most digest messages per heartbeat
+
+    # Display and Telegram
+    display_tz: str = 'Asia/Jakarta'
+    display_tz_label: str = ''
+    display_locale: str = 'en'
+    tg_parse_mode: str = ''  # '', MarkdownV2 or HTML
+    tg_api_url: str = 'https://api.telegram.org'
+
+    # History, runs, backfill
+    run_lock_timeout: float = 120  # wait for a run already in progress
+    ring_capacity: int = 2880
+    history_retention_days: float = 30
+    backfill_workers: int = 4
+    backfill_rps: float = 20  # /commit request cap, keeps the node responsive
+
+    # Event log (event_log.py)
+    event_log_level: str = 'info'  # lowest level written to history/events.jsonl
+    event_echo_level: str = 'error'  # and also printed to stderr
+    event_rate_limit: int = 5  # events per message and minute before sampling
+
+    # Traffic capture/replay (traffic.py)
+    traffic_capture: str = ''
+    traffic_replay: str = ''
+    traffic_replay_speed: float = 1
+
+    # Bot
+    bot_poll_timeout: int = 30
+    bot_cooldown_seconds: int = 10
+    bot_stale_seconds: int = 300  # older commands are skipped
+    bot_mode: str = 'polling'  # polling (getUpdates) or webhook (Telegram pushes)
+    webhook_listen: str = '127.0.0.1:8443'
+    webhook_path: str = '/telegram'
+    webhook_secret: str = ''
+    webhook_url: str = ''  # public URL; registered with setWebhook if set
+    webhook_workers: int = 4
+
+    def missing(self, names: List[str]) -> List[str]:
+        """Environment variable names of the given fields that are empty"""
+        return [name.upper() for name in names if not getattr(self, name)]
+
+    @classmethod
+    def from_env(cls, environ: Mapping[str, Optional[str]]) -> 'Config':
+        """Build from variables (unset or empty numbers keep their defaults)"""
+        values: Dict[str, Any] = {}
+        problems = []
+        for field in fields(cls):
+            raw = environ.get(field.name.upper())
+            if raw is None or (raw.strip() == '' and field.type in (int, float, Path)):
+                continue
+            try:
+                values[field.name] = field.type(raw.strip() if field.type in (int, float) else raw)
+            except ValueError:
+                problems.append(f"{field.name.upper()}={raw!r} is not a valid {field.type.__name__}")
+        for name in LOWERCASE:
+            if name in values:
+                values[name] = values[name].lower()
+        if 'tg_api_url' in values:
+            values['tg_api_url'] = values['tg_api_url'].rstrip('/')
+
+        config = cls(**values)
+        for name, choices in CHOICES.items():
+            if getattr(config, name) not in choices:
+                shown = ', '.join(repr(choice) if choice == '' else choice for choice in choices)
+                problems.append(f"{name.upper()} must be one of {shown}, got {getattr(config, name)!r}")
+        problems += [f"{name.upper()} must be at least 1" for name in AT_LEAST_ONE if getattr(config, name) < 1]
+        problems += [f"{name.upper()} must not be negative" for name in NOT_NEGATIVE if getattr(config, name) < 0]
+        if problems:
+            raise ConfigError(problems)
+        return config
+
+
+def read_env(env_file: Path = ENV_FILE) -> Dict[str, Optional[str]]:
+    """Variables from the .env file, overridden by the process environment"""
+    environ: Dict[str, Optional[str]] = {}
+    if env_file.exists():
+        environ.update(dotenv_values(env_file))
+    environ.update(_PROCESS_ENV)
+    return environ
+
+
+def load(env_file: Path = ENV_FILE) -> Config:
+    """Read and validate the current configuration (raises ConfigError)"""
+    return Config.from_env(read_env(env_file))
+
+
+def changed(old: Config, new: Config, *names: str) -> bool:
+    """True if any of the named fields differ"""
+    return any(getattr(old, name) != getattr(new, name) for name in names)
+
+
+def diff(old: Config, new: Config) -> List[str]:
+    """Environment variable names of all fields that differ"""
+    return [field.name.upper() for field in fields(Config) if changed(old, new, field.name)]
+
+
+_reload_requested = threading.Event()
+
+
+def install_reload() -> None:
+    """
+    On SIGHUP only note the request: the handler interrupts the main thread
+    anywhere (possibly holding a lock), so the reload itself runs later, at
+    a safe point of the process (apply_reload)
+    """
+    signal.signal(signal.SIGHUP, lambda signum, frame: _reload_requested.set())
+
+
+def reload_requested() -> bool:
+    return _reload_requested.is_set()
+
+
+def apply_reload(reload: Callable[[], None]) -> bool:
+    """Call reload() if a SIGHUP arrived since the last call. Returns whether it did."""
+    if not _reload_requested.is_set():
+        return False
+    _reload_requested.clear()
+    reload()
+    return True
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Message Digests
+Packs many already-rendered lines or messages into as few Telegram messages
+as possible, so the number of API calls per cycle does not grow with the
+fleet.
+
+- Lines are grouped into sections (e.g. one per severity); a section that
+  continues in the next message repeats its heading
+- No line or block is ever split across messages; text longer than the
+  limit on its own is cut
+- With max_messages set, the tail is dropped and replaced by an overflow
+  line ("… N more") so the digest never exceeds the cap
+"""
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+TELEGRAM_LIMIT = 4096
+
+Section = Tuple[str, Sequence[str]]
+
+
+def _cut(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 1] + '…'
+
+
+def pack_blocks(blocks: Sequence[str], limit: int = TELEGRAM_LIMIT, separator: str = '\n\n') -> List[str]:
+    """Concatenate whole blocks (e.g. full alert messages) into messages of at most limit chars"""
+    messages: List[str] = []
+    current = ''
+    for block in blocks:
+        block = _cut(block, limit)
+        if current and len(current) + len(separator) + len(block) > limit:
+            messages.append(current)
+            current = ''
+        current = f"{current}{separator}{block}" if current else block
+    if current:
+        messages.append(current)
+    return messages
+
+
+def _pack_sections(title: str, entries: Sequence[Tuple[str, str]], limit: int,
+                   footer: Optional[str] = None) -> List[str]:
+    messages: List[str] = []
+    lines: List[str] = [title] if title else []
+    size = len(title)
+    heading = None
+
+    def add(line: str) -> None:
+        nonlocal size
+        size += len(line) + (1 if lines else 0)
+        lines.append(line)
+
+    for section, line in entries:
+        line = _cut(line, limit // 2)
+        new_section = section != heading
+        block = ([''] if lines else []) + [section, line] if new_section else [line]
+        needed = sum(len(part) + 1 for part in block) - (0 if lines else 1)
+        if lines and size + needed > limit:
+            messages.append('\n'.join(lines))
+            lines, size = [], 0
+            block = [section, line]
+        for part in block:
+            add(part)
+        heading = section
+
+    if footer:
+        footer = _cut(footer, limit)
+        if lines and size + len(footer) + 1 > limit:
+            messages.append('\n'.join(lines))
+            lines, size = [], 0
+        add(footer)
+    if lines:
+        messages.append('\n'.join(lines))
+    return messages
+
+
+def pack_sections(sections: Sequence[Section], title: str = '', limit: int = TELEGRAM_LIMIT,
+                  max_messages: int = 0, overflow: Optional[Callable[[int], str]] = None) -> List[str]:
+    """
+    Pack (heading, lines) sections into messages of at most limit chars.
+    Empty sections are skipped. With max_messages > 0 the trailing lines
+    that do not fit are replaced by overflow(count_dropped).
+    """
+    entries = [(heading, line) for heading, lines in sections for line in lines]
+    messages = _pack_sections(title, entries, limit)
+    if not max_messages or len(messages) <= max_messages:
+        return messages
+
+    # Largest prefix of lines that still fits together with the overflow line
+    overflow = overflow or (lambda count: f"… {count} more")
+    low, high = 0, len(entries)
+    best = _pack_sections(title, [], limit, overflow(len(entries)))
+    while low <= high:
+        keep = (low + high) // 2
+        candidate = _pack_sections(title, entries[:keep], limit, overflow(len(entries) - keep))
+        if len(candidate) <= max_messages:
+            best = candidate
+            low = keep + 1
+        else:
+            high = keep - 1
+    return best
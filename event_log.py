@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Event Log
+Structured diagnostics of monitor.py and bot.py as JSON lines in
+history/events.jsonl, one event per line:
+
+    {"ts": 1760000000.123, "level": "error", "src": "monitor",
+     "corr": "3f9c1a2b7d4e", "msg": "RPC call failed", "endpoint": "/status", ...}
+
+- Logging a call only checks the level and the rate limit and queues a
+  dict; a background thread encodes and appends the queued events with one
+  write per batch, and echoes the serious ones to stderr (journald)
+- Repeated events (same message) are rate limited per message: after a
+  burst only one in SAMPLE_EVERY is written, and the next written event
+  carries the number dropped in between
+- Every event carries a correlation ID: one per monitor.py run, one per bot
+  update. monitor.py runs started by the bot inherit the update's ID
+  (RAI_CORRELATION_ID), so `grep <id> history/events.jsonl` shows a
+  command end to end.
+
+Usage:
+    python event_log.py history/events.jsonl [corr]    # human-readable view
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+LEVELS = {'debug': 10, 'info': 20, 'warning': 30, 'error': 40, 'critical': 50}
+
+CORRELATION_ENV = 'RAI_CORRELATION_ID'
+RATE_WINDOW = 60.0      # seconds per rate limit window
+SAMPLE_EVERY = 100      # beyond the limit, one in this many events is still written
+FLUSH_SECONDS = 1.0     # longest an event waits in the queue
+BATCH_EVENTS = 1000     # most events per write
+MAX_BYTES = 10 * 1024 * 1024  # then the file is rotated to <name>.1
+MAX_TRACKED = 1000      # distinct messages rate limited before the counters start over
+
+_bound: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar('event_log_bound', default={})
+_FLUSH = object()
+
+
+def new_correlation_id() -> str:
+    return secrets.token_hex(6)
+
+
+class EventLog:
+    """Leveled, rate-limited JSON lines log with a background writer"""
+
+    def __init__(self, path: Path, source: str, level: str = 'info', echo_level: str = 'error',
+                 rate_limit: int = 5):
+        self.path = Path(path)
+        self.source = source
+        self.correlation = os.environ.get(CORRELATION_ENV) or new_correlation_id()
+        self.configure(level, echo_level, rate_limit)
+        self._lock = threading.Lock()
+        self._rates: Dict[str, Tuple[float, int, int]] = {}  # msg -> (window start, written, dropped)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._flushed = threading.Condition()
+        self._pending = 0
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid = 0
+        atexit.register(self.flush)
+
+    def configure(self, level: str, echo_level: str, rate_limit: int) -> None:
+        """Apply (new) thresholds; rate_limit is events per message per minute"""
+        self.level = LEVELS[level]
+        self.echo_level = LEVELS[echo_level]
+        self.rate_limit = rate_limit
+
+    # -------------------------------------------------------------------------
+    # Logging
+    # -------------------------------------------------------------------------
+
+    def log(self, level: str, msg: str, /, **fields: Any) -> None:
+        """
+        Queue an event. Fields should be JSON-serializable (others are
+        stringified); ones named like a standard field are ignored.
+        """
+        if LEVELS[level] < self.level:
+            return
+        dropped = self._admit(msg)
+        if dropped is None:
+            return
+        event = {'ts': round(time.time(), 3), 'level': level, 'src': self.source,
+                 'corr': self.correlation, 'msg': msg}
+        event.update(_bound.get())
+        for key, value in fields.items():
+            event.setdefault(key, value)
+        if dropped:
+            event['dropped'] = dropped
+        self._enqueue(event)
+
+    def debug(self, msg: str, /, **fields: Any) -> None:
+        self.log('debug', msg, **fields)
+
+    def info(self, msg: str, /, **fields: Any) -> None:
+        self.log('info', msg, **fields)
+
+    def warning(self, msg: str, /, **fields: Any) -> None:
+        self.log('warning', msg, **fields)
+
+    def error(self, msg: str, /, **fields: Any) -> None:
+        self.log('error', msg, **fields)
+
+    def critical(self, msg: str, /, **fields: Any) -> None:
+        self.log('critical', msg, **fields)
+
+    def _admit(self, msg: str) -> Optional[int]:
+        """Rate limit per message: None to drop, else the count dropped before this one"""
+        now = time.monotonic()
+        with self._lock:
+            if msg not in self._rates and len(self._rates) >= MAX_TRACKED:
+                self._rates.clear()
+            start, written, dropped = self._rates.get(msg, (now, 0, 0))
+            if now - start >= RATE_WINDOW:
+                start, written = now, 0
+            if written < self.rate_limit or (dropped + 1) % SAMPLE_EVERY == 0:
+                self._rates[msg] = (start, written + 1, 0)
+                return dropped
+            self._rates[msg] = (start, written, dropped + 1)
+            return None
+
+    @contextmanager
+    def bound(self, **fields: Any) -> Iterator[None]:
+        """Add fields (e.g. corr=, update=) to the events of this thread/context"""
+        token = _bound.set({**_bound.get(), **fields})
+        try:
+            yield
+        finally:
+            _bound.reset(token)
+
+    def current_correlation(self) -> str:
+        return _bound.get().get('corr', self.correlation)
+
+    def child_env(self) -> Dict[str, str]:
+        """Environment for a subprocess whose events belong to the current correlation"""
+        return {**os.environ, CORRELATION_ENV: self.current_correlation()}
+
+    # -------------------------------------------------------------------------
+    # Writer
+    # -------------------------------------------------------------------------
+
+    def _enqueue(self, item: Any) -> None:
+        with self._flushed:
+            self._pending += 1
+            # A forked or spawned child needs its own writer thread
+            if self._writer_pid != os.getpid():
+                self._writer_pid = os.getpid()
+                self._writer = threading.Thread(target=self._write_loop, name='event-log', daemon=True)
+                self._writer.start()
+        self._queue.put(item)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until everything queued so far is written (e.g. before exit)"""
+        if self._writer_pid != os.getpid():
+            return
+        self._enqueue(_FLUSH)
+        with self._flushed:
+            self._flushed.wait_for(lambda: self._pending == 0, timeout)
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + FLUSH_SECONDS
+            while batch[-1] is not _FLUSH and len(batch) < BATCH_EVENTS:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            events = [event for event in batch if event is not _FLUSH]
+            try:
+                self._write(events)
+            except Exception as e:
+                print(f"[ERROR] Failed to write event log {self.path}: {e}", file=sys.stderr)
+            with self._flushed:
+                self._pending -= len(batch)
+                self._flushed.notify_all()
+
+    def _write(self, events: list) -> None:
+        if not events:
+            return
+        for event in events:
+            if LEVELS[event['level']] >= self.echo_level:
+                extra = f" (+{event['dropped']} similar)" if event.get('dropped') else ''
+                print(f"[{event['level'].upper()}] {event['msg']}{_details(event)}{extra}", file=sys.stderr)
+        data = ''.join(json.dumps(event, separators=(',', ':'), default=str) + '\n' for event in events)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One O_APPEND write per batch: the bot and monitor.py runs share the file
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data.encode())
+            st = os.fstat(fd)
+        finally:
+            os.close(fd)
+        if st.st_size > MAX_BYTES:
+            try:
+                # Only rotate the file written to, not one another process just started
+                if os.stat(self.path).st_ino == st.st_ino:
+                    os.replace(self.path, self.path.with_name(self.path.name + '.1'))
+            except FileNotFoundError:
+                pass
+
+
+STANDARD_FIELDS = ('ts', 'level', 'src', 'corr', 'msg', 'dropped')
+
+
+def _details(event: Dict[str, Any]) -> str:
+    """Extra fields of an event as ' key=value ...'"""
+    extra = [f"{key}={value}" for key, value in event.items() if key not in STANDARD_FIELDS]
+    return (': ' + ' '.join(extra)) if extra else ''
+
+
+def open_event_log(source: str, path: Path, level: str, echo_level: str, rate_limit: int) -> EventLog:
+    """Event log of a process (see EVENT_* settings)"""
+    return EventLog(path, source, level, echo_level, rate_limit)
+
+
+# =============================================================================
+# VIEWER
+# =============================================================================
+
+def format_event(event: Dict[str, Any]) -> str:
+    """One line per event: time, level, source, correlation, message, fields"""
+    stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event.get('ts', 0)))
+    extra = f" (+{event['dropped']} similar)" if event.get('dropped') else ''
+    return (f"{stamp} {event.get('level', '?').upper():8} {event.get('src', '?'):7} {event.get('corr', '-')} "
+            f"{event.get('msg', '')}{_details(event)}{extra}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python event_log.py <events.jsonl> [correlation id]", file=sys.stderr)
+        sys.exit(2)
+    wanted = sys.argv[2] if len(sys.argv) == 3 else None
+    with open(sys.argv[1], 'r') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if wanted is None or event.get('corr') == wanted:
+                print(format_event(event))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Fake Telegram
+Local stand-in for the Telegram Bot API, to run bot.py and monitor.py
+offline (TG_API_URL=http://127.0.0.1:8081).
+
+- Implements getMe, sendMessage, sendPhoto, setWebhook, deleteWebhook and
+  getUpdates (long polling with offset), and prints every call
+- Each line typed on stdin becomes a message update from TG_CHAT_ID: pushed
+  to the webhook (with its secret token) if one is registered, otherwise
+  queued for getUpdates
+
+Usage:
+    python fake_telegram.py [--port 8081] [--chat-id 123]
+    python fake_telegram.py --webhook http://127.0.0.1:8443/telegram --secret s3cret
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+
+class FakeTelegram:
+    """Bot API state: queued updates and the registered webhook"""
+
+    def __init__(self, chat_id: int):
+        self.chat_id = chat_id
+        self.updates: List[Dict[str, Any]] = []
+        self.next_update_id = 1
+        self.next_message_id = 1
+        self.webhook_url = ''
+        self.webhook_secret = ''
+        self.file_ids: set = set()
+        self.changed = threading.Condition()
+
+    def new_update(self, text: str) -> Dict[str, Any]:
+        with self.changed:
+            update = {
+                'update_id': self.next_update_id,
+                'message': {
+                    'message_id': self.next_message_id,
+                    'date': int(time.time()),
+                    'chat': {'id': self.chat_id, 'type': 'private'},
+                    'from': {'id': self.chat_id, 'is_bot': False, 'first_name': 'Operator'},
+                    'text': text,
+                },
+            }
+            self.next_update_id += 1
+            self.next_message_id += 1
+            return update
+
+    def deliver(self, text: str) -> None:
+        """Push an update to the webhook, or queue it for getUpdates"""
+        update = self.new_update(text)
+        if not self.webhook_url:
+            with self.changed:
+                self.updates.append(update)
+                self.changed.notify_all()
+            print(f"-> queued update {update['update_id']}: {text}")
+            return
+        headers = {'X-Telegram-Bot-Api-Secret-Token': self.webhook_secret}
+        try:
+            response = requests.post(self.webhook_url, json=update, headers=headers, timeout=10)
+            print(f"-> pushed update {update['update_id']}: {text} (HTTP {response.status_code})")
+        except requests.RequestException as e:
+            print(f"-> push of update {update['update_id']} failed: {e}")
+
+    def get_updates(self, offset: int, timeout: float) -> List[Dict[str, Any]]:
+        deadline = time.time() + timeout
+        with self.changed:
+            # offset confirms all earlier updates
+            self.updates = [update for update in self.updates if update['update_id'] >= offset]
+            while not self.updates and time.time() < deadline:
+                self.changed.wait(deadline - time.time())
+            return list(self.updates)
+
+
+# =============================================================================
+# HTTP API
+# =============================================================================
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """Serves /bot<token>/<method>"""
+
+    def _params(self) -> Dict[str, Any]:
+        query = {key: values[-1] for key, values in parse_qs(urlparse(self.path).query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        content_type = self.headers.get('Content-Type', '')
+        if content_type.startswith('application/json') and body:
+            query.update(json.loads(body))
+        elif content_type.startswith('application/x-www-form-urlencoded') and body:
+            query.update({key: values[-1] for key, values in parse_qs(body.decode()).items()})
+        elif content_type.startswith('multipart/form-data'):
+            query['_multipart_bytes'] = len(body)
+        return query
+
+    def _handle(self) -> None:
+        api: FakeTelegram = self.server.api
+        method = urlparse(self.path).path.rsplit('/', 1)[-1]
+        params = self._params()
+        result: Any = True
+
+        if method == 'getMe':
+            result = {'id': 1, 'is_bot': True, 'username': 'fake_sentinel_bot'}
+        elif method == 'sendPhoto' and '_multipart_bytes' not in params and params.get('photo') not in api.file_ids:
+            return self._send(400, {'ok': False, 'error_code': 400,
+                                    'description': 'Bad Request: wrong file identifier/HTTP URL specified'})
+        elif method in ('sendMessage', 'sendPhoto'):
+            text = params.get('text') or params.get('caption') or ''
+            if method == 'sendPhoto':
+                source = (f"upload of {params['_multipart_bytes']} bytes" if '_multipart_bytes' in params
+                          else f"file_id {params['photo']}")
+                text = f"{text} [{source}]"
+            print(f"<- {method}: {text}")
+            with api.changed:
+                result = {'message_id': api.next_message_id, 'date': int(time.time())}
+                if method == 'sendPhoto':
+                    file_id = params.get('photo') if '_multipart_bytes' not in params else f"fake-{api.next_message_id}"
+                    api.file_ids.add(file_id)
+                    result['photo'] = [{'file_id': file_id, 'width': 1000, 'height': 600}]
+                api.next_message_id += 1
+        elif method == 'setWebhook':
+            api.webhook_url = params.get('url', '')
+            api.webhook_secret = params.get('secret_token', '')
+            print(f"<- setWebhook: {api.webhook_url}")
+        elif method == 'deleteWebhook':
+            api.webhook_url = ''
+            print("<- deleteWebhook")
+        elif method == 'getUpdates':
+            if api.webhook_url:
+                return self._send(409, {'ok': False, 'error_code': 409,
+                                        'description': 'Conflict: can\'t use getUpdates method while webhook is active'})
+            result = api.get_updates(int(params.get('offset') or 0), float(params.get('timeout') or 0))
+        else:
+            return self._send(404, {'ok': False, 'error_code': 404, 'description': 'Not Found'})
+        self._send(200, {'ok': True, 'result': result})
+
+    def _send(self, code: int, payload: Dict[str, Any]) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description='Offline Telegram Bot API for bot.py / monitor.py')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--chat-id', type=int, default=int(os.getenv('TG_CHAT_ID') or 1))
+    parser.add_argument('--webhook', default='', help='push updates to this URL without waiting for setWebhook')
+    parser.add_argument('--secret', default=os.getenv('WEBHOOK_SECRET', ''), help='secret token for --webhook')
+    args = parser.parse_args(argv)
+
+    api = FakeTelegram(args.chat_id)
+    api.webhook_url, api.webhook_secret = args.webhook, args.secret
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), ApiHandler)
+    server.daemon_threads = True
+    server.api = api
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Fake Telegram on http://127.0.0.1:{args.port} (chat {args.chat_id}). Type commands, Ctrl+D to quit.")
+
+    try:
+        for line in sys.stdin:
+            if line.strip():
+                api.deliver(line.strip())
+        # Leave time for replies to commands piped in on stdin
+        time.sleep(float(os.getenv('FAKE_TELEGRAM_LINGER', '2')))
+    except KeyboardInterrupt:
+        pass
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
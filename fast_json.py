@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Chain Response Decoding
+Decodes republicd/LCD JSON responses into slim dicts holding only the fields
+the monitor reads.
+
+- Uses orjson when it is installed, the standard json module otherwise
+- Each query has a projection; everything outside it is dropped right after
+  decoding, so no copy of the raw response outlives the parse
+- Without orjson, large responses dominated by one array (delegations,
+  validator sets) are streamed item by item, so peak memory stays at one
+  element instead of the whole tree
+"""
+
+import gc
+import json
+from typing import Any, Dict, Iterator, Optional, Union
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    orjson = None
+    HAVE_ORJSON = False
+
+# Responses above this size are streamed when orjson is not available
+STREAM_THRESHOLD = 256 * 1024
+
+KEEP = True
+
+# Field projections per query name. A dict selects keys, a one-element list
+# applies its projection to every array item, KEEP keeps the value as is.
+_COINS = [{'denom': KEEP, 'amount': KEEP}]
+_VALIDATOR = {
+    'operator_address': KEEP,
+    'consensus_pubkey': KEEP,
+    'jailed': KEEP,
+    'tombstoned': KEEP,
+    'status': KEEP,
+    'Status': KEEP,
+    'description': {'moniker': KEEP},
+}
+
+PROJECTIONS: Dict[str, Any] = {
+    # Response may be {"validator": {...}} or the validator object itself
+    'validator': dict(_VALIDATOR, validator=_VALIDATOR),
+    'validators': {'validators': [_VALIDATOR], 'pagination': KEEP},
+    'signing_info': {
+        'val_signing_info': {'address': KEEP, 'missed_blocks_counter': KEEP, 'tombstoned': KEEP},
+        'address': KEEP, 'missed_blocks_counter': KEEP, 'tombstoned': KEEP,
+    },
+    'balances': {'balances': _COINS},
+    'delegations': {'delegation_responses': [{'balance': KEEP}]},
+    'rewards': {'total': _COINS},
+    'commission': {'commission': KEEP},
+    'outstanding_rewards': {'rewards': KEEP},
+    'self_delegation': {'delegation_response': {'balance': KEEP}, 'balance': KEEP},
+    'delegator_count': {'pagination': KEEP},
+}
+
+
+# =============================================================================
+# DECODING
+# =============================================================================
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson when available"""
+    if HAVE_ORJSON:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode()
+    return json.loads(data)
+
+
+def compile_projection(projection: Any):
+    """Turn a projection into a function that applies it"""
+    if projection is KEEP:
+        return lambda data: data
+
+    if isinstance(projection, list):
+        item = compile_projection(projection[0])
+
+        def apply_list(data):
+            if not isinstance(data, list):
+                return data
+            return [item(value) for value in data]
+        return apply_list
+
+    keys = tuple(projection)
+    subs = {key: compile_projection(sub) for key, sub in projection.items() if sub is not KEEP}
+    if not subs:
+        # Only whole values selected, a plain key copy
+        def apply_keys(data):
+            if not isinstance(data, dict):
+                return data
+            return {key: data[key] for key in keys if key in data}
+        return apply_keys
+
+    def apply_dict(data):
+        if not isinstance(data, dict):
+            return data
+        return {key: subs[key](data[key]) if key in subs else data[key]
+                for key in keys if key in data}
+    return apply_dict
+
+
+def project(data: Any, projection: Any) -> Any:
+    """Keep only the fields selected by projection"""
+    return compile_projection(projection)(data)
+
+
+_COMPILED = {name: compile_projection(projection) for name, projection in PROJECTIONS.items()}
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+def _skip_ws(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def iter_top_level(text: str) -> Iterator[tuple]:
+    """
+    Stream the top-level object of a JSON document as (key, value) pairs.
+    Array values are yielded as a generator of items, decoded one at a time.
+    """
+    pos = _skip_ws(text, 0)
+    if text[pos] != '{':
+        raise ValueError('Top-level JSON value is not an object')
+    pos = _skip_ws(text, pos + 1)
+    while text[pos] != '}':
+        key, pos = _decoder.raw_decode(text, pos)
+        pos = _skip_ws(text, pos)
+        if text[pos] != ':':
+            raise ValueError('Expected ":"')
+        pos = _skip_ws(text, pos + 1)
+        if text[pos] == '[':
+            end = [pos]
+
+            def _items(start=pos + 1):
+                p = _skip_ws(text, start)
+                while text[p] != ']':
+                    item, p = _decoder.raw_decode(text, p)
+                    yield item
+                    p = _skip_ws(text, p)
+                    if text[p] == ',':
+                        p = _skip_ws(text, p + 1)
+                end[0] = p + 1
+
+            yield key, _items()
+            if end[0] == pos:
+                # Consumer did not exhaust the array, skip it
+                for _ in _items():
+                    pass
+            pos = end[0]
+        else:
+            value, pos = _decoder.raw_decode(text, pos)
+            yield key, value
+        pos = _skip_ws(text, pos)
+        if text[pos] == ',':
+            pos = _skip_ws(text, pos + 1)
+
+
+def _stream_project(text: str, projection: Dict[str, Any]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    for key, value in iter_top_level(text):
+        sub = projection.get(key)
+        if sub is None:
+            continue
+        if hasattr(value, '__next__'):
+            item = compile_projection(sub[0] if isinstance(sub, list) else KEEP)
+            result[key] = [item(element) for element in value]
+        else:
+            result[key] = project(value, sub)
+    return result
+
+
+def decode(name: str, data: Union[str, bytes]) -> Optional[Any]:
+    """
+    Decode a chain response for query `name` into a slim dict.
+    Raises ValueError (json.JSONDecodeError / orjson.JSONDecodeError) on bad input.
+    """
+    projection = PROJECTIONS.get(name, KEEP)
+    # Decoding allocates many small containers that can never form cycles,
+    # cyclic GC passes over them are pure overhead
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if not HAVE_ORJSON and isinstance(projection, dict) and len(data) > STREAM_THRESHOLD:
+            text = data.decode() if isinstance(data, bytes) else data
+            try:
+                return _stream_project(text, projection)
+            except (ValueError, IndexError):
+                pass  # unusual layout, fall back to a full parse
+        apply = _COMPILED.get(name) or compile_projection(projection)
+        return apply(loads(data))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Native gRPC Query Client
+Talks directly to the node's gRPC port (9090) for staking, slashing, bank
+and distribution queries.
+
+All queries of a check are multiplexed as concurrent calls over a single
+persistent HTTP/2 channel. Request and response messages are described by
+small schema tables below and encoded/decoded with a minimal protobuf wire
+codec, so no generated stubs (and no cosmos proto tree) are needed. Only the
+fields the monitor uses are declared; everything else is skipped while
+decoding. Decoded responses have the same shape as the republicd/LCD JSON.
+
+Requires the optional `grpcio` package.
+"""
+
+import base64
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# =============================================================================
+# WIRE CODEC
+# =============================================================================
+
+WIRE_VARINT = 0
+WIRE_64BIT = 1
+WIRE_BYTES = 2
+WIRE_32BIT = 5
+
+# cosmos.staking.v1beta1.BondStatus
+BOND_STATUS = {
+    0: 'BOND_STATUS_UNSPECIFIED',
+    1: 'BOND_STATUS_UNBONDED',
+    2: 'BOND_STATUS_UNBONDING',
+    3: 'BOND_STATUS_BONDED',
+}
+
+# cosmos-sdk LegacyDec is sent over gRPC as an integer string scaled by 10^18
+DEC_PRECISION = 10 ** 18
+
+
+def _encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _decode_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def encode_message(fields: List[Tuple[int, Any]]) -> bytes:
+    """
+    Encode (field number, value) pairs. str/bytes are length-delimited,
+    bool/int are varints, nested lists are sub-messages. None is skipped.
+    """
+    out = bytearray()
+    for number, value in fields:
+        if value is None:
+            continue
+        if isinstance(value, list):
+            value = encode_message(value)
+        if isinstance(value, str):
+            value = value.encode()
+        if isinstance(value, (bytes, bytearray)):
+            out += _encode_varint((number << 3) | WIRE_BYTES)
+            out += _encode_varint(len(value))
+            out += value
+        else:
+            out += _encode_varint((number << 3) | WIRE_VARINT)
+            out += _encode_varint(int(value))
+    return bytes(out)
+
+
+def _iter_fields(data: bytes):
+    pos = 0
+    end = len(data)
+    while pos < end:
+        key, pos = _decode_varint(data, pos)
+        number, wire_type = key >> 3, key & 0x07
+        if wire_type == WIRE_VARINT:
+            value, pos = _decode_varint(data, pos)
+        elif wire_type == WIRE_BYTES:
+            length, pos = _decode_varint(data, pos)
+            value = data[pos:pos + length]
+            pos += length
+        elif wire_type == WIRE_64BIT:
+            value = data[pos:pos + 8]
+            pos += 8
+        elif wire_type == WIRE_32BIT:
+            value = data[pos:pos + 4]
+            pos += 4
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type}")
+        yield number, value
+
+
+def _convert(kind: str, sub: Any, value: Any) -> Any:
+    if kind == 'string':
+        return bytes(value).decode()
+    if kind == 'int':
+        return str(value)  # proto3 JSON renders (u)int64 as strings
+    if kind == 'bool':
+        return bool(value)
+    if kind == 'enum':
+        return sub.get(value, str(value))
+    if kind == 'dec':
+        whole, frac = divmod(int(bytes(value).decode() or '0'), DEC_PRECISION)
+        return f"{whole}.{frac:018d}"
+    if kind == 'bytes':
+        return base64.b64encode(bytes(value)).decode()
+    if kind == 'pubkey':
+        any_msg = decode_message(bytes(value), ANY)
+        key = decode_message(base64.b64decode(any_msg.get('value', '')), PUBKEY).get('key', '')
+        return {'@type': any_msg.get('type_url', ''), 'key': key}
+    if kind == 'timestamp':
+        ts = decode_message(bytes(value), TIMESTAMP)
+        return {'seconds': ts.get('seconds', '0'), 'nanos': ts.get('nanos', '0')}
+    if kind == 'message':
+        return decode_message(bytes(value), sub)
+    raise ValueError(f"Unknown field kind {kind}")
+
+
+def decode_message(data: bytes, schema: Dict[int, tuple]) -> Dict[str, Any]:
+    """Decode only the fields declared in schema: {number: (name, kind, sub, repeated)}"""
+    result: Dict[str, Any] = {}
+    for name, _, _, repeated in schema.values():
+        if repeated:
+            result[name] = []
+    for number, value in _iter_fields(data):
+        spec = schema.get(number)
+        if spec is None:
+            continue
+        name, kind, sub, repeated = spec
+        converted = _convert(kind, sub, value)
+        if repeated:
+            result[name].append(converted)
+        else:
+            result[name] = converted
+    return result
+
+
+def F(name: str, kind: str, sub: Any = None, repeated: bool = False) -> tuple:
+    """Schema field"""
+    return (name, kind, sub, repeated)
+
+
+# =============================================================================
+# MESSAGE SCHEMAS
+# =============================================================================
+
+ANY = {1: F('type_url', 'string'), 2: F('value', 'bytes')}
+PUBKEY = {1: F('key', 'bytes')}
+TIMESTAMP = {1: F('seconds', 'int'), 2: F('nanos', 'int')}
+COIN = {1: F('denom', 'string'), 2: F('amount', 'string')}
+DEC_COIN = {1: F('denom', 'string'), 2: F('amount', 'dec')}
+PAGE_RESPONSE = {1: F('next_key', 'bytes'), 2: F('total', 'int')}
+
+DESCRIPTION = {1: F('moniker', 'string'), 2: F('identity', 'string'), 3: F('website', 'string')}
+
+VALIDATOR = {
+    1: F('operator_address', 'string'),
+    2: F('consensus_pubkey', 'pubkey'),
+    3: F('jailed', 'bool'),
+    4: F('status', 'enum', BOND_STATUS),
+    5: F('tokens', 'string'),
+    6: F('delegator_shares', 'dec'),
+    7: F('description', 'message', DESCRIPTION),
+    11: F('min_self_delegation', 'string'),
+}
+
+SIGNING_INFO = {
+    1: F('address', 'string'),
+    2: F('start_height', 'int'),
+    3: F('index_offset', 'int'),
+    4: F('jailed_until', 'timestamp'),
+    5: F('tombstoned', 'bool'),
+    6: F('missed_blocks_counter', 'int'),
+}
+
+DELEGATION = {
+    1: F('delegator_address', 'string'),
+    2: F('validator_address', 'string'),
+    3: F('shares', 'dec'),
+}
+DELEGATION_RESPONSE = {1: F('delegation', 'message', DELEGATION), 2: F('balance', 'message', COIN)}
+DELEGATOR_REWARD = {1: F('validator_address', 'string'), 2: F('reward', 'message', DEC_COIN, True)}
+
+DELEGATIONS_RESPONSE = {
+    1: F('delegation_responses', 'message', DELEGATION_RESPONSE, True),
+    2: F('pagination', 'message', PAGE_RESPONSE),
+}
+
+
+def _page(limit: int, count_total: bool = False) -> list:
+    """PageRequest {3: limit, 4: count_total}"""
+    return [(3, limit), (4, count_total or None)]
+
+
+# Query name -> (gRPC method, request builder(params), response schema, post-process)
+QUERIES: Dict[str, Tuple[str, Callable[[Dict[str, str]], bytes], Dict[int, tuple], Optional[Callable]]] = {
+    'validator': (
+        '/cosmos.staking.v1beta1.Query/Validator',
+        lambda p: encode_message([(1, p['valoper'])]),
+        {1: F('validator', 'message', VALIDATOR)},
+        None,
+    ),
+    'signing_info': (
+        '/cosmos.slashing.v1beta1.Query/SigningInfo',
+        lambda p: encode_message([(1, p['cons_address'])]),
+        {1: F('val_signing_info', 'message', SIGNING_INFO)},
+        None,
+    ),
+    'balances': (
+        '/cosmos.bank.v1beta1.Query/Balance',
+        lambda p: encode_message([(1, p['wallet']), (2, p['denom'])]),
+        {1: F('balance', 'message', COIN)},
+        # Same shape as `query bank balances`
+        lambda r: {'balances': [r['balance']] if r.get('balance') else []},
+    ),
+    'delegations': (
+        '/cosmos.staking.v1beta1.Query/DelegatorDelegations',
+        lambda p: encode_message([(1, p['wallet']), (2, _page(1000))]),
+        DELEGATIONS_RESPONSE,
+        None,
+    ),
+    'rewards': (
+        '/cosmos.distribution.v1beta1.Query/DelegationTotalRewards',
+        lambda p: encode_message([(1, p['wallet'])]),
+        {1: F('rewards', 'message', DELEGATOR_REWARD, True), 2: F('total', 'message', DEC_COIN, True)},
+        None,
+    ),
+    'commission': (
+        '/cosmos.distribution.v1beta1.Query/ValidatorCommission',
+        lambda p: encode_message([(1, p['valoper'])]),
+        {1: F('commission', 'message', {1: F('commission', 'message', DEC_COIN, True)})},
+        None,
+    ),
+    'outstanding_rewards': (
+        '/cosmos.distribution.v1beta1.Query/ValidatorOutstandingRewards',
+        lambda p: encode_message([(1, p['valoper'])]),
+        {1: F('rewards', 'message', {1: F('rewards', 'message', DEC_COIN, True)})},
+        None,
+    ),
+    'self_delegation': (
+        '/cosmos.staking.v1beta1.Query/Delegation',
+        lambda p: encode_message([(1, p['wallet']), (2, p['valoper'])]),
+        {1: F('delegation_response', 'message', DELEGATION_RESPONSE)},
+        None,
+    ),
+    'delegator_count': (
+        '/cosmos.staking.v1beta1.Query/ValidatorDelegations',
+        lambda p: encode_message([(1, p['valoper']), (2, _page(1, count_total=True))]),
+        DELEGATIONS_RESPONSE,
+        None,
+    ),
+}
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class GrpcClient:
+    """Persistent gRPC channel; every query of a check shares it"""
+
+    def __init__(self, target: str, timeout: float = 10, secure: bool = False):
+        import grpc  # optional dependency
+
+        self._grpc = grpc
+        self.target = target
+        self.timeout = timeout
+        options = [
+            ('grpc.keepalive_time_ms', 30000),
+            ('grpc.keepalive_permit_without_calls', 1),
+            ('grpc.max_receive_message_length', 64 * 1024 * 1024),
+        ]
+        if secure:
+            self._channel = grpc.secure_channel(target, grpc.ssl_channel_credentials(), options=options)
+        else:
+            self._channel = grpc.insecure_channel(target, options=options)
+        self._methods: Dict[str, Any] = {}
+        # Latency (seconds) of each call of the last query_many()
+        self.last_timings: Dict[str, float] = {}
+
+    def _method(self, path: str):
+        # No serializers: requests and responses travel as raw bytes
+        if path not in self._methods:
+            self._methods[path] = self._channel.unary_unary(path)
+        return self._methods[path]
+
+    def query_many(self, calls: Dict[str, Tuple[str, Dict[str, str]]]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Run {key: (query name, params)} concurrently over the channel.
+        Failed queries map to None.
+        """
+        futures = {}
+        timings: Dict[str, float] = {}
+        for key, (name, params) in calls.items():
+            method, build, _, _ = QUERIES[name]
+            try:
+                started = time.monotonic()
+                future = self._method(method).future(build(params), timeout=self.timeout)
+                future.add_done_callback(
+                    lambda _, key=key, started=started: timings.__setitem__(key, time.monotonic() - started))
+                futures[key] = future
+            except Exception:
+                futures[key] = None
+
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for key, future in futures.items():
+            name = calls[key][0]
+            _, _, schema, post = QUERIES[name]
+            try:
+                if future is None:
+                    raise ValueError('call not started')
+                decoded = decode_message(future.result(), schema)
+                results[key] = post(decoded) if post else decoded
+            except Exception:
+                results[key] = None
+        self.last_timings = timings
+        return results
+
+    def query(self, name: str, params: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Run a single query"""
+        return self.query_many({name: (name, params)})[name]
+
+    def close(self) -> None:
+        self._channel.close()
+
+
+_clients: Dict[str, GrpcClient] = {}
+
+
+def get_client(target: str, timeout: float = 10) -> GrpcClient:
+    """Process-wide client per target, so the channel is reused across checks"""
+    client = _clients.get(target)
+    if client is None:
+        secure = target.startswith('https://')
+        address = target.split('://', 1)[-1]
+        client = GrpcClient(address, timeout=timeout, secure=secure)
+        _clients[target] = client
+    return client
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Host Probes
+Host resource metrics read straight from /proc and statvfs (plain Linux),
+without spawning any process:
+
+- Disk size and free space of the node's data directory, plus its growth
+  rate and the predicted time until the disk is full
+- Node process RSS, CPU time and open file descriptors (found by name in
+  /proc; the last PID is checked first, so the scan rarely runs)
+- Load average and available memory
+
+A sample is a handful of small file reads. Anything unreadable (process
+gone, fds of another user's process) is reported as 0.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Tuple
+
+PROC = Path('/proc')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+GROWTH_ALPHA = 0.3  # EWMA weight of one hour of disk growth
+GROWTH_MIN_SECONDS = 55 * 60  # shortest interval a growth rate is measured over (hourly runs, less timer jitter)
+
+
+class HostSample(NamedTuple):
+    """One reading of the host; sizes in bytes"""
+    disk_total: int
+    disk_free: int
+    load1: float
+    mem_available: int
+    node_pid: int
+    node_rss: int
+    node_cpu_seconds: float
+    node_fds: int
+
+
+def disk_usage(path: Path) -> Tuple[int, int]:
+    """(total, free for unprivileged users) of the filesystem holding path"""
+    st = os.statvfs(path)
+    return st.f_blocks * st.f_frsize, st.f_bavail * st.f_frsize
+
+
+def mem_available() -> int:
+    """MemAvailable from /proc/meminfo"""
+    with open(PROC / 'meminfo', 'r') as f:
+        for line in f:
+            if line.startswith('MemAvailable:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def _comm(pid: int) -> str:
+    try:
+        return (PROC / str(pid) / 'comm').read_text().strip()
+    except OSError:
+        return ''
+
+
+def find_process(name: str, hint_pid: int = 0) -> int:
+    """PID of a process by name (as in /proc/<pid>/comm), 0 if not running"""
+    name = name[:15]  # comm is truncated to 15 characters
+    if hint_pid and _comm(hint_pid) == name:
+        return hint_pid
+    for entry in os.scandir(PROC):
+        if entry.name.isdigit() and _comm(int(entry.name)) == name:
+            return int(entry.name)
+    return 0
+
+
+def process_stats(pid: int) -> Tuple[int, float, int]:
+    """(RSS bytes, CPU seconds user+system, open fds) of a process"""
+    try:
+        stat = (PROC / str(pid) / 'stat').read_text()
+    except OSError:
+        return 0, 0.0, 0
+    # The command name may contain spaces: fields start after the last ')'
+    fields = stat[stat.rindex(')') + 2:].split()
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    rss = int(fields[21]) * PAGE_SIZE
+    try:
+        fds = len(os.listdir(PROC / str(pid) / 'fd'))
+    except OSError:
+        fds = 0
+    return rss, cpu_seconds, fds
+
+
+def sample(data_dir: Path, process_name: str, hint_pid: int = 0) -> HostSample:
+    """Read all host metrics once"""
+    try:
+        disk_total, disk_free = disk_usage(data_dir)
+    except OSError:
+        disk_total, disk_free = 0, 0
+    pid = find_process(process_name, hint_pid) if process_name else 0
+    rss, cpu_seconds, fds = process_stats(pid) if pid else (0, 0.0, 0)
+    try:
+        memory = mem_available()
+    except OSError:
+        memory = 0
+    return HostSample(disk_total, disk_free, os.getloadavg()[0], memory, pid, rss, cpu_seconds, fds)
+
+
+def update_trends(trend: Dict[str, Any], host: HostSample, now: float) -> Tuple[float, float, float]:
+    """
+    Advance the per-host trend kept in trend (mutated, e.g. a state dict).
+    Returns (disk growth in bytes/hour, hours until the disk is full or 0
+    if it is not filling up, node CPU % since the previous sample).
+    """
+    used = host.disk_total - host.disk_free
+    cpu_percent = 0.0
+    previous_ts = trend.get('ts')
+    if previous_ts is not None and now > previous_ts:
+        elapsed = now - previous_ts
+        if host.node_pid and host.node_pid == trend.get('node_pid'):
+            cpu_percent = max(0.0, (host.node_cpu_seconds - trend.get('node_cpu_seconds', 0)) / elapsed * 100)
+
+    # Disk growth is measured against a baseline at least GROWTH_MIN_SECONDS
+    # old: extra runs (bot /status) minutes apart would otherwise extrapolate
+    # a compaction or a log burst to a full disk. Older state has no disk_ts.
+    disk_ts = trend.get('disk_ts', previous_ts)
+    if not host.disk_total:
+        trend['disk_used'] = None
+    elif trend.get('disk_used') is None or disk_ts is None or now < disk_ts:
+        trend.update({'disk_used': used, 'disk_ts': now})
+    elif now - disk_ts >= GROWTH_MIN_SECONDS:
+        disk_hours = (now - disk_ts) / 3600
+        rate = (used - trend['disk_used']) / disk_hours
+        rate_hour = trend.get('disk_rate_hour')
+        # Weighted by elapsed time, so a long gap counts as several hours
+        weight = 1 - (1 - GROWTH_ALPHA) ** min(disk_hours, 24)
+        trend['disk_rate_hour'] = rate if rate_hour is None else \
+            weight * rate + (1 - weight) * rate_hour
+        trend.update({'disk_used': used, 'disk_ts': now})
+
+    trend.update({
+        'ts': now,
+        'node_pid': host.node_pid,
+        'node_cpu_seconds': host.node_cpu_seconds,
+    })
+    growth = trend.get('disk_rate_hour') or 0.0
+    hours_to_full = host.disk_free / growth if growth > 0 else 0.0
+    return growth, hours_to_full, cpu_percent
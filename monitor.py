@@ -8,62 +8,115 @@ import os
 import sys
 import json
 import csv
+import io
 import time
+import hashlib
 import subprocess
 import requests
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, Dict, Any, Tuple
-from dotenv import load_dotenv
+from typing import Optional, Callable, Dict, Any, List, Tuple, NamedTuple
 import shutil
-
-# Load environment variables
-load_dotenv()
+import base64
+import signal
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from ring_buffer import RingBuffer
+import compaction
+import fast_json
+import templates
+import digest
+from alert_engine import AlertEngine, Rule, NOTIFY_KINDS, LEVEL_RANK
+import silences
+import run_lock
+import host_probe
+import traffic
+import config
+import event_log
+import work_queue
+from signing_store import SigningStore, UptimeReport, uptime_report
+from records import CHART_METRICS, Metrics, MetricsLike, as_metrics, format_amount, row_getter
 
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 
-# Required environment variables
-REQUIRED_VARS = {
-    'TG_TOKEN': os.getenv('TG_TOKEN'),
-    'TG_CHAT_ID': os.getenv('TG_CHAT_ID'),
-    'VALOPER': os.getenv('VALOPER'),
-    'WALLET': os.getenv('WALLET'),
-}
+# All settings from .env and the environment, validated once (config.py).
+# Code reads them through CONFIG at use, so a reload applies everywhere at once.
+try:
+    CONFIG = config.load()
+except config.ConfigError as e:
+    print(f"ERROR: Invalid configuration: {e}", file=sys.stderr)
+    sys.exit(1)
+REQUIRED_SETTINGS = ['tg_token', 'tg_chat_id', 'valoper', 'wallet']
 
-# Optional with defaults
-REPUBLIC_HOME = Path(os.getenv('REPUBLIC_HOME', '/root/.republicd'))
-CHAIN_ID = os.getenv('CHAIN_ID', '')
-DENOM = os.getenv('DENOM', 'arai')
-DECIMALS = int(os.getenv('DECIMALS', '18'))
-HEARTBEAT_HOURS = float(os.getenv('HEARTBEAT_HOURS', '3'))
-REWARD_DROP_PCT = float(os.getenv('REWARD_DROP_PCT', '5'))
-STUCK_MINUTES = int(os.getenv('STUCK_MINUTES', '10'))
-REPUBLICD_BINARY = os.getenv('REPUBLICD_BINARY', 'republicd')
+REWARD_RATE_ALPHA = 0.3  # EWMA weight of the newest reward accrual rate
+
+# Traffic capture/replay (traffic.py), see TRAFFIC_* settings
+TRAFFIC = traffic.open_traffic('monitor', CONFIG.traffic_capture, CONFIG.traffic_replay,
+                               CONFIG.traffic_replay_speed)
 
 # Paths
-HISTORY_DIR = Path('history')
+# (a replay reads recorded inputs and writes to a scratch directory instead)
+HISTORY_DIR = traffic.replay_dir() if CONFIG.traffic_replay else Path('history')
 HISTORY_DIR.mkdir(exist_ok=True)
 HISTORY_CSV = HISTORY_DIR / 'history.csv'
-REWARDS_CHART = HISTORY_DIR / 'rewards.png'
-MISSED_BLOCKS_CHART = HISTORY_DIR / 'missed_blocks.png'
+CHARTS_DIR = HISTORY_DIR / 'charts'
 STATE_FILE = HISTORY_DIR / 'state.json'
-
-# RPC endpoint
-RPC_URL = os.getenv('RPC_URL', 'http://localhost:26657')
+QUERY_CACHE_FILE = HISTORY_DIR / 'query_cache.json'
+TELEGRAM_FILES_FILE = HISTORY_DIR / 'telegram_files.json'
+ALERT_EVENTS_FILE = HISTORY_DIR / 'alert_events.jsonl'
+SILENCES_FILE = HISTORY_DIR / 'silences.json'
+RECENT_RING = HISTORY_DIR / 'recent.ring'
+RUN_LOCK_FILE = HISTORY_DIR / 'monitor.lock'
+SIGNING_DIR = HISTORY_DIR / 'signing'
+EVENT_LOG_FILE = HISTORY_DIR / 'events.jsonl'
+
+# Structured event log (event_log.py), see EVENT_* settings; one correlation
+# ID per run, inherited from the bot command that started it
+EVENTS = event_log.open_event_log('monitor', EVENT_LOG_FILE, CONFIG.event_log_level, CONFIG.event_echo_level,
+                                  CONFIG.event_rate_limit)
+LAST_RUN_FILE = HISTORY_DIR / 'last_run.json'
+
+# Recent samples ring buffer (fixed size, memory-mapped, RING_CAPACITY samples)
+RING_FIELDS = [
+    ('timestamp', 'time'),
+    ('height', 'int'),
+    ('missed_blocks', 'int'),
+    ('flags', 'flags'),  # catching_up, jailed, tombstoned
+    ('rewards', 'amount'),
+    ('wallet_balance', 'amount'),
+    ('delegated_balance', 'amount'),
+    ('accrued_rewards', 'amount'),
+    ('commission', 'amount'),
+    ('self_delegation', 'amount'),
+    ('delegator_count', 'int'),
+]
+
+# LCD (REST) requests; the republicd CLI is used when LCD_URL is unreachable
+LCD_TIMEOUT = 5
+LCD_MAX_CONCURRENCY = 16  # parallel LCD requests per batch (fleet batches can be large)
+
+# Telegram limits: message length
+TG_MESSAGE_LIMIT = 4096
+TG_FILE_CACHE_SIZE = 200  # uploaded images remembered by content hash
 
 # Retry config
 RPC_RETRY_ATTEMPTS = 3
 RPC_RETRY_DELAY = 2
 
+# Signing backfill (--backfill): checkpoint interval in blocks
+BACKFILL_CHECKPOINT_BLOCKS = 1000
+
 # =============================================================================
 # VALIDATION
 # =============================================================================
 
 def validate_config() -> bool:
     """Validate all required environment variables"""
-    missing = [var for var, value in REQUIRED_VARS.items() if not value]
+    missing = CONFIG.missing(REQUIRED_SETTINGS)
     if missing:
         print(f"ERROR: Missing required environment variables: {', '.join(missing)}", file=sys.stderr)
         print("Please set all required variables in .env file", file=sys.stderr)
@@ -75,32 +128,39 @@ def validate_config() -> bool:
 # UTILITIES
 # =============================================================================
 
-def log_error(msg: str) -> None:
-    """Log error to stderr"""
-    print(f"[ERROR] {msg}", file=sys.stderr)
+def log_error(msg: str, /, **fields: Any) -> None:
+    """Log an error event (written and echoed to stderr in the background)"""
+    EVENTS.error(msg, **fields)
 
 
 def atomic_write_json(filepath: Path, data: Dict[str, Any]) -> bool:
-    """Atomically write JSON file"""
+    """
+    Atomically write JSON file. The temp file name is unique per process
+    and thread, so shard workers writing the same file do not collide.
+    """
     try:
-        temp_file = filepath.with_suffix('.tmp')
+        temp_file = filepath.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
         with open(temp_file, 'w') as f:
             json.dump(data, f, indent=2)
         shutil.move(str(temp_file), str(filepath))
         return True
     except Exception as e:
-        log_error(f"Failed to write state: {e}")
+        log_error("Failed to write state", error=str(e))
         return False
 
 
 def load_state() -> Dict[str, Any]:
-    """Load state from JSON"""
+    """Load state from JSON (recorded with the traffic: a replay starts from the recorded state)"""
+    return TRAFFIC.call('file', 'state.json', _load_state)
+
+
+def _load_state() -> Dict[str, Any]:
     try:
         if STATE_FILE.exists():
             with open(STATE_FILE, 'r') as f:
                 return json.load(f)
     except Exception as e:
-        log_error(f"Failed to load state: {e}")
+        log_error("Failed to load state", error=str(e))
     return {}
 
 
@@ -140,36 +200,93 @@ def map_bond_status(status: str) -> str:
 # TELEGRAM
 # =============================================================================
 
-def send_telegram_message(text: str) -> bool:
-    """Send message to Telegram"""
+def telegram_api(method: str, timeout: float, **kwargs) -> Tuple[int, Dict[str, Any]]:
+    """
+    POST to a Bot API method (kwargs as for requests.post).
+    Returns (HTTP status, decoded reply); captured/replayed as one call.
+    """
+    def post():
+        url = f"{CONFIG.tg_api_url}/bot{CONFIG.tg_token}/{method}"
+        response = requests.post(url, timeout=timeout, **kwargs)
+        try:
+            reply = response.json()
+        except ValueError:
+            reply = {}
+        return [response.status_code, reply]
+    
+    status, reply = TRAFFIC.call('telegram', method, post, request=kwargs.get('json') or kwargs.get('data'))
+    return status, reply
+
+
+def send_telegram_message(text: str, parse_mode: Optional[str] = None) -> bool:
+    """Send message to Telegram (parse_mode defaults to TG_PARSE_MODE)"""
     try:
-        url = f"https://api.telegram.org/bot{REQUIRED_VARS['TG_TOKEN']}/sendMessage"
         payload = {
-            'chat_id': REQUIRED_VARS['TG_CHAT_ID'],
+            'chat_id': CONFIG.tg_chat_id,
             'text': text
         }
-        response = requests.post(url, json=payload, timeout=10)
-        response.raise_for_status()
+        parse_mode = CONFIG.tg_parse_mode if parse_mode is None else parse_mode
+        if parse_mode:
+            payload['parse_mode'] = parse_mode
+        status, reply = telegram_api('sendMessage', 10, json=payload)
+        if status >= 400:
+            raise RuntimeError(f"HTTP {status}: {reply.get('description', '')}")
         return True
     except Exception as e:
-        log_error(f"Failed to send Telegram: {e}")
+        log_error("Failed to send Telegram", error=str(e))
         return False
 
 
-def send_telegram_photo(photo_path: Path, caption: str = "") -> bool:
-    """Send photo to Telegram"""
+def load_telegram_files() -> Dict[str, str]:
+    """Content hash -> Telegram file_id of images uploaded before"""
     try:
-        if not photo_path.exists():
-            return False
-        url = f"https://api.telegram.org/bot{REQUIRED_VARS['TG_TOKEN']}/sendPhoto"
-        with open(photo_path, 'rb') as photo:
-            files = {'photo': photo}
-            data = {'chat_id': REQUIRED_VARS['TG_CHAT_ID'], 'caption': caption}
-            response = requests.post(url, files=files, data=data, timeout=30)
-            response.raise_for_status()
-            return True
+        if TELEGRAM_FILES_FILE.exists():
+            with open(TELEGRAM_FILES_FILE, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        log_error("Failed to load Telegram file cache", error=str(e))
+    return {}
+
+
+def cache_telegram_file(content_hash: str, file_id: str) -> None:
+    """Remember an uploaded image, keeping the newest TG_FILE_CACHE_SIZE entries"""
+    files = load_telegram_files()
+    files.pop(content_hash, None)
+    files[content_hash] = file_id
+    atomic_write_json(TELEGRAM_FILES_FILE, dict(list(files.items())[-TG_FILE_CACHE_SIZE:]))
+
+
+def send_telegram_photo(photo: Any, caption: str = "", chat_id: Optional[str] = None) -> bool:
+    """
+    Send a photo (PNG bytes or a file path) to Telegram (TG_CHAT_ID unless
+    chat_id is given). An image uploaded before is re-sent by its file_id
+    instead of uploading the bytes again.
+    """
+    try:
+        if isinstance(photo, Path):
+            if not photo.exists():
+                return False
+            photo = photo.read_bytes()
+        data = {'chat_id': chat_id or CONFIG.tg_chat_id, 'caption': caption}
+        content_hash = hashlib.sha256(photo).hexdigest()
+        
+        file_id = load_telegram_files().get(content_hash)
+        if file_id:
+            status, _ = telegram_api('sendPhoto', 10, json={**data, 'photo': file_id})
+            if status < 400:
+                return True
+            # file_id no longer valid (e.g. other bot token): upload again
+        
+        files = {'photo': ('chart.png', photo, 'image/png')}
+        status, reply = telegram_api('sendPhoto', 30, files=files, data=data)
+        if status >= 400:
+            raise RuntimeError(f"HTTP {status}: {reply.get('description', '')}")
+        sizes = reply.get('result', {}).get('photo') or []
+        if sizes:
+            cache_telegram_file(content_hash, sizes[-1]['file_id'])
+        return True
     except Exception as e:
-        log_error(f"Failed to send photo: {e}")
+        log_error("Failed to send photo", error=str(e))
         return False
 
 
@@ -179,9 +296,13 @@ def send_telegram_photo(photo_path: Path, caption: str = "") -> bool:
 
 def rpc_call(endpoint: str) -> Optional[Dict[str, Any]]:
     """Make RPC call with retry"""
+    return TRAFFIC.call('rpc', endpoint, lambda: _rpc_call(endpoint))
+
+
+def _rpc_call(endpoint: str) -> Optional[Dict[str, Any]]:
     for attempt in range(RPC_RETRY_ATTEMPTS):
         try:
-            url = f"{RPC_URL}{endpoint}"
+            url = f"{CONFIG.rpc_url}{endpoint}"
             response = requests.get(url, timeout=10)
             response.raise_for_status()
             return response.json()
@@ -189,45 +310,433 @@ def rpc_call(endpoint: str) -> Optional[Dict[str, Any]]:
             if attempt < RPC_RETRY_ATTEMPTS - 1:
                 time.sleep(RPC_RETRY_DELAY * (attempt + 1))
                 continue
-            log_error(f"RPC call failed {endpoint}: {e}")
+            log_error("RPC call failed", endpoint=endpoint, error=str(e))
             return None
     return None
 
 
+def rpc_batch(calls: Dict[str, Tuple[str, Dict[str, Any]]]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Several JSON-RPC calls in one HTTP request (JSON-RPC 2.0 batch, supported
+    by CometBFT). calls: {key: (method, params)}; returns {key: result or None}.
+    Falls back to one GET per call if the batch is refused (HTTP error, e.g.
+    a proxy that only allows GET), keeps failing, or gets no batch reply.
+    """
+    key = json.dumps(list(calls.values()), separators=(',', ':'))
+    return TRAFFIC.call('rpc_batch', key, lambda: _rpc_batch(calls))
+
+
+def _rpc_batch(calls: Dict[str, Tuple[str, Dict[str, Any]]]) -> Dict[str, Optional[Dict[str, Any]]]:
+    keys = list(calls)
+    payload = [
+        {'jsonrpc': '2.0', 'id': index, 'method': method, 'params': params}
+        for index, (method, params) in enumerate(calls.values())
+    ]
+    results: Dict[str, Optional[Dict[str, Any]]] = {key: None for key in keys}
+    replies = None
+    for attempt in range(RPC_RETRY_ATTEMPTS):
+        try:
+            response = requests.post(CONFIG.rpc_url, json=payload, timeout=10)
+            response.raise_for_status()
+            replies = response.json()
+            break
+        except requests.HTTPError as e:
+            # POST or batches refused: retrying will not help
+            EVENTS.warning("RPC batch refused, using one request per call", error=str(e))
+            break
+        except Exception as e:
+            if attempt < RPC_RETRY_ATTEMPTS - 1:
+                time.sleep(RPC_RETRY_DELAY * (attempt + 1))
+                continue
+            log_error("RPC batch failed", methods=[method for method, _ in calls.values()], error=str(e))
+    
+    if not isinstance(replies, list):
+        # Batches refused, failing, disabled or unsupported: one request per call
+        for key, (method, params) in calls.items():
+            query = '&'.join(f"{name}={value}" for name, value in params.items())
+            reply = rpc_call(f"/{method}?{query}" if query else f"/{method}")
+            results[key] = reply.get('result') if reply else None
+        return results
+    
+    # Replies may come in any order, matched by id
+    for reply in replies:
+        index = reply.get('id') if isinstance(reply, dict) else None
+        if not isinstance(index, int) or not 0 <= index < len(keys):
+            continue
+        if reply.get('error'):
+            log_error("RPC method failed", method=payload[index]['method'], error=reply['error'])
+            continue
+        results[keys[index]] = reply.get('result')
+    return results
+
+
+def lcd_get(path: str, session: Optional[requests.Session] = None,
+            name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    GET from LCD (REST) endpoint, no retry - callers fall back to the CLI.
+    With a query name the response is decoded to that query's slim shape.
+    """
+    return TRAFFIC.call('lcd', f"{path} {name}" if name else path, lambda: _lcd_get(path, session, name))
+
+
+def _lcd_get(path: str, session: Optional[requests.Session], name: Optional[str]) -> Optional[Dict[str, Any]]:
+    try:
+        http = session or requests
+        response = http.get(f"{CONFIG.lcd_url}{path}", timeout=LCD_TIMEOUT)
+        response.raise_for_status()
+        if name:
+            return fast_json.decode(name, response.content)
+        return fast_json.loads(response.content)
+    except Exception:
+        return None
+
+
+# =============================================================================
+# QUERY TIMING
+# =============================================================================
+
+# (backend, query, seconds, ok) of every chain query in this process
+QUERY_TIMINGS: list = []
+_timings_lock = threading.Lock()
+
+
+def record_query_timing(backend: str, name: str, seconds: float, ok: bool) -> None:
+    """Record latency of one chain query"""
+    with _timings_lock:
+        QUERY_TIMINGS.append((backend, name, seconds, ok))
+
+
+def format_query_timings() -> str:
+    """Per-backend/query latency summary"""
+    with _timings_lock:
+        timings = list(QUERY_TIMINGS)
+    lines = []
+    for backend, name, seconds, ok in timings:
+        lines.append(f"{backend:5} {name:22} {seconds * 1000:8.1f} ms {'ok' if ok else 'FAILED'}")
+    if timings:
+        lines.append(f"total {len(timings)} queries, {sum(t[2] for t in timings) * 1000:.1f} ms summed")
+    return '\n'.join(lines)
+
+
 # =============================================================================
 # REPUBLICD QUERIES
 # =============================================================================
 
 def republicd_query(command: list) -> Optional[str]:
     """Execute republicd query command"""
+    return TRAFFIC.call('republicd', ' '.join(command), lambda: _republicd_query(command))
+
+
+def _republicd_query(command: list) -> Optional[str]:
     try:
-        cmd = [REPUBLICD_BINARY] + command
-        if CHAIN_ID:
-            cmd.extend(['--chain-id', CHAIN_ID])
+        cmd = [CONFIG.republicd_binary] + command
+        if CONFIG.chain_id:
+            cmd.extend(['--chain-id', CONFIG.chain_id])
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
             timeout=30,
-            cwd=str(REPUBLIC_HOME) if REPUBLIC_HOME.exists() else None
+            cwd=str(CONFIG.republic_home) if CONFIG.republic_home.exists() else None
         )
         if result.returncode == 0:
             return result.stdout.strip()
         else:
-            log_error(f"republicd failed: {' '.join(cmd)} - {result.stderr}")
+            log_error("republicd failed", command=' '.join(cmd), stderr=result.stderr.strip()[-500:])
             return None
     except subprocess.TimeoutExpired:
-        log_error(f"republicd timeout: {' '.join(command)}")
+        log_error("republicd timeout", command=' '.join(command))
+        return None
+    except Exception as e:
+        log_error("republicd error", error=str(e))
         return None
+
+
+def _timed_republicd_query(command: list) -> Tuple[Optional[str], float]:
+    """republicd_query() plus its wall time in seconds"""
+    started = time.monotonic()
+    output = republicd_query(command)
+    return output, time.monotonic() - started
+
+
+_cli_pool: Optional[ThreadPoolExecutor] = None
+_cli_inflight: Dict[tuple, Future] = {}
+_cli_lock = threading.Lock()
+
+
+def republicd_query_async(command: list) -> Future:
+    """
+    Submit a republicd query to the bounded worker pool (CLI_WORKERS).
+    Identical commands already in flight share one process and one Future.
+    The Future resolves to (output, seconds).
+    """
+    global _cli_pool
+    key = tuple(command)
+    with _cli_lock:
+        future = _cli_inflight.get(key)
+        if future is not None:
+            return future
+        if _cli_pool is None:
+            _cli_pool = ThreadPoolExecutor(max_workers=max(1, CONFIG.cli_workers),
+                                           thread_name_prefix='republicd')
+        future = _cli_pool.submit(_timed_republicd_query, command)
+        _cli_inflight[key] = future
+    
+    def _done(_):
+        with _cli_lock:
+            if _cli_inflight.get(key) is future:
+                del _cli_inflight[key]
+    
+    future.add_done_callback(_done)
+    return future
+
+
+# =============================================================================
+# IMMUTABLE QUERY CACHE
+# =============================================================================
+
+# query_cache.json, read once per process
+_query_cache: Optional[Dict[str, Any]] = None
+_query_cache_lock = threading.Lock()
+
+
+def load_query_cache() -> Dict[str, Any]:
+    """Cached immutable query results (e.g. consensus pubkey), loaded on first use"""
+    global _query_cache
+    with _query_cache_lock:
+        if _query_cache is None:
+            _query_cache = TRAFFIC.call('file', 'query_cache.json', _load_query_cache)
+        return _query_cache
+
+
+def _load_query_cache() -> Dict[str, Any]:
+    try:
+        if QUERY_CACHE_FILE.exists():
+            with open(QUERY_CACHE_FILE, 'r') as f:
+                return json.load(f)
     except Exception as e:
-        log_error(f"republicd error: {e}")
+        log_error("Failed to load query cache", error=str(e))
+    return {}
+
+
+def cache_consensus_pubkey(valoper: str, pubkey: Any) -> None:
+    """
+    Remember a validator's consensus pubkey (never changes). New entries
+    are merged into the file as it is now, keeping those other processes
+    added since this one loaded it.
+    """
+    if not valoper or not isinstance(pubkey, dict) or not pubkey.get('key'):
+        return
+    cache = load_query_cache()
+    with _query_cache_lock:
+        if cache.get('consensus_pubkey', {}).get(valoper) == pubkey:
+            return
+        cache.setdefault('consensus_pubkey', {})[valoper] = pubkey
+        on_disk = _load_query_cache()
+        on_disk.setdefault('consensus_pubkey', {})[valoper] = pubkey
+        atomic_write_json(QUERY_CACHE_FILE, on_disk)
+
+
+def cached_consensus_pubkey(valoper: str) -> Optional[Dict[str, Any]]:
+    """Cached consensus pubkey of a validator"""
+    return load_query_cache().get('consensus_pubkey', {}).get(valoper)
+
+
+# =============================================================================
+# CHAIN QUERIES (BACKENDS)
+# =============================================================================
+
+# Query name -> (republicd CLI args, LCD path); builders take the params dict
+# from query_params(). A None LCD path means "not available over LCD".
+CHAIN_QUERIES = {
+    'validator': (
+        lambda p: ['query', 'staking', 'validator', p['valoper'], '--output', 'json'],
+        lambda p: f"/cosmos/staking/v1beta1/validators/{p['valoper']}",
+    ),
+    'signing_info': (
+        lambda p: ['query', 'slashing', 'signing-info', p.get('cons_address') or p['valoper'], '--output', 'json'],
+        lambda p: f"/cosmos/slashing/v1beta1/signing_infos/{p['cons_address']}" if p.get('cons_address') else None,
+    ),
+    'balances': (
+        lambda p: ['query', 'bank', 'balances', p['wallet'], '--output', 'json'],
+        lambda p: f"/cosmos/bank/v1beta1/balances/{p['wallet']}",
+    ),
+    'delegations': (
+        lambda p: ['query', 'staking', 'delegations', p['wallet'], '--output', 'json'],
+        lambda p: f"/cosmos/staking/v1beta1/delegations/{p['wallet']}",
+    ),
+    'rewards': (
+        lambda p: ['query', 'distribution', 'rewards', p['wallet'], '--output', 'json'],
+        lambda p: f"/cosmos/distribution/v1beta1/delegators/{p['wallet']}/rewards",
+    ),
+    'commission': (
+        lambda p: ['query', 'distribution', 'commission', p['valoper'], '--output', 'json'],
+        lambda p: f"/cosmos/distribution/v1beta1/validators/{p['valoper']}/commission",
+    ),
+    'outstanding_rewards': (
+        lambda p: ['query', 'distribution', 'validator-outstanding-rewards', p['valoper'], '--output', 'json'],
+        lambda p: f"/cosmos/distribution/v1beta1/validators/{p['valoper']}/outstanding_rewards",
+    ),
+    'self_delegation': (
+        lambda p: ['query', 'staking', 'delegation', p['wallet'], p['valoper'], '--output', 'json'],
+        lambda p: f"/cosmos/staking/v1beta1/validators/{p['valoper']}/delegations/{p['wallet']}",
+    ),
+    'delegator_count': (
+        lambda p: ['query', 'staking', 'delegations-to', p['valoper'], '--limit', '1', '--count-total', '--output', 'json'],
+        lambda p: f"/cosmos/staking/v1beta1/validators/{p['valoper']}/delegations"
+                  "?pagination.limit=1&pagination.count_total=true",
+    ),
+}
+
+_grpc_unavailable = False
+
+
+class Target(NamedTuple):
+    """One monitored validator"""
+    valoper: str
+    wallet: str = ''
+    cons_address: str = ''
+
+
+def primary_target() -> Target:
+    """The validator configured by VALOPER/WALLET/CONSADDR"""
+    return Target(CONFIG.valoper or '', CONFIG.wallet or '', CONFIG.consaddr)
+
+
+def fleet_targets() -> list:
+    """Primary validator followed by FLEET_VALIDATORS (valoper[:wallet], comma separated)"""
+    targets = [primary_target()]
+    seen = {targets[0].valoper}
+    for entry in CONFIG.fleet_validators.replace(';', ',').split(','):
+        valoper, _, wallet = entry.strip().partition(':')
+        if valoper and valoper not in seen:
+            seen.add(valoper)
+            targets.append(Target(valoper, wallet))
+    return targets
+
+
+def query_params(cons_address: Optional[str] = None, target: Optional[Target] = None) -> Dict[str, str]:
+    """Parameters shared by all chain queries (of the primary validator by default)"""
+    target = target or primary_target()
+    return {
+        'valoper': target.valoper,
+        'wallet': target.wallet,
+        'denom': CONFIG.denom,
+        'cons_address': cons_address or target.cons_address,
+    }
+
+
+def _parse_cli_output(name: str, output: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode republicd JSON output to the query's slim shape"""
+    if not output:
+        return None
+    try:
+        return fast_json.decode(name, output)
+    except ValueError as e:
+        log_error("Failed to parse republicd JSON", query=name, error=str(e), raw=output[:500])
+        return None
+
+
+def _cli_query_many(calls: Dict[str, Tuple[str, Dict[str, str]]]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Run chain queries through the republicd worker pool"""
+    futures = {
+        key: republicd_query_async(CHAIN_QUERIES[name][0](params))
+        for key, (name, params) in calls.items()
+    }
+    results = {}
+    for key, future in futures.items():
+        name = calls[key][0]
+        output, seconds = future.result()
+        results[key] = _parse_cli_output(name, output)
+        record_query_timing('cli', name, seconds, results[key] is not None)
+    return results
+
+
+def _lcd_query(name: str, params: Dict[str, str],
+               session: Optional[requests.Session] = None) -> Optional[Dict[str, Any]]:
+    """Run one chain query over LCD"""
+    path = CHAIN_QUERIES[name][1](params)
+    if not path:
+        return None
+    started = time.monotonic()
+    result = lcd_get(path, session, name)
+    record_query_timing('lcd', name, time.monotonic() - started, result is not None)
+    return result
+
+
+def _grpc_client():
+    """Shared gRPC client, None if grpcio is missing or the channel cannot be built"""
+    global _grpc_unavailable
+    if _grpc_unavailable:
         return None
+    try:
+        import grpc_client
+        return grpc_client.get_client(CONFIG.grpc_url)
+    except ImportError:
+        log_error("grpcio not available, falling back to republicd CLI")
+    except Exception as e:
+        log_error("Failed to open gRPC channel", url=CONFIG.grpc_url, error=str(e))
+    _grpc_unavailable = True
+    return None
+
+
+def chain_query_many(calls: Dict[str, Tuple[str, Dict[str, str]]]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Run several chain queries {key: (query name, params)} on the configured
+    backend. Results have the republicd JSON shape; failed queries map to
+    None. Whatever the primary backend could not answer goes to the CLI.
+    
+    Backends (QUERY_BACKEND):
+      auto - LCD, concurrently over one keep-alive session
+      grpc - native gRPC, multiplexed over one persistent HTTP/2 channel
+      cli  - republicd only
+    """
+    results: Dict[str, Optional[Dict[str, Any]]] = {key: None for key in calls}
+    
+    if CONFIG.query_backend == 'grpc':
+        client = _grpc_client()
+        if client:
+            results.update(client.query_many(calls))
+            for key, seconds in client.last_timings.items():
+                record_query_timing('grpc', calls[key][0], seconds, results[key] is not None)
+    elif CONFIG.query_backend != 'cli' and calls:
+        workers = min(len(calls), LCD_MAX_CONCURRENCY)
+        with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                key: pool.submit(_lcd_query, name, params, session)
+                for key, (name, params) in calls.items()
+            }
+            results.update({key: future.result() for key, future in futures.items()})
+    
+    # Whatever is left goes to the republicd pool, in parallel
+    remaining = {key: call for key, call in calls.items() if results[key] is None}
+    if remaining:
+        results.update(_cli_query_many(remaining))
+    return results
+
+
+def chain_query(name: str, params: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+    """Run a single chain query on the configured backend"""
+    return chain_query_many({name: (name, params or query_params())})[name]
 
 
 # =============================================================================
 # DATA COLLECTION
 # =============================================================================
 
+# Node health queries, fetched together in one JSON-RPC batch
+NODE_HEALTH_CALLS = {
+    'status': ('status', {}),
+    'net_info': ('net_info', {}),
+    'mempool': ('num_unconfirmed_txs', {}),
+}
+
+
+def get_node_health() -> Dict[str, Optional[Dict[str, Any]]]:
+    """Node status (sync info), peers and mempool in a single round-trip"""
+    return rpc_batch(NODE_HEALTH_CALLS)
+
+
 def get_node_status() -> Optional[Dict[str, Any]]:
     """Get node status from RPC"""
     result = rpc_call('/status')
@@ -236,27 +745,82 @@ def get_node_status() -> Optional[Dict[str, Any]]:
     return None
 
 
-def get_validator_info() -> Optional[Dict[str, Any]]:
-    """Get validator info - CRITICAL: Must use VALOPER address"""
-    valoper = REQUIRED_VARS.get('VALOPER')
-    if not valoper:
-        log_error("VALOPER not configured")
-        return None
+def bech32_encode(hrp: str, data: bytes) -> str:
+    """Encode bytes as bech32 (BIP-173)"""
+    charset = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
     
-    # Query validator using VALOPER address
-    output = republicd_query(['query', 'staking', 'validator', valoper, '--output', 'json'])
-    if not output:
-        log_error(f"republicd query returned empty for validator: {valoper}")
+    def polymod(values):
+        generator = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
+        chk = 1
+        for value in values:
+            top = chk >> 25
+            chk = (chk & 0x1ffffff) << 5 ^ value
+            for i in range(5):
+                chk ^= generator[i] if ((top >> i) & 1) else 0
+        return chk
+    
+    # Convert 8-bit bytes to 5-bit groups
+    acc, bits, words = 0, 0, []
+    for byte in data:
+        acc = (acc << 8) | byte
+        bits += 8
+        while bits >= 5:
+            bits -= 5
+            words.append((acc >> bits) & 31)
+    if bits:
+        words.append((acc << (5 - bits)) & 31)
+    
+    expanded = [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+    checksum_value = polymod(expanded + words + [0] * 6) ^ 1
+    checksum = [(checksum_value >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + '1' + ''.join(charset[w] for w in words + checksum)
+
+
+def consensus_address_bytes(pubkey: Optional[Dict[str, Any]]) -> Optional[bytes]:
+    """20-byte consensus address of an ed25519 consensus pubkey"""
+    key = pubkey.get('key') if isinstance(pubkey, dict) else None
+    if not key or 'ed25519' not in str(pubkey.get('@type', 'ed25519')).lower():
+        return None
+    try:
+        return hashlib.sha256(base64.b64decode(key)).digest()[:20]
+    except Exception:
+        return None
+
+
+def get_consensus_address(pubkey: Optional[Dict[str, Any]], target: Optional[Target] = None) -> Optional[str]:
+    """Bech32 valcons address (CONSADDR, or derived from the consensus pubkey)"""
+    target = target or primary_target()
+    if target.cons_address:
+        return target.cons_address
+    address = consensus_address_bytes(pubkey)
+    valoper = target.valoper
+    if not address or 'valoper1' not in valoper:
+        return None
+    hrp = valoper.split('1', 1)[0].replace('valoper', 'valcons')
+    return bech32_encode(hrp, address)
+
+
+class ValidatorInfo(NamedTuple):
+    """Fields the monitor reads from a staking validator response"""
+    status: str
+    jailed: bool
+    tombstoned: bool
+    operator_address: str
+    moniker: str
+    consensus_pubkey: Optional[Dict[str, Any]]
+
+
+def parse_validator_info(response_data: Optional[Dict[str, Any]],
+                         valoper: Optional[str] = None) -> Optional[ValidatorInfo]:
+    """Extract validator info from a staking validator query response"""
+    valoper = valoper or CONFIG.valoper
+    if not response_data:
+        log_error("Chain query returned empty for validator", valoper=valoper)
         return None
     
     try:
-        if isinstance(output, str):
-            response_data = json.loads(output)
-        else:
-            response_data = output
-        
         if not isinstance(response_data, dict):
-            log_error(f"Validator query returned non-dict: {type(response_data)}")
+            log_error("Validator query returned non-dict", type=type(response_data).__name__)
             return None
         
         # Handle nested structure: response may be {"validator": {...}} or direct validator object
@@ -266,7 +830,7 @@ def get_validator_info() -> Optional[Dict[str, Any]]:
             validator_data = response_data
         
         if not isinstance(validator_data, dict):
-            log_error(f"Validator data is not a dict: {type(validator_data)}")
+            log_error("Validator data is not a dict", type=type(validator_data).__name__)
             return None
         
         # Extract raw status - check multiple possible keys
@@ -276,9 +840,12 @@ def get_validator_info() -> Optional[Dict[str, Any]]:
         mapped_status = map_bond_status(raw_status)
         
         # Extract other fields
-        jailed = validator_data.get('jailed', False)
-        tombstoned = validator_data.get('tombstoned', False)
         operator_address = validator_data.get('operator_address', valoper)
+        consensus_pubkey = validator_data.get('consensus_pubkey') or None
+        
+        # Consensus pubkey never changes, cache it so the next run can
+        # query signing info in the same batch as everything else
+        cache_consensus_pubkey(operator_address, consensus_pubkey)
         
         # Extract moniker from description
         description = validator_data.get('description', {})
@@ -287,269 +854,423 @@ def get_validator_info() -> Optional[Dict[str, Any]]:
         else:
             moniker = 'Unknown'
         
-        return {
-            'status': mapped_status,
-            'jailed': jailed,
-            'tombstoned': tombstoned,
-            'operator_address': operator_address,
-            'moniker': moniker,
-            **validator_data
-        }
-    except json.JSONDecodeError as e:
-        log_error(f"Failed to parse validator JSON: {e}")
-        log_error(f"Raw output (first 500 chars): {str(output)[:500]}")
+        return ValidatorInfo(
+            status=mapped_status,
+            jailed=bool(validator_data.get('jailed', False)),
+            tombstoned=bool(validator_data.get('tombstoned', False)),
+            operator_address=operator_address,
+            moniker=moniker,
+            consensus_pubkey=consensus_pubkey,
+        )
     except Exception as e:
-        log_error(f"Failed to process validator data: {e}")
         import traceback
-        log_error(traceback.format_exc())
+        log_error("Failed to process validator data", error=str(e), traceback=traceback.format_exc())
     
     return None
 
 
-def get_signing_info() -> Optional[Dict[str, Any]]:
+def get_validator_info() -> Optional[ValidatorInfo]:
+    """Get validator info - CRITICAL: Must use VALOPER address"""
+    if not CONFIG.valoper:
+        log_error("VALOPER not configured")
+        return None
+    return parse_validator_info(chain_query('validator'))
+
+
+def parse_signing_info(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Unwrap {"val_signing_info": {...}} (newer SDKs) to the plain signing info"""
+    if not isinstance(result, dict):
+        return None
+    return result.get('val_signing_info', result)
+
+
+def get_signing_info(validator: Optional[ValidatorInfo] = None,
+                     target: Optional[Target] = None) -> Optional[Dict[str, Any]]:
     """Get signing info for missed blocks and tombstoned status"""
     # Get validator pubkey first
-    validator = get_validator_info()
+    if validator is None:
+        validator = get_validator_info()
     if not validator:
         return None
     
     # Try to get consensus address from validator
-    consensus_pubkey = validator.get('consensus_pubkey', {})
+    consensus_pubkey = validator.consensus_pubkey
     if not consensus_pubkey:
         return None
     
-    # Query slashing signing-info
-    # Note: May need consensus address, try with operator address first
-    valoper = REQUIRED_VARS.get('VALOPER')
+    # Query slashing signing-info by consensus address (falls back to the
+    # operator address on the CLI when it cannot be derived)
     try:
-        output = republicd_query(['query', 'slashing', 'signing-info', valoper, '--output', 'json'])
-        if output:
-            if isinstance(output, str):
-                return json.loads(output)
-            return output
+        params = query_params(get_consensus_address(consensus_pubkey, target), target)
+        return parse_signing_info(chain_query('signing_info', params))
     except Exception as e:
-        log_error(f"Failed to get signing info: {e}")
+        log_error("Failed to get signing info", error=str(e))
     
     return None
 
 
-def get_wallet_balance() -> int:
-    """Get wallet balance"""
-    wallet = REQUIRED_VARS.get('WALLET')
-    if not wallet:
-        return 0
-    
-    output = republicd_query(['query', 'bank', 'balances', wallet, '--output', 'json'])
-    if not output:
-        return 0
-    
+def parse_wallet_balance(result: Optional[Dict[str, Any]]) -> int:
+    """Extract DENOM balance from a bank balances response"""
     try:
-        if isinstance(output, str):
-            result = json.loads(output)
-        else:
-            result = output
-        
         if isinstance(result, dict) and 'balances' in result:
             for balance in result['balances']:
-                if isinstance(balance, dict) and balance.get('denom') == DENOM:
+                if isinstance(balance, dict) and balance.get('denom') == CONFIG.denom:
                     try:
                         return int(balance.get('amount', '0'))
                     except (ValueError, TypeError):
                         return 0
     except Exception as e:
-        log_error(f"Failed to parse balance: {e}")
+        log_error("Failed to parse balance", error=str(e))
     
     return 0
 
 
-def get_delegated_balance() -> int:
-    """Get delegated balance"""
-    wallet = REQUIRED_VARS.get('WALLET')
-    if not wallet:
-        return 0
-    
-    output = republicd_query(['query', 'staking', 'delegations', wallet, '--output', 'json'])
-    if not output:
+def get_wallet_balance() -> int:
+    """Get wallet balance"""
+    if not CONFIG.wallet:
         return 0
-    
+    return parse_wallet_balance(chain_query('balances'))
+
+
+def parse_delegated_balance(result: Optional[Dict[str, Any]]) -> int:
+    """Sum DENOM balances of a delegations response"""
     try:
-        if isinstance(output, str):
-            result = json.loads(output)
-        else:
-            result = output
-        
         total = 0
         if isinstance(result, dict):
             delegations = result.get('delegation_responses', [])
             for delegation in delegations:
                 if isinstance(delegation, dict):
                     balance = delegation.get('balance', {})
-                    if isinstance(balance, dict) and balance.get('denom') == DENOM:
+                    if isinstance(balance, dict) and balance.get('denom') == CONFIG.denom:
                         try:
                             total += int(balance.get('amount', '0'))
                         except (ValueError, TypeError):
                             continue
         return total
     except Exception as e:
-        log_error(f"Failed to parse delegations: {e}")
+        log_error("Failed to parse delegations", error=str(e))
     
     return 0
 
 
-def get_rewards() -> int:
-    """Get pending rewards"""
-    wallet = REQUIRED_VARS.get('WALLET')
-    if not wallet:
-        return 0
-    
-    output = republicd_query(['query', 'distribution', 'rewards', wallet, '--output', 'json'])
-    if not output:
+def get_delegated_balance() -> int:
+    """Get delegated balance"""
+    if not CONFIG.wallet:
         return 0
-    
+    return parse_delegated_balance(chain_query('delegations'))
+
+
+def parse_rewards(result: Optional[Dict[str, Any]]) -> int:
+    """Sum DENOM pending rewards of a delegator rewards response"""
     try:
-        if isinstance(output, str):
-            result = json.loads(output)
-        else:
-            result = output
-        
-        total = 0
         if isinstance(result, dict):
-            rewards_list = result.get('total', [])
-            for reward in rewards_list:
-                if isinstance(reward, dict) and reward.get('denom') == DENOM:
-                    amount = reward.get('amount', '0')
-                    try:
-                        if isinstance(amount, str):
-                            amount = amount.split('.')[0]
-                        total += int(amount)
-                    except (ValueError, TypeError):
-                        continue
-        return total
+            return sum_denom(result.get('total', []))
     except Exception as e:
-        log_error(f"Failed to parse rewards: {e}")
+        log_error("Failed to parse rewards", error=str(e))
     
     return 0
 
 
-def format_balance(amount: int) -> str:
-    """Format balance with decimals"""
-    if amount == 0:
-        return "0.00"
-    balance = amount / (10 ** DECIMALS)
-    return f"{balance:.2f}"
+def get_rewards() -> int:
+    """Get pending rewards"""
+    if not CONFIG.wallet:
+        return 0
+    return parse_rewards(chain_query('rewards'))
+
+
+def sum_denom(coins: Any) -> int:
+    """Sum (Dec)Coins of DENOM, truncating fractional amounts"""
+    total = 0
+    if isinstance(coins, list):
+        for coin in coins:
+            if isinstance(coin, dict) and coin.get('denom') == CONFIG.denom:
+                try:
+                    total += int(str(coin.get('amount', '0')).split('.')[0])
+                except (ValueError, TypeError):
+                    continue
+    return total
+
+
+def _unwrap(data: Any, key: str) -> Any:
+    """Unwrap {key: {key: value}} / {key: value} shapes that differ between SDK versions"""
+    while isinstance(data, dict) and key in data:
+        data = data[key]
+    return data
+
+
+DISTRIBUTION_QUERIES = ('commission', 'outstanding_rewards', 'self_delegation', 'delegator_count')
+
+
+def parse_distribution_info(results: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, int]:
+    """Extract commission, outstanding rewards, self-delegation and delegator count"""
+    info = {'commission': 0, 'outstanding_rewards': 0, 'self_delegation': 0, 'delegator_count': 0}
+    try:
+        if results.get('commission'):
+            info['commission'] = sum_denom(_unwrap(results['commission'], 'commission'))
+        if results.get('outstanding_rewards'):
+            info['outstanding_rewards'] = sum_denom(_unwrap(results['outstanding_rewards'], 'rewards'))
+        if results.get('self_delegation'):
+            response = results['self_delegation'].get('delegation_response', results['self_delegation'])
+            info['self_delegation'] = sum_denom([response.get('balance')])
+        if results.get('delegator_count'):
+            total = (results['delegator_count'].get('pagination') or {}).get('total', 0)
+            info['delegator_count'] = int(total or 0)
+    except Exception as e:
+        log_error("Failed to parse distribution info", error=str(e))
+    return info
+
+
+def get_distribution_info() -> Dict[str, int]:
+    """
+    Fetch commission, outstanding rewards, self-delegation and delegator
+    count in one batched pass on the configured backend.
+    """
+    params = query_params()
+    if not params['valoper']:
+        return parse_distribution_info({})
+    names = [name for name in DISTRIBUTION_QUERIES if params['wallet'] or name != 'self_delegation']
+    return parse_distribution_info(chain_query_many({name: (name, params) for name in names}))
+
+
+def format_balance(amount: int, places: int = 2) -> str:
+    """Format balance with decimals (fixed-point, no float division)"""
+    return format_amount(amount, CONFIG.decimals, places)
 
 
 # =============================================================================
 # MONITORING LOGIC
 # =============================================================================
 
-def collect_metrics() -> Dict[str, Any]:
-    """Collect all monitoring metrics"""
-    metrics = {
-        'timestamp': datetime.utcnow().isoformat(),
-        'height': 0,
-        'catching_up': True,
-        'validator_status': 'UNKNOWN',
-        'jailed': False,
-        'tombstoned': False,
-        'missed_blocks': 0,
-        'wallet_balance': 0,
-        'delegated_balance': 0,
-        'rewards': 0,
-        'moniker': 'Unknown',
-    }
+def metrics_queries(target: Target) -> Dict[str, Tuple[str, Dict[str, str]]]:
+    """
+    Chain queries of one validator check, {query name: (name, params)}.
+    Signing info is included when the consensus address is configured or
+    derivable from the cached pubkey, otherwise it needs the pubkey first.
+    """
+    cached_pubkey = cached_consensus_pubkey(target.valoper)
+    cons_address = get_consensus_address(cached_pubkey, target) if cached_pubkey else None
+    params = query_params(cons_address, target)
+    names = ['validator', 'commission', 'outstanding_rewards', 'delegator_count']
+    if params['wallet']:
+        names += ['balances', 'delegations', 'rewards', 'self_delegation']
+    if params['cons_address']:
+        names.append('signing_info')
+    return {name: (name, params) for name in names}
+
+
+def collect_metrics(target: Optional[Target] = None) -> Metrics:
+    """Collect all monitoring metrics (of the primary validator by default)"""
+    target = target or primary_target()
+    
+    # All chain queries of this check in one batch: concurrent on LCD,
+    # multiplexed over one channel on gRPC
+    results = chain_query_many(metrics_queries(target))
+    return build_metrics(target, results, get_node_health())
+
+
+def collect_fleet_metrics(targets: list,
+                          node_health: Optional[Dict[str, Optional[Dict[str, Any]]]] = None) -> list:
+    """
+    Collect metrics of every target with one chain query batch for the
+    whole fleet and a single node health batch (unless node_health is
+    given). Returns Metrics in target order.
+    """
+    calls = {}
+    for index, target in enumerate(targets):
+        for name, call in metrics_queries(target).items():
+            calls[f"{index}/{name}"] = call
+    results = chain_query_many(calls)
+    if node_health is None:
+        node_health = get_node_health()
+    
+    fleet = []
+    for index, target in enumerate(targets):
+        prefix = f"{index}/"
+        own = {key[len(prefix):]: value for key, value in results.items() if key.startswith(prefix)}
+        fleet.append(build_metrics(target, own, node_health))
+    return fleet
+
+
+def build_metrics(target: Target, results: Dict[str, Optional[Dict[str, Any]]],
+                  node_health: Dict[str, Optional[Dict[str, Any]]]) -> Metrics:
+    """Turn one validator's query results plus node health into a Metrics record"""
+    metrics = Metrics(timestamp=datetime.utcfromtimestamp(TRAFFIC.now()).isoformat())
     
     # Node status
-    node_status = get_node_status()
+    node_status = node_health.get('status')
     if node_status:
         sync_info = node_status.get('sync_info', {})
-        metrics['catching_up'] = sync_info.get('catching_up', True)
+        metrics.catching_up = sync_info.get('catching_up', True)
         try:
-            metrics['height'] = int(sync_info.get('latest_block_height', 0))
+            metrics.height = int(sync_info.get('latest_block_height', 0))
         except (ValueError, TypeError):
-            metrics['height'] = 0
+            metrics.height = 0
+    
+    # Peers and mempool
+    try:
+        net_info = node_health.get('net_info')
+        if net_info:
+            metrics.peers = int(net_info.get('n_peers', 0))
+        mempool = node_health.get('mempool')
+        if mempool:
+            metrics.mempool_txs = int(mempool.get('total', mempool.get('n_txs', 0)))
+            metrics.mempool_bytes = int(mempool.get('total_bytes', 0))
+    except (ValueError, TypeError):
+        pass
     
     # Validator info - CRITICAL
-    validator = get_validator_info()
+    validator = parse_validator_info(results.get('validator'), target.valoper)
     if validator:
-        # Status should already be mapped in get_validator_info()
-        mapped_status = validator.get('status', 'UNKNOWN')
+        # Status should already be mapped in parse_validator_info()
+        mapped_status = validator.status
         # Double-check mapping (defensive)
         if mapped_status and mapped_status not in ['BONDED', 'UNBONDING', 'UNBONDED']:
             # If somehow not mapped, try to map it
             mapped_status = map_bond_status(mapped_status)
         
-        metrics['validator_status'] = mapped_status
-        metrics['jailed'] = validator.get('jailed', False)
-        metrics['tombstoned'] = validator.get('tombstoned', False)
-        metrics['moniker'] = validator.get('moniker', 'Unknown')
+        metrics.validator_status = mapped_status
+        metrics.jailed = validator.jailed
+        metrics.tombstoned = validator.tombstoned
+        metrics.moniker = validator.moniker
         
         # Debug logging
         if mapped_status == 'UNKNOWN':
-            log_error(f"WARNING: Validator status is UNKNOWN. Raw validator data: {json.dumps(validator, indent=2)[:500]}")
+            EVENTS.warning("Validator status is UNKNOWN", valoper=validator.operator_address,
+                           moniker=validator.moniker, jailed=validator.jailed)
     else:
-        log_error("CRITICAL: Failed to get validator info - status will be UNKNOWN")
-        log_error(f"VALOPER configured: {REQUIRED_VARS.get('VALOPER', 'NOT SET')}")
+        EVENTS.critical("Failed to get validator info, status will be UNKNOWN", valoper=target.valoper or 'NOT SET')
     
     # Signing info (for missed blocks and tombstoned)
-    signing_info = get_signing_info()
+    if 'signing_info' in results:
+        signing_info = parse_signing_info(results['signing_info'])
+    else:
+        signing_info = get_signing_info(validator, target) if validator else None
     if signing_info:
         try:
             missed = signing_info.get('missed_blocks_counter', '0')
-            metrics['missed_blocks'] = int(missed)
+            metrics.missed_blocks = int(missed)
         except (ValueError, TypeError):
-            metrics['missed_blocks'] = 0
+            metrics.missed_blocks = 0
         
         # Check tombstoned from signing info if not set
-        if not metrics['tombstoned']:
-            metrics['tombstoned'] = signing_info.get('tombstoned', False)
+        if not metrics.tombstoned:
+            metrics.tombstoned = signing_info.get('tombstoned', False)
     
     # Balances
-    metrics['wallet_balance'] = get_wallet_balance()
-    metrics['delegated_balance'] = get_delegated_balance()
-    metrics['rewards'] = get_rewards()
+    metrics.wallet_balance = parse_wallet_balance(results.get('balances'))
+    metrics.delegated_balance = parse_delegated_balance(results.get('delegations'))
+    metrics.rewards = parse_rewards(results.get('rewards'))
+    
+    # Commission, outstanding rewards, self-delegation, delegators
+    for name, value in parse_distribution_info(results).items():
+        setattr(metrics, name, value)
     
     return metrics
 
 
-def determine_alert_level(metrics: Dict[str, Any], state: Dict[str, Any]) -> Tuple[str, bool]:
+def update_reward_accounting(metrics: Metrics, state: Dict[str, Any]) -> None:
     """
-    Determine alert level: HEALTHY, WARNING, ALERT, FATAL
-    Returns: (level, should_send)
-    """
-    status = metrics.get('validator_status', 'UNKNOWN')
-    jailed = metrics.get('jailed', False)
-    tombstoned = metrics.get('tombstoned', False)
-    catching_up = metrics.get('catching_up', True)
+    Turn pending rewards (which reset on every withdrawal) into a continuous
+    accrued total and accrual rate. O(1) per sample, kept in state.
     
-    # FATAL: Tombstoned
-    if tombstoned:
-        return 'FATAL', True
+    A withdrawal is a drop in pending rewards. If the wallet grew at the same
+    time, the growth beyond the last seen pending amount accrued between the
+    two samples; otherwise (e.g. restake) only the new pending amount counts.
+    """
+    acct = state.get('rewards_acct')
+    rewards = metrics.rewards
+    wallet = metrics.wallet_balance
+    height = metrics.height
+    now = iso_to_epoch(metrics.timestamp)
     
-    # ALERT: Jailed
-    if jailed:
-        return 'ALERT', True
+    metrics.withdrawal_detected = False
+    if not acct:
+        state['rewards_acct'] = {
+            'rewards': rewards, 'wallet': wallet, 'height': height, 'ts': now,
+            'accrued': 0, 'rate_hour': 0.0, 'rate_block': 0.0, 'withdrawals': 0,
+        }
+        metrics.accrued_rewards = 0
+        metrics.reward_rate_hour = 0.0
+        metrics.reward_rate_block = 0.0
+        return
     
-    # ALERT: Missed blocks increasing
-    last_missed = state.get('last_missed_blocks', 0)
-    current_missed = metrics.get('missed_blocks', 0)
-    if current_missed > last_missed:
-        return 'ALERT', True
+    delta_rewards = rewards - acct['rewards']
+    delta_wallet = wallet - acct['wallet']
+    hours = max(0.0, (now - acct['ts']) / 3600)
+    blocks = max(0, height - acct['height'])
     
-    # WARNING: UNBONDING
-    if status == 'UNBONDING':
-        return 'WARNING', True
+    if delta_rewards >= 0:
+        accrued = delta_rewards
+    elif rewards == 0 and delta_wallet <= 0:
+        # Failed query (get_rewards() returns 0), keep the previous baseline
+        metrics.accrued_rewards = acct['accrued']
+        metrics.reward_rate_hour = acct['rate_hour']
+        metrics.reward_rate_block = acct['rate_block']
+        return
+    else:
+        metrics.withdrawal_detected = True
+        acct['withdrawals'] = acct.get('withdrawals', 0) + 1
+        extra = max(0, delta_wallet - acct['rewards'])
+        if acct['rate_hour'] > 0:
+            # Wallet growth can include transfers, cap at twice the usual accrual
+            extra = min(extra, int(acct['rate_hour'] * hours * 2))
+        accrued = extra + rewards
     
-    # WARNING: Catching up
-    if catching_up:
-        return 'WARNING', True
+    # Exponentially weighted rate, smooths hourly jitter
+    if hours > 0:
+        rate = accrued / hours
+        acct['rate_hour'] = rate if acct['rate_hour'] == 0 else \
+            REWARD_RATE_ALPHA * rate + (1 - REWARD_RATE_ALPHA) * acct['rate_hour']
+    if blocks > 0:
+        rate = accrued / blocks
+        acct['rate_block'] = rate if acct['rate_block'] == 0 else \
+            REWARD_RATE_ALPHA * rate + (1 - REWARD_RATE_ALPHA) * acct['rate_block']
     
-    # HEALTHY: BONDED, not jailed, not catching up
-    if status == 'BONDED' and not jailed and not catching_up:
-        return 'HEALTHY', False
+    acct['accrued'] += accrued
+    acct.update({'rewards': rewards, 'wallet': wallet, 'height': height, 'ts': now})
     
-    # Default to WARNING if status unclear
-    return 'WARNING', True
+    metrics.accrued_rewards = acct['accrued']
+    metrics.reward_rate_hour = acct['rate_hour']
+    metrics.reward_rate_block = acct['rate_block']
+
+
+def node_data_dir() -> Path:
+    """Directory whose filesystem holds the chain data"""
+    data_dir = CONFIG.republic_home / 'data'
+    return data_dir if data_dir.exists() else CONFIG.republic_home
+
+
+def update_host_metrics(metrics: Metrics, state: Dict[str, Any]) -> None:
+    """
+    Sample this host (/proc, statvfs) into metrics. Disk growth and node CPU
+    are trends against the previous sample, kept in state['host'].
+    """
+    trend = state.setdefault('host', {})
+    try:
+        host = host_probe.HostSample(*TRAFFIC.call(
+            'host', 'sample', lambda: host_probe.sample(node_data_dir(), CONFIG.node_process, trend.get('node_pid', 0))))
+    except Exception as e:
+        log_error("Failed to sample host metrics", error=str(e))
+        return
+    growth, hours_to_full, cpu_percent = host_probe.update_trends(trend, host, iso_to_epoch(metrics.timestamp))
+    metrics.disk_total = host.disk_total
+    metrics.disk_free = host.disk_free
+    metrics.disk_growth_hour = growth
+    metrics.disk_full_hours = hours_to_full
+    metrics.node_rss = host.node_rss
+    metrics.node_cpu_pct = cpu_percent
+    metrics.node_fds = host.node_fds
+    metrics.load1 = host.load1
+    metrics.mem_available = host.mem_available
+
+
+def estimate_apr(metrics: MetricsLike) -> float:
+    """Annualized reward rate in percent of delegated stake"""
+    metrics = as_metrics(metrics)
+    delegated = metrics.delegated_balance
+    if delegated <= 0:
+        return 0.0
+    return metrics.reward_rate_hour * 24 * 365 / delegated * 100
 
 
 def should_send_heartbeat(state: Dict[str, Any]) -> bool:
@@ -558,261 +1279,1393 @@ def should_send_heartbeat(state: Dict[str, Any]) -> bool:
     if last_heartbeat == 0:
         return True
     
-    hours_since = (time.time() - last_heartbeat) / 3600
-    return hours_since >= HEARTBEAT_HOURS
+    hours_since = (TRAFFIC.now() - last_heartbeat) / 3600
+    return hours_since >= CONFIG.heartbeat_hours
 
 
 # =============================================================================
-# TELEGRAM MESSAGE FORMATTING
+# ALERT ENGINE
 # =============================================================================
 
-def format_healthy_message(metrics: Dict[str, Any]) -> str:
-    """Format HEALTHY status message"""
-    moniker = metrics.get('moniker', 'Unknown')
-    status = metrics.get('validator_status', 'UNKNOWN')
-    height = metrics.get('height', 0)
-    missed = metrics.get('missed_blocks', 0)
-    
-    message = f"🟢 RAI VALIDATOR STATUS — HEALTHY\n"
-    message += f"📛 Moniker: {moniker}\n\n"
-    message += "Validator:\n"
-    message += f" • 🔓 Status : {status}\n"
-    message += f" • 🔒 Jailed : No\n"
-    message += f" • ⚰️  Tombstoned : No\n\n"
-    message += "Node:\n"
-    message += f" • ✅ Sync   : OK\n"
-    message += f" • 📊 Height : {height:,}\n"
-    message += f" • ⚠️  Missed : {missed}\n\n"
-    message += "Balance:\n"
-    message += f" • 💰 Wallet    : {format_balance(metrics.get('wallet_balance', 0))} RAI\n"
-    message += f" • 🔐 Delegated : {format_balance(metrics.get('delegated_balance', 0))} RAI\n"
-    message += f" • 🎁 Rewards   : {format_balance(metrics.get('rewards', 0))} RAI\n\n"
-    
-    wib_time = datetime.utcnow() + timedelta(hours=7)
-    message += f"🕒 {wib_time.strftime('%Y-%m-%d %H:%M')} WIB"
-    
-    return message
-
-
-def format_warning_message(metrics: Dict[str, Any]) -> str:
-    """Format WARNING status message"""
-    moniker = metrics.get('moniker', 'Unknown')
-    status = metrics.get('validator_status', 'UNKNOWN')
-    catching_up = metrics.get('catching_up', True)
-    height = metrics.get('height', 0)
-    
-    message = f"🟡 RAI VALIDATOR WARNING\n"
-    message += f"📛 Moniker: {moniker}\n\n"
-    message += "Validator:\n"
-    message += f" • 🔓 Status : {status}\n"
-    message += f" • 🔒 Jailed : No\n\n"
-    message += "Node:\n"
-    sync_text = "Catching Up" if catching_up else "OK"
-    sync_emoji = "⏳" if catching_up else "✅"
-    message += f" • {sync_emoji} Sync   : {sync_text}\n"
-    message += f" • 📊 Height : {height:,}\n\n"
-    
-    wib_time = datetime.utcnow() + timedelta(hours=7)
-    message += f"🕒 Detected: {wib_time.strftime('%Y-%m-%d %H:%M')} WIB"
-    
-    return message
+# Condition -> rule. Hysteresis (clear_after) keeps flapping conditions firing
+# quietly instead of re-alerting; reminders repeat until acknowledged.
+def alert_rules(cfg: config.Config) -> Dict[str, Rule]:
+    """Rules with the configured timings"""
+    return {
+        'tombstoned': Rule('FATAL', remind_every=24 * 3600),
+        'jailed': Rule('ALERT', remind_every=cfg.alert_remind_hours * 3600),
+        'missed_rising': Rule('ALERT', clear_after=cfg.alert_clear_minutes * 60,
+                              remind_every=cfg.alert_remind_hours * 3600),
+        'stuck_height': Rule('ALERT', clear_after=cfg.alert_clear_minutes * 60,
+                             remind_every=cfg.alert_remind_hours * 3600),
+        'catching_up': Rule('WARNING', raise_after=cfg.alert_min_minutes * 60,
+                            clear_after=cfg.alert_clear_minutes * 60,
+                            escalate_after=cfg.alert_escalate_hours * 3600, escalate_to='ALERT'),
+        'not_bonded': Rule('WARNING', raise_after=cfg.alert_min_minutes * 60,
+                           escalate_after=cfg.alert_escalate_hours * 3600, escalate_to='ALERT'),
+        'disk_filling': Rule('ALERT', raise_after=cfg.alert_min_minutes * 60,
+                             clear_after=cfg.alert_clear_minutes * 60,
+                             remind_every=cfg.alert_remind_hours * 3600),
+    }
 
 
-def format_alert_message(metrics: Dict[str, Any]) -> str:
-    """Format ALERT status message"""
-    moniker = metrics.get('moniker', 'Unknown')
-    status = metrics.get('validator_status', 'UNKNOWN')
-    jailed = metrics.get('jailed', False)
-    missed = metrics.get('missed_blocks', 0)
+ALERT_RULES = alert_rules(CONFIG)
+
+CONDITION_LABELS = {
+    'tombstoned': 'Tombstoned',
+    'jailed': 'Jailed',
+    'missed_rising': 'Missed blocks rising',
+    'stuck_height': 'Block height stuck',
+    'catching_up': 'Node catching up',
+    'not_bonded': 'Not bonded',
+    'disk_filling': 'Disk filling up',
+}
+
+
+def open_alert_engine(state: Dict[str, Any]) -> AlertEngine:
+    """Alert engine over state['alerts'], rebuilt from the event log if the snapshot is missing"""
+    if 'alerts' not in state:
+        state['alerts'] = AlertEngine.replay(ALERT_EVENTS_FILE, ALERT_RULES).snapshot
+    return AlertEngine(state['alerts'], ALERT_RULES, ALERT_EVENTS_FILE)
+
+
+def apply_acknowledgements(engine: AlertEngine, targets: list, now: float) -> None:
+    """Apply /ack requests queued by the bot to the matching validators"""
+    try:
+        acks = TRAFFIC.call('file', 'silences.json acks', lambda: silences.take_acks(SILENCES_FILE))
+    except Exception as e:
+        log_error("Failed to read acknowledgements", error=str(e))
+        return
+    for ack in acks:
+        condition = None if ack.get('condition', silences.ANY) == silences.ANY else ack['condition']
+        for target in targets:
+            if ack.get('validator', silences.ANY) in (silences.ANY, target.valoper):
+                engine.acknowledge(target.valoper, condition, now, fired_before=ack.get('ts', now))
+
+
+def unsilenced(result: 'FleetResult', active_silences: list) -> 'FleetResult':
+    """Result with the events covered by an active silence removed"""
+    if not active_silences:
+        return result
+    events = [event for event in result.events
+              if not silences.is_silenced(active_silences, event.validator, event.condition)]
+    return result._replace(events=events)
+
+
+def unsilenced_level(active: Dict[str, str], validator: str, active_silences: list) -> str:
+    """Highest level among firing conditions (condition -> level) not covered by a silence"""
+    levels = [level for condition, level in active.items()
+              if not silences.is_silenced(active_silences, validator, condition)]
+    return max(levels, key=LEVEL_RANK.__getitem__, default='HEALTHY')
+
+
+def alert_observations(metrics: Metrics, member_state: Dict[str, Any], now: float) -> Dict[str, bool]:
+    """
+    Conditions observed in this sample. Keeps the height tracker in
+    member_state; last_missed_blocks/last_height are the previous sample.
+    """
+    if metrics.height and metrics.height != member_state.get('last_height'):
+        member_state['height_changed_at'] = now
+    stalled_for = now - member_state.setdefault('height_changed_at', now)
     
-    if jailed:
-        message = f"🔴 RAI VALIDATOR ALERT — JAILED\n"
-    else:
-        message = f"🔴 RAI VALIDATOR ALERT\n"
+    return {
+        'tombstoned': metrics.tombstoned,
+        'jailed': metrics.jailed,
+        'missed_rising': metrics.missed_blocks > member_state.get('last_missed_blocks', metrics.missed_blocks),
+        'stuck_height': stalled_for >= CONFIG.stuck_minutes * 60,
+        'catching_up': metrics.catching_up,
+        'not_bonded': metrics.validator_status != 'BONDED',
+        'disk_filling': disk_filling(metrics),
+    }
+
+
+def disk_filling(metrics: Metrics) -> bool:
+    """Data disk below DISK_MIN_FREE_PCT, or predicted full within DISK_FULL_HOURS"""
+    if not metrics.disk_total:
+        return False
+    free_pct = metrics.disk_free / metrics.disk_total * 100
+    return free_pct < CONFIG.disk_min_free_pct or 0 < metrics.disk_full_hours < CONFIG.disk_full_hours
+
+
+def format_duration(seconds: float) -> str:
+    """Short duration like '2h 15m' or '3d 4h'"""
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 1440)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+# =============================================================================
+# TELEGRAM MESSAGE FORMATTING
+# =============================================================================
+
+MESSAGE_TEMPLATES = templates.compile_templates({
+    'HEALTHY': """\
+# 🟢 RAI VALIDATOR STATUS — HEALTHY
+📛 Moniker: {moniker}
+
+Validator:
+ • 🔓 Status : {status}
+ • 🔒 Jailed : No
+ • ⚰️  Tombstoned : No
+
+Node:
+ • ✅ Sync   : OK
+ • 📊 Height : {height}
+ • ⚠️  Missed : {missed}
+
+Balance:
+ • 💰 Wallet    : {wallet} RAI
+ • 🔐 Delegated : {delegated} RAI
+ • 🎁 Rewards   : {rewards} RAI
+
+🕒 {time}""",
+
+    'WARNING': """\
+# 🟡 RAI VALIDATOR WARNING
+📛 Moniker: {moniker}
+
+Validator:
+ • 🔓 Status : {status}
+ • 🔒 Jailed : No
+
+Node:
+ • {sync_emoji} Sync   : {sync_text}
+ • 📊 Height : {height}
+
+🕒 Detected: {time}""",
+
+    'ALERT': """\
+# 🔴 RAI VALIDATOR ALERT{alert_suffix}
+📛 Moniker: {moniker}
+
+Validator:
+ • 🔓 Status : {status}
+ • {jailed_emoji} Jailed : {jailed_text}
+
+Node:
+ • 🛑 Sync   : STOPPED
+ • ⚠️  Missed : {missed} blocks
+
+🕒 Detected: {time}""",
+
+    'FATAL': """\
+# ☠️ RAI VALIDATOR FATAL — TOMBSTONED
+📛 Moniker: {moniker}
+
+Validator:
+ • ⚰️  Tombstoned : YES
+ • 🔓 Status     : {status}
+
+🚨 Validator permanently slashed
+Recovery impossible
+
+🕒 Detected: {time}""",
+
+    'DISK': """\
+# 💾 DISK FILLING UP
+ • 💽 Free    : {disk_free} of {disk_total} ({disk_free_pct})
+ • 📈 Growth  : {disk_growth}/h
+ • ⏳ Full in : {disk_full_in}""",
+
+    'REMINDER': """\
+# 🔁 REMINDER — {conditions}
+Active for {duration}, reminder #{count}. Use /ack to stop reminders.""",
+
+    'RESOLVED': """\
+# ✅ RAI VALIDATOR RESOLVED
+📛 Moniker: {moniker}
+ • Cleared: {conditions}
+
+🕒 {time}""",
+
+    'FULL_INFO': """\
+# 📊 RAI VALIDATOR — FULL STATUS REPORT
+📛 Moniker: {moniker}
+
+Validator:
+ • 🔓 Status : {status}
+ • {jailed_emoji} Jailed : {jailed_text}
+ • {tombstoned_emoji} Tombstoned : {tombstoned_text}
+ • 💼 Commission  : {commission} RAI
+ • 🏦 Outstanding : {outstanding} RAI
+ • 🪙 Self-bond   : {self_bond} RAI
+ • 👥 Delegators  : {delegators}
+
+Node:
+ • {sync_emoji} Sync   : {sync_text}
+ • 📊 Height : {height}
+ • ⚠️  Missed : {missed} blocks
+ • 🌐 Peers  : {peers}
+ • 📥 Mempool: {mempool_txs} txs ({mempool_size})
+
+Host:
+ • 💽 Disk   : {disk_free} free ({disk_free_pct}), full in {disk_full_in}
+ • 🧠 Node   : {node_rss} RSS, {node_cpu} CPU, {node_fds} fds
+ • ⚙️  Load   : {load1}, {mem_available} RAM available
+
+Balance:
+ • 💰 Wallet    : {wallet} RAI
+ • 🔐 Delegated : {delegated} RAI
+ • 🎁 Rewards   : {rewards} RAI
+ • 📈 Accrual   : {accrual} RAI/h (APR ~{apr})
+
+🕒 {time}""",
+})
+
+def display_locale(cfg: config.Config) -> templates.Locale:
+    """Number/date formatting of the configured locale and timezone"""
+    try:
+        return templates.Locale(cfg.display_locale, cfg.display_tz, cfg.display_tz_label or None)
+    except Exception as e:
+        print(f"[ERROR] Invalid DISPLAY_TZ {cfg.display_tz!r} ({e}), using UTC+7", file=sys.stderr)
+        return templates.Locale(cfg.display_locale, 'UTC+7', cfg.display_tz_label or 'WIB')
+
+
+DISPLAY = display_locale(CONFIG)
+
+
+def display_time(now: Optional[datetime] = None) -> str:
+    """Timestamp in the display locale, by default now (on the recording's clock in a replay)"""
+    return DISPLAY.timestamp(now or datetime.fromtimestamp(TRAFFIC.now(), timezone.utc))
+
+
+def display_amount(amount: int, places: int = 2) -> str:
+    """format_balance() with the display locale's decimal mark"""
+    return DISPLAY.decimal_text(format_balance(amount, places))
+
+
+def message_context(metrics: MetricsLike, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Display values shared by all message templates"""
+    metrics = as_metrics(metrics)
+    return {
+        'moniker': metrics.moniker,
+        'status': metrics.validator_status,
+        'height': DISPLAY.number(metrics.height),
+        'missed': str(metrics.missed_blocks),  # never grouped in status messages
+        'jailed_emoji': "🔴" if metrics.jailed else "🔒",
+        'jailed_text': 'YES' if metrics.jailed else 'No',
+        'tombstoned_emoji': "⚰️" if metrics.tombstoned else "✅",
+        'tombstoned_text': 'YES' if metrics.tombstoned else 'No',
+        'sync_emoji': "⏳" if metrics.catching_up else "✅",
+        'sync_text': "Catching Up" if metrics.catching_up else "OK",
+        'alert_suffix': " — JAILED" if metrics.jailed else "",
+        'wallet': display_amount(metrics.wallet_balance),
+        'delegated': display_amount(metrics.delegated_balance),
+        'rewards': display_amount(metrics.rewards),
+        'commission': display_amount(metrics.commission),
+        'outstanding': display_amount(metrics.outstanding_rewards),
+        'self_bond': display_amount(metrics.self_delegation),
+        'delegators': DISPLAY.number(metrics.delegator_count),
+        'peers': DISPLAY.number(metrics.peers),
+        'mempool_txs': DISPLAY.number(metrics.mempool_txs),
+        'mempool_size': format_bytes(metrics.mempool_bytes),
+        'disk_free': format_bytes(metrics.disk_free),
+        'disk_total': format_bytes(metrics.disk_total),
+        'disk_free_pct': (DISPLAY.decimal_text(f"{metrics.disk_free / metrics.disk_total * 100:.1f}%")
+                          if metrics.disk_total else 'n/a'),
+        'disk_growth': format_bytes(max(0, int(metrics.disk_growth_hour))),
+        'disk_full_in': format_duration(metrics.disk_full_hours * 3600) if metrics.disk_full_hours else 'n/a',
+        'node_rss': format_bytes(metrics.node_rss),
+        'node_cpu': DISPLAY.decimal_text(f"{metrics.node_cpu_pct:.1f}%"),
+        'node_fds': DISPLAY.number(metrics.node_fds),
+        'load1': DISPLAY.decimal_text(f"{metrics.load1:.2f}"),
+        'mem_available': format_bytes(metrics.mem_available),
+        'accrual': display_amount(int(metrics.reward_rate_hour), 4),
+        'apr': DISPLAY.decimal_text(f"{estimate_apr(metrics):.1f}%"),
+        'time': display_time(now),
+    }
+
+
+def format_bytes(size: int) -> str:
+    """Human readable byte count"""
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if size < 1024 or unit == 'TB':
+            return f"{size} {unit}" if unit == 'B' else f"{DISPLAY.decimal_text(f'{size:.1f}')} {unit}"
+        size /= 1024
+    return f"{size} B"
+
+
+def render_message(name: str, metrics: MetricsLike, now: Optional[datetime] = None,
+                   **extra: Any) -> templates.Rendered:
+    """Render a message template in all formats (text, MarkdownV2, HTML)"""
+    context = message_context(metrics, now)
+    context.update(extra)
+    return MESSAGE_TEMPLATES[name].render(context)
+
+
+def format_healthy_message(metrics: MetricsLike) -> str:
+    """Format HEALTHY status message"""
+    return render_message('HEALTHY', metrics).for_parse_mode(CONFIG.tg_parse_mode)
+
+
+def format_warning_message(metrics: MetricsLike) -> str:
+    """Format WARNING status message"""
+    return render_message('WARNING', metrics).for_parse_mode(CONFIG.tg_parse_mode)
+
+
+def format_alert_message(metrics: MetricsLike) -> str:
+    """Format ALERT status message"""
+    return render_message('ALERT', metrics).for_parse_mode(CONFIG.tg_parse_mode)
+
+
+def format_full_info_message(metrics: MetricsLike) -> str:
+    """Format FULL INFO message - semua informasi lengkap"""
+    return render_message('FULL_INFO', metrics).for_parse_mode(CONFIG.tg_parse_mode)
+
+
+def format_fatal_message(metrics: MetricsLike) -> str:
+    """Format FATAL status message"""
+    return render_message('FATAL', metrics).for_parse_mode(CONFIG.tg_parse_mode)
+
+
+def format_status_message(metrics: MetricsLike, level: str) -> str:
+    """Format status message based on alert level"""
+    name = level if level in ('HEALTHY', 'WARNING', 'ALERT', 'FATAL') else 'HEALTHY'
+    return render_message(name, metrics).for_parse_mode(CONFIG.tg_parse_mode)
+
+
+def format_alert_events(result: 'FleetResult', engine: AlertEngine, now: float) -> Optional[str]:
+    """
+    Notification for one validator's alert events of this cycle, None if
+    nothing is worth sending. New or escalated ALERT/FATAL conditions send
+    the status message, reminders add a reminder header, cleared ones a
+    resolution notice.
+    """
+    critical = ('ALERT', 'FATAL')
+    notify = [event for event in result.events if event.kind in NOTIFY_KINDS and event.level in critical]
+    cleared = [event for event in result.events if event.kind == 'cleared' and event.level in critical]
+    parts = []
     
-    message += f"📛 Moniker: {moniker}\n\n"
-    message += "Validator:\n"
-    message += f" • 🔓 Status : {status}\n"
-    jailed_emoji = "🔴" if jailed else "🔒"
-    message += f" • {jailed_emoji} Jailed : {'YES' if jailed else 'No'}\n\n"
-    message += "Node:\n"
-    message += f" • 🛑 Sync   : STOPPED\n"
-    message += f" • ⚠️  Missed : {missed} blocks\n\n"
+    if notify:
+        status_message = format_status_message(result.metrics, result.level)
+        if any(event.kind in ('raised', 'escalated') for event in notify):
+            parts.append(status_message)
+            # Host conditions are not part of the validator status message
+            if any(event.condition == 'disk_filling' for event in notify):
+                parts.append(render_message('DISK', result.metrics).for_parse_mode(CONFIG.tg_parse_mode))
+        else:
+            valoper = result.target.valoper
+            since = min(engine.firing_since(valoper, event.condition) or now for event in notify)
+            header = render_message(
+                'REMINDER', result.metrics,
+                conditions=', '.join(CONDITION_LABELS.get(event.condition, event.condition) for event in notify),
+                duration=format_duration(now - since),
+                count=max(engine.reminders(valoper, event.condition) for event in notify),
+            ).for_parse_mode(CONFIG.tg_parse_mode)
+            parts.append(f"{header}\n\n{status_message}")
     
-    wib_time = datetime.utcnow() + timedelta(hours=7)
-    message += f"🕒 Detected: {wib_time.strftime('%Y-%m-%d %H:%M')} WIB"
+    if cleared:
+        parts.append(render_message(
+            'RESOLVED', result.metrics,
+            conditions=', '.join(CONDITION_LABELS.get(event.condition, event.condition) for event in cleared),
+        ).for_parse_mode(CONFIG.tg_parse_mode))
     
-    return message
+    return '\n\n'.join(parts) or None
 
 
-def format_full_info_message(metrics: Dict[str, Any]) -> str:
-    """Format FULL INFO message - semua informasi lengkap"""
-    moniker = metrics.get('moniker', 'Unknown')
-    status = metrics.get('validator_status', 'UNKNOWN')
-    jailed = metrics.get('jailed', False)
-    tombstoned = metrics.get('tombstoned', False)
-    catching_up = metrics.get('catching_up', True)
-    height = metrics.get('height', 0)
-    missed = metrics.get('missed_blocks', 0)
-    
-    message = f"📊 RAI VALIDATOR — FULL STATUS REPORT\n"
-    message += f"📛 Moniker: {moniker}\n\n"
-    message += "Validator:\n"
-    message += f" • 🔓 Status : {status}\n"
-    jailed_emoji = "🔴" if jailed else "🔒"
-    message += f" • {jailed_emoji} Jailed : {'YES' if jailed else 'No'}\n"
-    tombstoned_emoji = "⚰️" if tombstoned else "✅"
-    message += f" • {tombstoned_emoji} Tombstoned : {'YES' if tombstoned else 'No'}\n\n"
-    message += "Node:\n"
-    if catching_up:
-        sync_emoji = "⏳"
-        sync_text = "Catching Up"
-    else:
-        sync_emoji = "✅"
-        sync_text = "OK"
-    message += f" • {sync_emoji} Sync   : {sync_text}\n"
-    message += f" • 📊 Height : {height:,}\n"
-    message += f" • ⚠️  Missed : {missed} blocks\n\n"
-    message += "Balance:\n"
-    message += f" • 💰 Wallet    : {format_balance(metrics.get('wallet_balance', 0))} RAI\n"
-    message += f" • 🔐 Delegated : {format_balance(metrics.get('delegated_balance', 0))} RAI\n"
-    message += f" • 🎁 Rewards   : {format_balance(metrics.get('rewards', 0))} RAI\n\n"
+def format_fleet_summary(results: list, now: Optional[datetime] = None) -> templates.Rendered:
+    """Compact table of (metrics, level) pairs, one row per validator"""
+    rows = []
+    for metrics, level in results:
+        metrics = as_metrics(metrics)
+        rows.append([
+            metrics.moniker[:16], level, DISPLAY.number(metrics.height),
+            DISPLAY.number(metrics.missed_blocks), display_amount(metrics.delegated_balance),
+        ])
+    return templates.render_table(
+        ['Validator', 'Level', 'Height', 'Missed', 'Delegated'], rows,
+        title=f"Fleet summary — {display_time(now)}",
+    )
+
+
+# =============================================================================
+# FLEET DIGEST
+# =============================================================================
+
+class FleetResult(NamedTuple):
+    """Evaluation of one fleet member in this cycle"""
+    target: Target
+    metrics: Metrics
+    level: str
+    events: list
+
+
+SEVERITY_ORDER = ('FATAL', 'ALERT', 'WARNING', 'HEALTHY')
+SEVERITY_EMOJI = {'FATAL': '☠️', 'ALERT': '🔴', 'WARNING': '🟡', 'HEALTHY': '🟢'}
+
+DIGEST_TEMPLATES = templates.compile_templates({
+    'title': "# 📋 RAI FLEET DIGEST — {count} validators\n🕒 {time}",
+    'section': "# {emoji} {level} ({count})",
+    'line': " • {moniker} — {status}{flags}, missed {missed}",
+    'collapsed': " • {count} validators, all healthy",
+    'overflow': "… {count} more not shown",
+})
+
+
+def _digest_text(name: str, **context: Any) -> str:
+    return DIGEST_TEMPLATES[name].render(context).for_parse_mode(CONFIG.tg_parse_mode)
+
+
+def fleet_state(state: Dict[str, Any], target: Target) -> Dict[str, Any]:
+    """Per-validator state: top level for the primary, state['fleet'][valoper] otherwise"""
+    if target == primary_target():
+        return state
+    return state.setdefault('fleet', {}).setdefault(target.valoper, {})
+
+
+def digest_line(metrics: Metrics) -> str:
+    """One validator line of the fleet digest"""
+    flags = [name for name, value in (('tombstoned', metrics.tombstoned), ('jailed', metrics.jailed),
+                                       ('catching up', metrics.catching_up)) if value]
+    return _digest_text(
+        'line', moniker=metrics.moniker, status=metrics.validator_status,
+        flags=''.join(f", {flag}" for flag in flags), missed=DISPLAY.number(metrics.missed_blocks),
+    )
+
+
+def build_fleet_digest(results: list, now: Optional[datetime] = None) -> list:
+    """
+    Heartbeat digest of the whole fleet, grouped by severity and packed into
+    at most DIGEST_MAX_MESSAGES Telegram messages. Healthy validators are
+    collapsed into a count when listing them would exceed the cap.
+    """
+    groups: Dict[str, list] = {level: [] for level in SEVERITY_ORDER}
+    for result in results:
+        groups.setdefault(result.level, []).append(result.metrics)
     
-    wib_time = datetime.utcnow() + timedelta(hours=7)
-    message += f"🕒 {wib_time.strftime('%Y-%m-%d %H:%M')} WIB"
+    title = _digest_text('title', count=len(results), time=display_time(now))
+    
+    def sections(collapse_healthy: bool) -> list:
+        packed = []
+        for level, members in groups.items():
+            if not members:
+                continue
+            heading = _digest_text('section', emoji=SEVERITY_EMOJI.get(level, '⚪'), level=level, count=len(members))
+            if collapse_healthy and level == 'HEALTHY':
+                lines = [_digest_text('collapsed', count=len(members))]
+            else:
+                lines = [digest_line(metrics) for metrics in members]
+            packed.append((heading, lines))
+        return packed
     
-    return message
+    overflow = lambda count: _digest_text('overflow', count=count)
+    messages = digest.pack_sections(sections(False), title, TG_MESSAGE_LIMIT)
+    if len(messages) > CONFIG.digest_max_messages:
+        messages = digest.pack_sections(sections(True), title, TG_MESSAGE_LIMIT,
+                                        CONFIG.digest_max_messages, overflow)
+    return messages
 
 
-def format_fatal_message(metrics: Dict[str, Any]) -> str:
-    """Format FATAL status message"""
-    moniker = metrics.get('moniker', 'Unknown')
-    status = metrics.get('validator_status', 'UNKNOWN')
+def send_telegram_messages(messages: list) -> bool:
+    """Send several messages in order, returns False if any failed"""
+    ok = True
+    for message in messages:
+        ok = send_telegram_message(message) and ok
+    return ok
+
+
+# =============================================================================
+# FLEET SHARDING
+# =============================================================================
+
+# Large fleets are split into shards that are collected and evaluated in
+# parallel, by a process pool (FLEET_WORKERS) or by `monitor.py --worker`
+# processes on any host sharing FLEET_QUEUE_DIR. Workers send back compact
+# results (metrics, member state, observed conditions); this process keeps
+# the primary validator, the alert engine and every state and history write.
+
+WORKER_POLL_SECONDS = 0.2    # queue poll interval of idle workers and the coordinator
+QUEUE_PURGE_SECONDS = 3600   # queue files left by crashed processes are removed after this
+
+
+def fleet_shards(targets: list) -> list:
+    """Split targets into shards (about one per worker), none if sharding is off"""
+    if not targets or (CONFIG.fleet_workers <= 1 and not CONFIG.fleet_queue_dir):
+        return []
+    size = max(1, min(CONFIG.fleet_shard_size, -(-len(targets) // CONFIG.fleet_workers)))
+    return [targets[i:i + size] for i in range(0, len(targets), size)]
+
+
+def evaluate_member(metrics: Metrics, member_state: Dict[str, Any], now: float) -> Dict[str, bool]:
+    """Reward accounting and observed alert conditions of one fleet member"""
+    update_reward_accounting(metrics, member_state)
+    return alert_observations(metrics, member_state, now)
+
+
+def shard_job(shard: list, state: Dict[str, Any], node_health: Dict[str, Optional[Dict[str, Any]]],
+              now: float) -> Dict[str, Any]:
+    """Everything a worker needs for one shard (JSON-serializable)"""
+    return {
+        'targets': [list(target) for target in shard],
+        'states': {target.valoper: fleet_state(state, target) for target in shard},
+        'node_health': node_health,
+        'now': now,
+        'corr': EVENTS.correlation,
+    }
+
+
+def run_shard_job(job: Dict[str, Any]) -> list:
+    """Collect and evaluate one shard: {metrics, state, observations} per target"""
+    # Events of the shard belong to the coordinator's run
+    EVENTS.correlation = job.get('corr', EVENTS.correlation)
+    targets = [Target(*target) for target in job['targets']]
+    results = []
+    for target, metrics in zip(targets, collect_fleet_metrics(targets, job['node_health'])):
+        member_state = job['states'].get(target.valoper, {})
+        observations = evaluate_member(metrics, member_state, job['now'])
+        results.append({'metrics': metrics.to_dict(), 'state': member_state, 'observations': observations})
+    # Pool processes exit without running atexit handlers
+    TRAFFIC.flush()
+    EVENTS.flush()
+    return results
+
+
+def dispatch_shards(jobs: list) -> Callable[[], list]:
+    """Start the shard jobs. Returns a function waiting for their results, in job order."""
+    if not jobs:
+        return lambda: []
+    if CONFIG.fleet_queue_dir:
+        return _dispatch_to_queue(jobs)
     
-    message = f"☠️ RAI VALIDATOR FATAL — TOMBSTONED\n"
-    message += f"📛 Moniker: {moniker}\n\n"
-    message += "Validator:\n"
-    message += f" • ⚰️  Tombstoned : YES\n"
-    message += f" • 🔓 Status     : {status}\n\n"
-    message += "🚨 Validator permanently slashed\n"
-    message += "Recovery impossible\n\n"
+    # spawn, not fork: the republicd thread pool and gRPC channels of this
+    # process would be copied half-alive into a forked child
+    pool = ProcessPoolExecutor(max_workers=min(CONFIG.fleet_workers, len(jobs)),
+                               mp_context=multiprocessing.get_context('spawn'))
+    futures = [pool.submit(run_shard_job, job) for job in jobs]
     
-    wib_time = datetime.utcnow() + timedelta(hours=7)
-    message += f"🕒 Detected: {wib_time.strftime('%Y-%m-%d %H:%M')} WIB"
+    def gather() -> list:
+        results = []
+        try:
+            for future, job in zip(futures, jobs):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    log_error("Fleet shard failed in a worker process, collecting it here", error=str(e))
+                    results.append(run_shard_job(job))
+        finally:
+            pool.shutdown()
+        return results
     
-    return message
+    return gather
 
 
-def format_status_message(metrics: Dict[str, Any], level: str) -> str:
-    """Format status message based on alert level"""
-    if level == 'HEALTHY':
-        return format_healthy_message(metrics)
-    elif level == 'WARNING':
-        return format_warning_message(metrics)
-    elif level == 'ALERT':
-        return format_alert_message(metrics)
-    elif level == 'FATAL':
-        return format_fatal_message(metrics)
-    else:
-        return format_healthy_message(metrics)
+def _dispatch_to_queue(jobs: list) -> Callable[[], list]:
+    """Post the jobs to FLEET_QUEUE_DIR; shards nobody finishes in time run here"""
+    queue = work_queue.SpoolQueue(Path(CONFIG.fleet_queue_dir))
+    queue.purge(QUEUE_PURGE_SECONDS)
+    job_ids = [queue.put(job) for job in jobs]
+    
+    def gather() -> list:
+        results: Dict[str, Any] = {}
+        deadline = time.monotonic() + CONFIG.fleet_queue_timeout
+        while len(results) < len(jobs) and time.monotonic() < deadline:
+            for job_id in job_ids:
+                if job_id not in results:
+                    done, result = queue.take(job_id)
+                    if done:
+                        results[job_id] = result
+            # Work on our own shards too while no worker has claimed them
+            claimed = queue.claim([job_id for job_id in job_ids if job_id not in results])
+            if claimed:
+                job_id, job = claimed
+                results[job_id] = run_shard_job(job)
+                queue.cancel(job_id)
+            elif len(results) < len(jobs):
+                time.sleep(WORKER_POLL_SECONDS)
+        
+        for job_id, job in zip(job_ids, jobs):
+            if results.get(job_id) is None:
+                queue.cancel(job_id)
+                log_error("Fleet shard not done by a worker, collecting it here", job=job_id)
+                results[job_id] = run_shard_job(job)
+        return [results[job_id] for job_id in job_ids]
+    
+    return gather
+
+
+def collect_fleet(targets: list, state: Dict[str, Any], now: float) -> list:
+    """
+    Collect and evaluate every fleet member: (Metrics, observed conditions)
+    in target order. The primary validator stays in this process (host
+    probes describe this machine); the other validators are sharded while
+    it works, and their member states written back into state.
+    """
+    node_health = get_node_health()
+    shards = fleet_shards(targets[1:])
+    gather = dispatch_shards([shard_job(shard, state, node_health, now) for shard in shards])
+    
+    local = targets[:1] if shards else targets
+    local_metrics = collect_fleet_metrics(local, node_health)
+    # Host probes describe the machine this runs on, i.e. the primary's node
+    update_host_metrics(local_metrics[0], state)
+    fleet = [(metrics, evaluate_member(metrics, fleet_state(state, target), now))
+             for target, metrics in zip(local, local_metrics)]
+    
+    for shard, shard_results in zip(shards, gather()):
+        for target, item in zip(shard, shard_results):
+            state.setdefault('fleet', {})[target.valoper] = item['state']
+            fleet.append((Metrics.from_dict(item['metrics']), item['observations']))
+    return fleet
+
+
+def run_worker_command() -> int:
+    """--worker: collect the fleet shards posted to FLEET_QUEUE_DIR until stopped"""
+    if not CONFIG.fleet_queue_dir:
+        log_error("--worker needs FLEET_QUEUE_DIR")
+        return 2
+    queue = work_queue.SpoolQueue(Path(CONFIG.fleet_queue_dir))
+    # Stopped with SIGTERM (systemd): exit normally so atexit flushes the
+    # traffic capture and event log
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Worker {work_queue.worker_name()} serving {CONFIG.fleet_queue_dir}", file=sys.stderr)
+    try:
+        while True:
+            # Between jobs no query or lock is in flight
+            config.apply_reload(reload_config)
+            claimed = queue.claim()
+            if claimed is None:
+                time.sleep(WORKER_POLL_SECONDS)
+                continue
+            job_id, job = claimed
+            try:
+                result = run_shard_job(job)
+            except Exception as e:
+                # The coordinator collects a failed shard itself
+                log_error("Fleet shard failed", job=job_id, error=str(e))
+                result = None
+            queue.complete(job_id, result)
+    except KeyboardInterrupt:
+        return 0
 
 
 # =============================================================================
 # HISTORY & CHARTS
 # =============================================================================
 
-def append_history(metrics: Dict[str, Any]) -> None:
+# history.csv columns -> Metrics fields. New columns are only ever appended;
+# older files are upgraded in place on the next write.
+HISTORY_FIELDS = [
+    ('timestamp', 'timestamp'),
+    ('height', 'height'),
+    ('catching_up', 'catching_up'),
+    ('missed_blocks', 'missed_blocks'),
+    ('rewards', 'rewards'),
+    ('balance', 'wallet_balance'),
+    ('delegated', 'delegated_balance'),
+    ('accrued', 'accrued_rewards'),
+    ('commission', 'commission'),
+    ('outstanding', 'outstanding_rewards'),
+    ('self_delegated', 'self_delegation'),
+    ('delegators', 'delegator_count'),
+    ('peers', 'peers'),
+    ('mempool_txs', 'mempool_txs'),
+    ('disk_free', 'disk_free'),
+    ('disk_growth_hour', 'disk_growth_hour'),
+    ('node_rss', 'node_rss'),
+    ('node_cpu_pct', 'node_cpu_pct'),
+    ('node_fds', 'node_fds'),
+    ('load1', 'load1'),
+    ('mem_available', 'mem_available'),
+]
+HISTORY_COLUMNS = [column for column, _ in HISTORY_FIELDS]
+_history_row = row_getter([key for _, key in HISTORY_FIELDS])
+
+# Ring buffer fields after the timestamp, read straight off a Metrics record
+_ring_row = row_getter([name for name, _ in RING_FIELDS[1:]])
+
+
+def append_history(metrics: Metrics) -> None:
     """Append metrics to history CSV"""
     try:
         file_exists = HISTORY_CSV.exists() and HISTORY_CSV.stat().st_size > 0
+        if file_exists and compaction.read_header(HISTORY_CSV) != HISTORY_COLUMNS:
+            compaction.upgrade_header(HISTORY_CSV, HISTORY_COLUMNS, HISTORY_DIR)
         
         with open(HISTORY_CSV, 'a', newline='') as f:
             writer = csv.writer(f)
             if not file_exists:
-                writer.writerow([
-                    'timestamp', 'height', 'catching_up', 'missed_blocks',
-                    'rewards', 'balance', 'delegated'
-                ])
-            writer.writerow([
-                metrics['timestamp'],
-                metrics['height'],
-                metrics['catching_up'],
-                metrics['missed_blocks'],
-                metrics['rewards'],
-                metrics['wallet_balance'],
-                metrics['delegated_balance']
-            ])
+                writer.writerow(HISTORY_COLUMNS)
+            writer.writerow(_history_row(metrics))
     except Exception as e:
-        log_error(f"Failed to append history: {e}")
+        log_error("Failed to append history", error=str(e))
+    
+    append_recent_sample(metrics)
 
 
-def generate_charts() -> None:
-    """Generate PNG charts"""
+def iso_to_epoch(timestamp: str) -> float:
+    """Convert naive UTC ISO timestamp to unix time"""
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
+
+
+def open_recent_ring() -> RingBuffer:
+    """Open the recent samples ring buffer"""
+    return RingBuffer(RECENT_RING, RING_FIELDS, CONFIG.ring_capacity)
+
+
+def append_recent_sample(metrics: Metrics) -> None:
+    """Append metrics to the recent samples ring buffer"""
     try:
-        import matplotlib
-        matplotlib.use('Agg')
-        import matplotlib.pyplot as plt
-        from datetime import datetime, timedelta
-        
-        if not HISTORY_CSV.exists():
-            return
-        
-        # Read last 24 hours
-        timestamps = []
-        rewards = []
-        missed_deltas = []
+        with open_recent_ring() as ring:
+            ring.append_row((iso_to_epoch(metrics.timestamp),) + _ring_row(metrics))
+    except Exception as e:
+        log_error("Failed to append recent sample", error=str(e))
+
+
+def first_history_timestamp() -> Optional[float]:
+    """Timestamp of the oldest row in history.csv (reads two lines only)"""
+    try:
+        with open(HISTORY_CSV, 'r') as f:
+            f.readline()
+            first = f.readline()
+        if first:
+            return iso_to_epoch(first.split(',', 1)[0])
+    except Exception:
+        pass
+    return None
+
+
+def load_recent_samples(hours: float) -> Optional[list]:
+    """
+    Load samples of the last N hours from the ring buffer.
+    Returns None if the ring does not cover the whole window, in which case
+    the caller should fall back to history.csv.
+    """
+    try:
+        if not RECENT_RING.exists():
+            return None
+        cutoff = TRAFFIC.now() - hours * 3600
+        with open_recent_ring() as ring:
+            first, count = ring.first(), len(ring)
+            if first is None:
+                return None
+            
+            # Covered if the ring reaches back past the cutoff, or it has never
+            # wrapped and already holds everything history.csv has
+            oldest = first['timestamp']
+            if oldest > cutoff:
+                first_csv = first_history_timestamp()
+                if count >= CONFIG.ring_capacity or (first_csv is not None and first_csv < oldest):
+                    return None
+            
+            return ring.records(since=cutoff)
+    except Exception as e:
+        log_error("Failed to read recent samples", error=str(e))
+        return None
+
+
+def compact_history() -> None:
+    """Roll new history rows into 5m/1h/1d aggregates and apply retention"""
+    try:
+        compaction.compact(HISTORY_CSV, HISTORY_DIR, CONFIG.history_retention_days)
+    except Exception as e:
+        log_error("Failed to compact history", error=str(e))
+
+
+CHART_MIN_HOURS = 1
+CHART_MAX_HOURS = 90 * 24
+
+
+def parse_window(window: str) -> Optional[float]:
+    """Parse chart window like '6h', '7d', '2w' into hours (1h..90d)"""
+    units = {'h': 1, 'd': 24, 'w': 168}
+    window = (window or '').strip().lower()
+    if len(window) < 2 or window[-1] not in units:
+        return None
+    try:
+        hours = float(window[:-1]) * units[window[-1]]
+    except ValueError:
+        return None
+    if hours < CHART_MIN_HOURS or hours > CHART_MAX_HOURS:
+        return None
+    return hours
+
+
+def chart_resolution(hours: float) -> str:
+    """Pick data resolution so a chart has at most ~1000 points"""
+    if hours <= 24:
+        return 'raw'
+    if hours <= 72:
+        return '5m'
+    if hours <= 30 * 24:
+        return '1h'
+    return '1d'
+
+
+def read_history_since(cutoff: float) -> list:
+    """
+    Read history.csv rows newer than cutoff (unix time).
+    Rows are time-ordered, so the start is found by binary search over
+    byte offsets instead of parsing the whole file.
+    """
+    if not HISTORY_CSV.exists():
+        return []
+    
+    with open(HISTORY_CSV, 'rb') as f:
+        header = f.readline()
+        fieldnames = next(csv.reader([header.decode()]))
+        lo, hi = len(header), HISTORY_CSV.stat().st_size
         
-        cutoff_time = datetime.utcnow() - timedelta(hours=24)
-        last_missed = 0
+        # Invariant: the first row at/after cutoff starts at or after lo
+        while lo < hi:
+            mid = (lo + hi) // 2
+            f.seek(mid)
+            if mid > len(header):
+                f.readline()  # skip partial line
+            row_start = f.tell()
+            line = f.readline()
+            if not line or row_start >= hi:
+                hi = mid
+                continue
+            try:
+                ts = iso_to_epoch(line.split(b',', 1)[0].decode())
+            except ValueError:
+                lo = row_start + len(line)
+                continue
+            if ts < cutoff:
+                lo = row_start + len(line)
+            else:
+                hi = mid
         
-        with open(HISTORY_CSV, 'r') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                try:
-                    ts = datetime.fromisoformat(row['timestamp'])
-                    if ts < cutoff_time:
-                        continue
-                    
-                    timestamps.append(ts)
-                    rewards.append(float(row['rewards']) / (10 ** DECIMALS))
-                    
-                    current_missed = int(row['missed_blocks'])
-                    missed_deltas.append(current_missed - last_missed)
-                    last_missed = current_missed
-                except Exception:
-                    continue
+        f.seek(lo)
+        if lo > len(header):
+            f.seek(lo - 1)
+            if f.read(1) != b'\n':
+                f.readline()
+        data = f.read().decode()
+    
+    rows = []
+    for row in csv.DictReader(io.StringIO(data), fieldnames=fieldnames):
+        try:
+            ts = iso_to_epoch(row['timestamp'])
+            if ts < cutoff:
+                continue
+            rows.append({
+                'timestamp': ts,
+                'height': int(row['height']),
+                'missed_blocks': int(row['missed_blocks']),
+                'rewards': int(row['rewards']),
+                'wallet_balance': int(row['balance']),
+                'delegated_balance': int(row['delegated']),
+                'accrued_rewards': int(row.get('accrued') or 0),
+            })
+        except (KeyError, ValueError, TypeError):
+            continue
+    return rows
+
+
+def load_chart_series(metric: str, hours: float) -> Tuple[list, list, str]:
+    """Load (timestamps, values, resolution) for a metric over the last N hours"""
+    _, _, raw_key, rollup_key, is_amount = CHART_METRICS[metric]
+    resolution = chart_resolution(hours)
+    cutoff = TRAFFIC.now() - hours * 3600
+    timestamps = []
+    values = []
+    
+    if resolution == 'raw':
+        samples = load_recent_samples(hours)
+        if samples is None:
+            samples = read_history_since(cutoff)
+        last_missed = None
+        for sample in samples:
+            value = sample[raw_key]
+            if metric == 'missed':
+                value, last_missed = (0 if last_missed is None else value - last_missed), value
+            timestamps.append(datetime.utcfromtimestamp(sample['timestamp']))
+            values.append(value)
+    else:
+        for bucket in compaction.load_rollup(HISTORY_DIR, resolution, since=cutoff):
+            timestamps.append(datetime.utcfromtimestamp(bucket['bucket']))
+            values.append(bucket[rollup_key])
+    
+    if is_amount:
+        values = [value / (10 ** CONFIG.decimals) for value in values]
+    return timestamps, values, resolution
+
+
+def format_window(hours: float) -> str:
+    """Format window hours as short label (24h, 7d)"""
+    if hours >= 48 and hours % 24 == 0:
+        return f"{int(hours // 24)}d"
+    return f"{hours:g}h"
+
+
+def plot_chart_png(metric: str, label: str, timestamps: list, values: list) -> bytes:
+    """Plot a series into an in-memory PNG"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    title, ylabel, _, _, _ = CHART_METRICS[metric]
+    color = 'r-' if metric == 'missed' else 'b-'
+    plt.figure(figsize=(10, 6))
+    plt.plot(timestamps, values, color, linewidth=2)
+    plt.title(f"{title} (Last {label})", fontsize=14, fontweight='bold')
+    plt.xlabel('Time', fontsize=12)
+    plt.ylabel(ylabel, fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    buffer = io.BytesIO()
+    plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    plt.close()
+    return buffer.getvalue()
+
+
+def render_chart_png(metric: str, hours: float) -> Optional[bytes]:
+    """Render a metric chart for the last N hours in memory"""
+    try:
+        if metric not in CHART_METRICS:
+            return None
+        timestamps, values, _ = load_chart_series(metric, hours)
+        if len(timestamps) < 2:
+            return None
+        return plot_chart_png(metric, format_window(hours), timestamps, values)
+    except ImportError:
+        log_error("matplotlib not available, skipping charts")
+    except Exception as e:
+        log_error("Failed to render chart", metric=metric, error=str(e))
+    return None
+
+
+def render_chart(metric: str, hours: float) -> Optional[Path]:
+    """
+    Render a metric chart for the last N hours to a file (for the bot).
+    Images are cached under history/charts, keyed by metric, window and the
+    latest data point, so repeated requests (from any chat) reuse the file.
+    """
+    try:
+        if metric not in CHART_METRICS:
+            return None
         
+        timestamps, values, resolution = load_chart_series(metric, hours)
         if len(timestamps) < 2:
-            return
+            return None
+        
+        label = format_window(hours)
+        content_hash = hashlib.sha1(
+            f"{resolution}:{len(values)}:{timestamps[-1].isoformat()}:{values[-1]}".encode()
+        ).hexdigest()[:12]
+        CHARTS_DIR.mkdir(exist_ok=True)
+        chart_path = CHARTS_DIR / f"{metric}_{label}_{content_hash}.png"
+        if chart_path.exists():
+            return chart_path
         
-        # Rewards chart
-        plt.figure(figsize=(10, 6))
-        plt.plot(timestamps, rewards, 'b-', linewidth=2)
-        plt.title('Rewards (Last 24h)', fontsize=14, fontweight='bold')
-        plt.xlabel('Time', fontsize=12)
-        plt.ylabel('Rewards (RAI)', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(REWARDS_CHART, dpi=100, bbox_inches='tight')
-        plt.close()
+        # Drop stale renders of the same chart
+        for old in CHARTS_DIR.glob(f"{metric}_{label}_*.png"):
+            old.unlink(missing_ok=True)
         
-        # Missed blocks chart (delta)
-        plt.figure(figsize=(10, 6))
-        plt.plot(timestamps, missed_deltas, 'r-', linewidth=2)
-        plt.title('Missed Blocks Delta (Last 24h)', fontsize=14, fontweight='bold')
-        plt.xlabel('Time', fontsize=12)
-        plt.ylabel('Missed Blocks (Delta)', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        plt.savefig(MISSED_BLOCKS_CHART, dpi=100, bbox_inches='tight')
-        plt.close()
+        chart_path.write_bytes(plot_chart_png(metric, label, timestamps, values))
+        return chart_path
         
     except ImportError:
         log_error("matplotlib not available, skipping charts")
     except Exception as e:
-        log_error(f"Failed to generate charts: {e}")
+        log_error("Failed to render chart", metric=metric, error=str(e))
+    return None
+
+
+# Charts attached to critical alerts: metric -> caption
+ALERT_CHARTS = (
+    ('accrued', "Rewards History (24h)"),
+    ('missed', "Missed Blocks Delta (24h)"),
+)
+
+
+def generate_charts() -> list:
+    """Render the alert charts in memory: [(png bytes, caption)]"""
+    charts = []
+    for metric, caption in ALERT_CHARTS:
+        png = render_chart_png(metric, 24)
+        if png:
+            charts.append((png, caption))
+    return charts
+
+
+def run_chart_command(args: list) -> int:
+    """
+    CLI: monitor.py --chart <metric> <window> [--send [--chat <chat_id>]]
+    Prints the rendered image path on success.
+    """
+    if len(args) < 2 or args[0] not in CHART_METRICS:
+        print(f"Usage: monitor.py --chart <{'|'.join(CHART_METRICS)}> <1h..90d> [--send [--chat <chat_id>]]",
+              file=sys.stderr)
+        return 2
+    chat_id = args[args.index('--chat') + 1] if '--chat' in args[:-1] else None
+    
+    hours = parse_window(args[1])
+    if hours is None:
+        print("ERROR: Window must be between 1h and 90d (e.g. 6h, 7d, 2w)", file=sys.stderr)
+        return 2
+    
+    chart_path = render_chart(args[0], hours)
+    if not chart_path:
+        print("ERROR: Not enough history for this chart", file=sys.stderr)
+        return 1
+    
+    if '--send' in args:
+        title = CHART_METRICS[args[0]][0]
+        if not send_telegram_photo(chart_path, f"{title} ({format_window(hours)})", chat_id):
+            print("ERROR: Failed to send the chart to Telegram", file=sys.stderr)
+            return 1
+    print(chart_path)
+    return 0
+
+
+# =============================================================================
+# SIGNING BACKFILL
+# =============================================================================
+
+# Commit signature flags that count as signed (as in x/slashing: only
+# absent counts as missed); integers in CometBFT JSON, names in some versions
+SIGNED_FLAGS = {2, 3, 'BLOCK_ID_FLAG_COMMIT', 'BLOCK_ID_FLAG_NIL'}
+
+# /validators page size (CometBFT caps it at 100)
+VALIDATORS_PER_PAGE = 100
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart, across threads"""
+    
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self.lock = threading.Lock()
+        self.next_slot = 0.0
+    
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def signing_address(target: Optional[Target] = None) -> Optional[str]:
+    """Hex consensus address (as in block commits) of a validator"""
+    target = target or primary_target()
+    pubkey = cached_consensus_pubkey(target.valoper)
+    if not pubkey:
+        validator = parse_validator_info(chain_query('validator', query_params(target=target)), target.valoper)
+        pubkey = validator.consensus_pubkey if validator else None
+        cache_consensus_pubkey(target.valoper, pubkey)
+    address = consensus_address_bytes(pubkey)
+    return address.hex().upper() if address else None
+
+
+def rpc_get_result(session: requests.Session, limiter: RateLimiter, endpoint: str,
+                   params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Rate-limited RPC GET with retries, the reply's result or None"""
+    for attempt in range(RPC_RETRY_ATTEMPTS):
+        limiter.wait()
+        try:
+            response = session.get(f"{CONFIG.rpc_url}{endpoint}", params=params, timeout=10)
+            response.raise_for_status()
+            return response.json()['result']
+        except Exception as e:
+            if attempt < RPC_RETRY_ATTEMPTS - 1:
+                time.sleep(RPC_RETRY_DELAY * (attempt + 1))
+                continue
+            log_error("RPC call failed", endpoint=endpoint, params=params, error=str(e))
+    return None
+
+
+def fetch_commit(session: requests.Session, limiter: RateLimiter,
+                 height: int) -> Optional[Tuple[List[Dict[str, Any]], str, str]]:
+    """Signatures, block time and validator set hash of one height's commit, None on failure"""
+    result = rpc_get_result(session, limiter, '/commit', {'height': height})
+    try:
+        header = result['signed_header']
+        return header['commit']['signatures'], header['header']['time'], header['header']['validators_hash']
+    except (KeyError, TypeError):
+        return None
+
+
+def fetch_validator_index(session: requests.Session, limiter: RateLimiter,
+                          height: int, address: str) -> Optional[int]:
+    """Position of address in the validator set at height, -1 if not in it, None on failure"""
+    index = 0
+    page = 1
+    while True:
+        result = rpc_get_result(session, limiter, '/validators',
+                                {'height': height, 'page': page, 'per_page': VALIDATORS_PER_PAGE})
+        try:
+            validators = result['validators']
+            total = int(result['total'])
+        except (KeyError, TypeError, ValueError):
+            return None
+        for validator in validators:
+            if (validator.get('address') or '').upper() == address:
+                return index
+            index += 1
+        if not validators or index >= total:
+            return -1
+        page += 1
+
+
+class ValidatorIndexCache:
+    """
+    Our position in the validator set per validators_hash. The set only
+    changes with voting power changes, so a backfill fetches it rarely.
+    """
+    
+    def __init__(self, session: requests.Session, limiter: RateLimiter, address: str):
+        self.session = session
+        self.limiter = limiter
+        self.address = address
+        self.lock = threading.Lock()
+        self.indexes: Dict[str, int] = {}
+        self.fetching: Dict[str, threading.Lock] = {}
+    
+    def get(self, validators_hash: str, height: int) -> Optional[int]:
+        with self.lock:
+            if validators_hash in self.indexes:
+                return self.indexes[validators_hash]
+            fetch_lock = self.fetching.setdefault(validators_hash, threading.Lock())
+        # One thread fetches a new set, the others racing on it wait for it
+        with fetch_lock:
+            with self.lock:
+                if validators_hash in self.indexes:
+                    return self.indexes[validators_hash]
+            index = fetch_validator_index(self.session, self.limiter, height, self.address)
+            if index is not None:
+                with self.lock:
+                    self.indexes[validators_hash] = index
+            return index
+
+
+def commit_outcome(signatures: List[Dict[str, Any]], index: int) -> Tuple[bool, bool]:
+    """
+    (in validator set, signed) of the validator at index of the height's
+    validator set. Commit signatures follow the set's order; an absent
+    vote (flag 1, a missed block) carries no validator address.
+    """
+    if not 0 <= index < len(signatures):
+        return False, False
+    return True, signatures[index].get('block_id_flag') in SIGNED_FLAGS
+
+
+def backfill_signing(store: SigningStore, start: int, end: int) -> Tuple[int, int]:
+    """
+    Fetch the commits of all heights in start..end not in the store yet.
+    Checkpoints every BACKFILL_CHECKPOINT_BLOCKS. Returns (fetched, failed).
+    """
+    heights = list(store.missing(start, end))
+    if not heights:
+        return 0, 0
+    
+    limiter = RateLimiter(CONFIG.backfill_rps)
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=CONFIG.backfill_workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    validator_index = ValidatorIndexCache(session, limiter, store.address)
+    
+    def fetch_outcome(height: int) -> Optional[Tuple[bool, bool, str]]:
+        commit = fetch_commit(session, limiter, height)
+        if commit is None:
+            return None
+        signatures, block_time, validators_hash = commit
+        index = validator_index.get(validators_hash, height)
+        if index is None:
+            return None
+        return (*commit_outcome(signatures, index), block_time[:10])
+    
+    fetched = failed = 0
+    executor = ThreadPoolExecutor(max_workers=CONFIG.backfill_workers)
+    try:
+        # Submit in windows, so memory stays flat on huge ranges and the
+        # checkpoint trails the work by at most one window
+        window = CONFIG.backfill_workers * 64
+        for offset in range(0, len(heights), window):
+            chunk = heights[offset:offset + window]
+            for height, outcome in zip(chunk, executor.map(fetch_outcome, chunk)):
+                if outcome is None:
+                    failed += 1
+                    continue
+                active, signed, day = outcome
+                store.record(height, active, signed, day)
+                fetched += 1
+                if fetched % BACKFILL_CHECKPOINT_BLOCKS == 0:
+                    store.flush()
+                    print(f"  {fetched}/{len(heights)} blocks", file=sys.stderr)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        store.flush()
+    return fetched, failed
+
+
+def run_backfill_command(args: list) -> int:
+    """
+    CLI: monitor.py --backfill [from_height] [to_height]
+    Defaults to everything the node still has (earliest to latest block).
+    """
+    status = get_node_status()
+    if not status:
+        print("ERROR: Node status unavailable", file=sys.stderr)
+        return 1
+    sync_info = status.get('sync_info', {})
+    try:
+        start = int(args[0]) if args else int(sync_info.get('earliest_block_height') or 1)
+        # The latest block's commit is only final once the next block exists
+        end = int(args[1]) if len(args) > 1 else int(sync_info.get('latest_block_height', 0)) - 1
+    except ValueError:
+        print("Usage: monitor.py --backfill [from_height] [to_height]", file=sys.stderr)
+        return 2
+    
+    address = signing_address()
+    if not address:
+        print("ERROR: Could not determine the consensus address", file=sys.stderr)
+        return 1
+    
+    lock = run_lock.FileLock(SIGNING_DIR / 'backfill.lock')
+    if not lock.acquire(blocking=False):
+        print("ERROR: Another backfill is running", file=sys.stderr)
+        return 1
+    try:
+        store = SigningStore(SIGNING_DIR, address)
+        started = time.time()
+        print(f"Backfilling {address} heights {start}..{end} "
+              f"({CONFIG.backfill_workers} workers, {CONFIG.backfill_rps:g} req/s)", file=sys.stderr)
+        try:
+            fetched, failed = backfill_signing(store, start, end)
+        except KeyboardInterrupt:
+            print("Interrupted, progress saved; run again to resume", file=sys.stderr)
+            return 130
+        total, active, signed = store.counts(start, end)
+        print(f"Fetched {fetched} blocks in {time.time() - started:.0f}s ({failed} failed, retried on the next run)")
+        print(f"Heights {start}..{end}: {total} stored, {active} in the active set, "
+              f"{signed} signed, {active - signed} missed")
+        return 0 if not failed else 1
+    finally:
+        lock.release()
+
+
+# =============================================================================
+# UPTIME REPORT
+# =============================================================================
+
+UPTIME_DEFAULT_WINDOW = '30d'
+
+
+def uptime_days(store: SigningStore, window: str, today: str) -> Optional[List[str]]:
+    """UTC days of a window ('7d', '2w', ... or 'all') ending today"""
+    if window == 'all':
+        return sorted(day for day in store.days if day <= today)
+    hours = parse_window(window)
+    if hours is None:
+        return None
+    end = datetime.strptime(today, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp()
+    count = max(1, int(-(-hours // 24)))
+    return [datetime.fromtimestamp(end - i * 86400, tz=timezone.utc).strftime('%Y-%m-%d')
+            for i in range(count - 1, -1, -1)]
+
+
+def format_uptime_report(report: UptimeReport, label: str, days: List[str]) -> str:
+    """Plain-text uptime report: totals and one line per day"""
+    lines = [f"📈 Uptime — {label} ({days[0]} … {days[-1]})"]
+    if not report.days:
+        lines.append("No signing data for this window. Run monitor.py --backfill first.")
+        return '\n'.join(lines)
+    lines += [
+        f"Signed: {report.ratio * 100:.2f}% ({report.signed:,} of {report.active:,} blocks)",
+        f"Missed: {report.missed:,} blocks, longest streak {report.longest:,}",
+        f"Coverage: {report.fetched:,} blocks backfilled, up to height {report.days[-1].last:,}",
+    ]
+    rows = [
+        (d.day, f"{d.active:,}", f"{d.active - d.signed:,}",
+         f"{d.signed / d.active * 100:.2f}%" if d.active else '-', f"{d.longest:,}")
+        for d in report.days
+    ]
+    lines.append('')
+    lines.append(templates.render_table(('Day', 'Blocks', 'Missed', 'Uptime', 'Streak'), rows).text)
+    return '\n'.join(lines)
+
+
+def run_uptime_command(args: list) -> int:
+    """
+    CLI: monitor.py --uptime [window]
+    Signing report from the backfilled bitmaps; window is 1d..90d or 'all'.
+    """
+    window = (args[0] if args else UPTIME_DEFAULT_WINDOW).lower()
+    address = signing_address()
+    if not address:
+        print("ERROR: Could not determine the consensus address", file=sys.stderr)
+        return 1
+    # Newly summarized closed days are kept only if no backfill owns the
+    # store: the lock is held from loading to writing, so a backfill cannot
+    # update the metadata in between and have it overwritten
+    lock = run_lock.FileLock(SIGNING_DIR / 'backfill.lock')
+    owned = lock.acquire(blocking=False)
+    try:
+        store = SigningStore(SIGNING_DIR, address)
+        today = datetime.fromtimestamp(TRAFFIC.now(), timezone.utc).strftime('%Y-%m-%d')
+        days = uptime_days(store, window, today)
+        if days is None:
+            print("ERROR: Window must be between 1d and 90d (e.g. 7d, 2w) or 'all'", file=sys.stderr)
+            return 2
+        if not days:
+            print("ERROR: No signing data. Run monitor.py --backfill first.", file=sys.stderr)
+            return 1
+        
+        cached = len(store.summaries)
+        report = uptime_report(store, days, today)
+        if owned and len(store.summaries) != cached:
+            store.flush_meta()
+    finally:
+        if owned:
+            lock.release()
+    label = 'all time' if window == 'all' else f"last {format_window(len(days) * 24)}"
+    print(format_uptime_report(report, label, days))
+    return 0
+
+
+# =============================================================================
+# CONFIG RELOAD
+# =============================================================================
+
+def reload_config() -> None:
+    """
+    SIGHUP, applied between --worker jobs: re-read .env and swap in the new
+    config. Objects built from settings are rebuilt only if those settings
+    changed, so the CLI worker pool and gRPC channels survive unrelated
+    edits. Invalid settings keep the running config.
+    """
+    global CONFIG, TRAFFIC, ALERT_RULES, DISPLAY, _cli_pool, _grpc_unavailable
+    try:
+        new = config.load()
+    except config.ConfigError as e:
+        log_error("Config reload failed, keeping the running config", error=str(e))
+        return
+    old = CONFIG
+    
+    if config.changed(old, new, 'traffic_capture', 'traffic_replay', 'traffic_replay_speed'):
+        TRAFFIC.flush()
+        TRAFFIC = traffic.open_traffic('monitor', new.traffic_capture, new.traffic_replay,
+                                       new.traffic_replay_speed)
+    if config.changed(old, new, 'event_log_level', 'event_echo_level', 'event_rate_limit'):
+        EVENTS.configure(new.event_log_level, new.event_echo_level, new.event_rate_limit)
+    if config.changed(old, new, 'alert_remind_hours', 'alert_clear_minutes', 'alert_min_minutes',
+                      'alert_escalate_hours'):
+        ALERT_RULES = alert_rules(new)
+    if config.changed(old, new, 'display_locale', 'display_tz', 'display_tz_label'):
+        DISPLAY = display_locale(new)
+    if config.changed(old, new, 'cli_workers'):
+        # Queries already submitted finish on the old pool
+        with _cli_lock:
+            pool, _cli_pool = _cli_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+    if config.changed(old, new, 'grpc_url'):
+        # Clients are kept per URL; only the failed-import marker is reset
+        _grpc_unavailable = False
+    
+    CONFIG = new
+    EVENTS.info("Config reloaded", changed=config.diff(old, new))
 
 
 # =============================================================================
@@ -824,67 +2677,169 @@ def main():
     # Validate config
     if not validate_config():
         sys.exit(1)
+    # Only --worker applies a reload (between jobs); other runs read .env anew
+    # each time and just must not be killed by the signal
+    config.install_reload()
     
     # Check for flags
     send_charts = '--send-charts' in sys.argv
     force_send = '--force' in sys.argv
     
+    if '--timings' in sys.argv:
+        import atexit
+        atexit.register(lambda: print(format_query_timings(), file=sys.stderr))
+    
+    if '--compact' in sys.argv:
+        with run_lock.FileLock(RUN_LOCK_FILE, timeout=CONFIG.run_lock_timeout):
+            compact_history()
+        return
+    
+    if '--chart' in sys.argv:
+        index = sys.argv.index('--chart')
+        sys.exit(run_chart_command(sys.argv[index + 1:]))
+    
+    if '--backfill' in sys.argv:
+        index = sys.argv.index('--backfill')
+        sys.exit(run_backfill_command(sys.argv[index + 1:]))
+    
+    if '--uptime' in sys.argv:
+        index = sys.argv.index('--uptime')
+        sys.exit(run_uptime_command(sys.argv[index + 1:]))
+    
+    if '--worker' in sys.argv:
+        sys.exit(run_worker_command())
+    
+    if '--fleet' in sys.argv:
+        targets = fleet_targets()
+        # Levels as the alert engine left them after the last check; read
+        # only, nothing is evaluated or written
+        engine = open_alert_engine(load_state())
+        results = [(metrics, engine.level(target.valoper))
+                   for target, metrics in zip(targets, collect_fleet_metrics(targets))]
+        print(format_fleet_summary(results).text)
+        return
+    
+    # One check at a time: a run started while another is in flight (timer
+    # vs. bot /status --force) waits for it and reuses its result instead of
+    # querying the chain again. Holding the lock also serializes all
+    # state.json and history writes.
+    flight = run_lock.SingleFlight(RUN_LOCK_FILE, LAST_RUN_FILE)
+    try:
+        summary, shared = flight.run(lambda: run_check(send_charts, force_send), timeout=CONFIG.run_lock_timeout)
+    except run_lock.LockTimeout as e:
+        log_error(str(e))
+        sys.exit(1)
+    if shared:
+        resend_status(summary, force_send)
+
+
+def resend_status(summary: Dict[str, Any], force_send: bool) -> None:
+    """
+    --force after waiting for another run: re-send its ALERT/FATAL statuses,
+    except for conditions silenced now
+    """
+    if not force_send:
+        return
+    active_silences = silences.active(TRAFFIC.call('file', 'silences.json', lambda: silences.load(SILENCES_FILE)),
+                                      TRAFFIC.now())
+    notifications = [
+        format_status_message(Metrics.from_dict(item['metrics']), item['level'])
+        for item in summary.get('results', [])
+        if unsilenced_level(item.get('active', {}), item.get('validator', ''), active_silences) in ['ALERT', 'FATAL']
+    ]
+    if notifications:
+        send_telegram_messages(digest.pack_blocks(notifications, TG_MESSAGE_LIMIT))
+
+
+def run_check(send_charts: bool, force_send: bool) -> Dict[str, Any]:
+    """
+    One monitoring cycle: collect, alert, update state and history.
+    Returns a summary (level, firing conditions and metrics per validator)
+    for runs that waited on this one.
+    """
     # Load state
     state = load_state()
     
-    # Collect metrics
-    metrics = collect_metrics()
+    # Collect metrics of the whole fleet (just the primary validator unless
+    # FLEET_VALIDATORS is set), sharded across workers if configured, and
+    # advance each member's alert state machine here, in one place
+    targets = fleet_targets()
+    now = TRAFFIC.now()
+    fleet = collect_fleet(targets, state, now)
+    engine = open_alert_engine(state)
+    apply_acknowledgements(engine, targets, now)
+    active_silences = silences.active(TRAFFIC.call('file', 'silences.json', lambda: silences.load(SILENCES_FILE)), now)
+    maintenance = silences.is_global(active_silences)
+    results = []
+    for target, (member, observations) in zip(targets, fleet):
+        events = engine.evaluate(target.valoper, observations, now)
+        results.append(FleetResult(target, member, engine.level(target.valoper), events))
     
-    # Determine alert level
-    level, should_alert = determine_alert_level(metrics, state)
-    
-    # Check if status changed (untuk alert status)
-    last_status = state.get('last_status', None)
-    status_changed = (last_status is None) or (level != last_status)
+    primary = results[0]
+    metrics, level = primary.metrics, primary.level
     
     # Check heartbeat (untuk full info report)
     should_heartbeat = should_send_heartbeat(state)
     
-    # Send alert status HANYA untuk ALERT dan FATAL (kritikal)
-    # WARNING tidak perlu alert terpisah, cukup di full info report
-    # Full info report adalah alert utama setiap 3 jam
-    # Force send juga hanya untuk ALERT dan FATAL, bukan WARNING
-    if (force_send and level in ['ALERT', 'FATAL']) or (level in ['ALERT', 'FATAL'] and status_changed):
-        message = format_status_message(metrics, level)
-        send_telegram_message(message)
+    # Only ALERT/FATAL conditions are sent right away: when they fire or
+    # escalate, as reminders while unacknowledged, and when they clear.
+    # WARNING goes into the full info report / digest.
+    # --force re-sends the current ALERT/FATAL status.
+    # Notifications of all fleet members are packed together.
+    # Silenced (/mute, /silence) events and conditions are dropped here,
+    # before any message formatting or chart rendering happens.
+    notifications = []
+    primary_critical = False
+    for result in results:
+        critical = unsilenced_level(engine.active(result.target.valoper), result.target.valoper,
+                                    active_silences) in ['ALERT', 'FATAL']
+        message = format_alert_events(unsilenced(result, active_silences), engine, now)
+        if message is None and force_send and critical:
+            message = format_status_message(result.metrics, result.level)
+        if message:
+            notifications.append(message)
+            primary_critical = primary_critical or (result is primary and critical)
+    
+    if notifications:
+        send_telegram_messages(digest.pack_blocks(notifications, TG_MESSAGE_LIMIT))
         
-        # Send charts if requested or alert/fatal
-        if send_charts or level in ['ALERT', 'FATAL']:
-            generate_charts()
-            if REWARDS_CHART.exists():
-                send_telegram_photo(REWARDS_CHART, "Rewards History (24h)")
-            if MISSED_BLOCKS_CHART.exists():
-                send_telegram_photo(MISSED_BLOCKS_CHART, "Missed Blocks Delta (24h)")
+        # Charts are drawn from the primary validator's history
+        if send_charts or primary_critical:
+            for png, caption in generate_charts():
+                send_telegram_photo(png, caption)
     
     # Send full info report every HEARTBEAT_HOURS (terlepas dari status)
     # Ini adalah alert utama yang selalu dikirim setiap 3 jam
     # Berisi semua info termasuk WARNING jika ada
-    if should_heartbeat:
+    if should_heartbeat and not maintenance:
         full_info_message = format_full_info_message(metrics)
         send_telegram_message(full_info_message)
-        state['last_heartbeat'] = time.time()
+        if len(results) > 1:
+            send_telegram_messages(build_fleet_digest(results))
+        state['last_heartbeat'] = now
     
-    # Update state
-    # Update last_status HANYA jika alert status dikirim (ALERT/FATAL)
-    # Atau jika level berubah dari sebelumnya (untuk tracking perubahan)
-    # Ini mencegah WARNING dianggap sebagai "status baru" setiap run
-    if level in ['ALERT', 'FATAL'] or status_changed:
-        state['last_status'] = level
-    
-    state['last_missed_blocks'] = metrics.get('missed_blocks', 0)
-    state['last_height'] = metrics.get('height', 0)
-    state['last_check'] = time.time()
+    # Update state: the alert engine snapshot lives in state['alerts'],
+    # its events are appended to the event log
+    engine.flush()
+    for result in results:
+        member_state = fleet_state(state, result.target)
+        member_state['last_status'] = result.level
+        member_state['last_missed_blocks'] = result.metrics.missed_blocks
+        member_state['last_height'] = result.metrics.height
+    state['last_check'] = now
     
     # Save state
     save_state(state)
     
     # Append history
     append_history(metrics)
+    compact_history()
+    
+    EVENTS.info("Check finished", validators=len(results), status=level, notifications=len(notifications),
+                heartbeat=should_heartbeat, seconds=round(TRAFFIC.now() - now, 3))
+    return {'results': [{'level': result.level, 'validator': result.target.valoper,
+                         'active': engine.active(result.target.valoper), 'metrics': result.metrics.to_dict()}
+                        for result in results]}
 
 
 if __name__ == '__main__':
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Metrics Records
+Typed, slotted record for one monitoring sample plus fixed-point helpers for
+18-decimal token amounts.
+
+- Metrics uses __slots__ (no per-instance __dict__), so thousands of samples
+  kept for trends cost a fraction of the equivalent dicts
+- Amounts stay Python ints end to end; formatting uses integer divmod, never
+  float division, so large balances keep every digit
+- Rows for history.csv and the ring buffer are read straight off the slots
+  with a precompiled attrgetter, no intermediate dict is built
+"""
+
+from dataclasses import asdict, dataclass, fields
+from operator import attrgetter
+from typing import Any, Callable, Dict, Mapping, Sequence, Tuple, Union
+
+
+@dataclass(slots=True)
+class Metrics:
+    """One monitoring sample. Defaults are the values used when a query fails."""
+    timestamp: str = ''
+    height: int = 0
+    catching_up: bool = True
+    validator_status: str = 'UNKNOWN'
+    jailed: bool = False
+    tombstoned: bool = False
+    missed_blocks: int = 0
+    wallet_balance: int = 0
+    delegated_balance: int = 0
+    rewards: int = 0
+    moniker: str = 'Unknown'
+    commission: int = 0
+    outstanding_rewards: int = 0
+    self_delegation: int = 0
+    delegator_count: int = 0
+    accrued_rewards: int = 0
+    reward_rate_hour: float = 0.0
+    reward_rate_block: float = 0.0
+    withdrawal_detected: bool = False
+    peers: int = 0
+    mempool_txs: int = 0
+    mempool_bytes: int = 0
+    disk_total: int = 0
+    disk_free: int = 0
+    disk_growth_hour: float = 0.0
+    disk_full_hours: float = 0.0
+    node_rss: int = 0
+    node_cpu_pct: float = 0.0
+    node_fds: int = 0
+    load1: float = 0.0
+    mem_available: int = 0
+
+    @property
+    def flags(self) -> Tuple[bool, bool, bool]:
+        """(catching_up, jailed, tombstoned), packed into one byte by the ring buffer"""
+        return self.catching_up, self.jailed, self.tombstoned
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'Metrics':
+        """Build a record from a (possibly partial) dict, unknown keys are ignored"""
+        return cls(**{name: data[name] for name in FIELD_NAMES if name in data})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy, e.g. for JSON output"""
+        return asdict(self)
+
+
+FIELD_NAMES = tuple(field.name for field in fields(Metrics))
+
+MetricsLike = Union[Metrics, Mapping[str, Any]]
+
+
+def as_metrics(metrics: MetricsLike) -> Metrics:
+    """Accept a Metrics record or a plain dict (manual test scripts pass dicts)"""
+    if isinstance(metrics, Metrics):
+        return metrics
+    return Metrics.from_dict(metrics)
+
+
+def row_getter(names: Sequence[str]) -> Callable[[Metrics], tuple]:
+    """Precompiled getter returning the named fields of a record as a tuple"""
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        return lambda record: (getter(record),)
+    return getter
+
+
+# =============================================================================
+# CHARTS
+# =============================================================================
+
+# Chartable metrics: name -> (title, y label, raw sample key, rollup key, is amount)
+CHART_METRICS = {
+    'rewards': ('Pending Rewards', 'Rewards (RAI)', 'rewards', 'rewards_last', True),
+    'accrued': ('Accrued Rewards', 'Accrued (RAI)', 'accrued_rewards', 'accrued_last', True),
+    'missed': ('Missed Blocks Delta', 'Missed Blocks (Delta)', 'missed_blocks', 'missed_delta', False),
+    'balance': ('Wallet Balance', 'Balance (RAI)', 'wallet_balance', 'balance_last', True),
+    'delegated': ('Delegated', 'Delegated (RAI)', 'delegated_balance', 'delegated_last', True),
+    'height': ('Block Height', 'Height', 'height', 'height_last', False),
+}
+
+
+# =============================================================================
+# FIXED-POINT AMOUNTS
+# =============================================================================
+
+def format_amount(amount: int, decimals: int, places: int = 2) -> str:
+    """
+    Format an integer base-unit amount with `places` fraction digits,
+    rounding half up. Pure integer arithmetic.
+    """
+    amount = int(amount)
+    sign = '-' if amount < 0 else ''
+    amount = abs(amount)
+    if places >= decimals:
+        whole, frac = divmod(amount, 10 ** decimals)
+        frac *= 10 ** (places - decimals)
+    else:
+        step = 10 ** (decimals - places)
+        whole, frac = divmod((amount + step // 2) // step, 10 ** places)
+    if places == 0:
+        return f"{sign}{whole}"
+    return f"{sign}{whole}.{frac:0{places}d}"
+
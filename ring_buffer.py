@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Recent Samples Ring Buffer
+Fixed-size, memory-mapped store of the most recent monitor samples
+"""
+
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# =============================================================================
+# RECORD LAYOUT
+# =============================================================================
+
+# Header: magic, schema checksum, record size, capacity, next slot, count
+HEADER_FORMAT = '<8sIIIQQ'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAGIC = b'RAIRING1'
+
+# Field kinds. Token amounts (arai, 18 decimals) overflow int64 after ~9 RAI,
+# so they are stored exactly as two unsigned 64-bit halves.
+FIELD_KINDS = {
+    'time': 'd',     # unix timestamp (float seconds)
+    'int': 'q',      # signed 64-bit integer
+    'float': 'd',    # 64-bit float
+    'flags': 'B',    # up to 8 boolean flags
+    'amount': 'QQ',  # unsigned 128-bit integer (hi, lo)
+}
+
+_MASK64 = (1 << 64) - 1
+
+
+def _record_format(fields: Sequence[Tuple[str, str]]) -> str:
+    """Build struct format for a field list"""
+    return '<' + ''.join(FIELD_KINDS[kind] for _, kind in fields)
+
+
+def _schema_checksum(fields: Sequence[Tuple[str, str]]) -> int:
+    """Checksum of field names and kinds, detects layout changes"""
+    spec = ','.join(f"{name}:{kind}" for name, kind in fields)
+    return zlib.crc32(spec.encode())
+
+
+# =============================================================================
+# RING BUFFER
+# =============================================================================
+
+class RingBuffer:
+    """
+    Fixed-capacity ring of fixed-width numeric records backed by an mmap file.
+
+    Memory and disk usage stay bounded at HEADER_SIZE + capacity * record_size
+    no matter how long the monitor runs. When the field layout changes the
+    file is recreated (recent samples are a cache, history.csv is the source
+    of truth).
+    """
+
+    def __init__(self, path: Path, fields: Sequence[Tuple[str, str]], capacity: int):
+        self.path = Path(path)
+        self.fields = list(fields)
+        self.capacity = max(1, int(capacity))
+        self._format = _record_format(self.fields)
+        self._struct = struct.Struct(self._format)
+        self.record_size = self._struct.size
+        self._checksum = _schema_checksum(self.fields)
+        self._first_field = struct.Struct('<' + FIELD_KINDS[self.fields[0][1]]) if self.fields else None
+        self._mm: Optional[mmap.mmap] = None
+        self._fd: Optional[int] = None
+        self._open()
+
+    # -------------------------------------------------------------------------
+    # File handling
+    # -------------------------------------------------------------------------
+
+    def _file_size(self) -> int:
+        return HEADER_SIZE + self.capacity * self.record_size
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o644)
+        size = self._file_size()
+
+        valid = False
+        if os.fstat(self._fd).st_size == size:
+            raw = os.pread(self._fd, HEADER_SIZE, 0)
+            magic, checksum, record_size, capacity, _, _ = struct.unpack(HEADER_FORMAT, raw)
+            valid = (magic == MAGIC and checksum == self._checksum
+                     and record_size == self.record_size and capacity == self.capacity)
+
+        if not valid:
+            os.ftruncate(self._fd, 0)
+            os.ftruncate(self._fd, size)
+
+        self._mm = mmap.mmap(self._fd, size)
+        if not valid:
+            self._write_header(0, 0)
+            self._mm.flush()
+
+    def close(self) -> None:
+        """Flush and release the mapping"""
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> 'RingBuffer':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _read_header(self) -> Tuple[int, int]:
+        _, _, _, _, head, count = struct.unpack_from(HEADER_FORMAT, self._mm, 0)
+        return head, count
+
+    def _write_header(self, head: int, count: int) -> None:
+        struct.pack_into(HEADER_FORMAT, self._mm, 0, MAGIC, self._checksum,
+                         self.record_size, self.capacity, head, count)
+
+    # -------------------------------------------------------------------------
+    # Encoding
+    # -------------------------------------------------------------------------
+
+    def _encode(self, row: Sequence[Any]) -> list:
+        values = []
+        for (_, kind), value in zip(self.fields, row):
+            if kind == 'amount':
+                amount = max(0, int(value or 0))
+                values.append((amount >> 64) & _MASK64)
+                values.append(amount & _MASK64)
+            elif kind == 'flags':
+                bits = 0
+                for i, flag in enumerate(value or ()):
+                    if flag:
+                        bits |= 1 << i
+                values.append(bits)
+            elif kind == 'int':
+                values.append(int(value or 0))
+            else:
+                values.append(float(value or 0.0))
+        return values
+
+    def _decode(self, values: tuple) -> Dict[str, Any]:
+        record = {}
+        i = 0
+        for name, kind in self.fields:
+            if kind == 'amount':
+                record[name] = (values[i] << 64) | values[i + 1]
+                i += 2
+            else:
+                record[name] = values[i]
+                i += 1
+        return record
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._read_header()[1]
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Write one record, overwriting the oldest when full"""
+        self.append_row([record.get(name) for name, _ in self.fields])
+
+    def append_row(self, row: Sequence[Any]) -> None:
+        """Write one record given as values in field order"""
+        head, count = self._read_header()
+        self._struct.pack_into(self._mm, HEADER_SIZE + head * self.record_size,
+                               *self._encode(row))
+        head = (head + 1) % self.capacity
+        count = min(count + 1, self.capacity)
+        self._write_header(head, count)
+        self._mm.flush()
+
+    def _offset(self, head: int, count: int, index: int) -> int:
+        """File offset of the index-th oldest record"""
+        return HEADER_SIZE + (head - count + index) % self.capacity * self.record_size
+
+    def _time_at(self, head: int, count: int, index: int) -> float:
+        return self._first_field.unpack_from(self._mm, self._offset(head, count, index))[0]
+
+    def records(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Return records in chronological order.
+        If since is given, only records whose first (time) field is >= since;
+        records are appended in time order, so the first one is found by
+        binary search and only the records from there on are decoded.
+        """
+        head, count = self._read_header()
+        skip = 0
+        if since is not None and self._first_field is not None:
+            low, high = 0, count
+            while low < high:
+                middle = (low + high) // 2
+                if self._time_at(head, count, middle) < since:
+                    low = middle + 1
+                else:
+                    high = middle
+            skip = low
+        return [self._decode(self._struct.unpack_from(self._mm, self._offset(head, count, index)))
+                for index in range(skip, count)]
+
+    def first(self) -> Optional[Dict[str, Any]]:
+        """Return the oldest record"""
+        head, count = self._read_header()
+        if count == 0:
+            return None
+        return self._decode(self._struct.unpack_from(self._mm, self._offset(head, count, 0)))
+
+    def last(self) -> Optional[Dict[str, Any]]:
+        """Return the most recent record"""
+        head, count = self._read_header()
+        if count == 0:
+            return None
+        slot = (head - 1) % self.capacity
+        values = self._struct.unpack_from(self._mm, HEADER_SIZE + slot * self.record_size)
+        return self._decode(values)
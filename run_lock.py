@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Run Lock
+Cross-process coordination between monitor.py runs (hourly timer, bot
+/status --force) and bot.py, based on flock(2) lock files.
+
+- FileLock: exclusive lock on a lock file; released by the kernel when the
+  holder exits or crashes, so a lock can never go stale
+- SingleFlight: only one run computes at a time. A run arriving while
+  another is in flight waits for it and reuses its result (written next to
+  the lock) instead of computing again
+"""
+
+import fcntl
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, Tuple
+
+POLL_INTERVAL = 0.1
+
+
+class LockTimeout(Exception):
+    """The lock was not released in time"""
+
+
+class FileLock:
+    """Exclusive flock on a file; usable as a context manager (blocking)"""
+
+    def __init__(self, path: Path, timeout: Optional[float] = None):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._fd: Optional[int] = None
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """Take the lock. False if not blocking (or timed out) and it is held elsewhere."""
+        if self._fd is not None:
+            raise RuntimeError(f"Lock already held: {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._fd = fd
+                return True
+            except BlockingIOError:
+                if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                    os.close(fd)
+                    return False
+                time.sleep(POLL_INTERVAL)
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    def __enter__(self) -> 'FileLock':
+        if not self.acquire(timeout=self.timeout):
+            raise LockTimeout(f"Timed out waiting for {self.path}")
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+class SingleFlight:
+    """One computation at a time across processes, with result sharing"""
+
+    def __init__(self, lock_path: Path, result_path: Path):
+        self.lock = FileLock(lock_path)
+        self.result_path = Path(result_path)
+
+    def _read_result(self, finished_after: float) -> Optional[Any]:
+        try:
+            with open(self.result_path, 'r') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get('finished', 0) < finished_after:
+            return None
+        return record.get('result')
+
+    def _write_result(self, started: float, result: Any) -> None:
+        temp_file = self.result_path.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump({'started': started, 'finished': time.time(), 'result': result}, f)
+        os.replace(temp_file, self.result_path)
+
+    def run(self, compute: Callable[[], Any], timeout: Optional[float] = None) -> Tuple[Any, bool]:
+        """
+        Run compute() under the lock and publish its (JSON-serializable)
+        result. If another process holds the lock, wait for it and return
+        its result instead. Returns (result, shared).
+        """
+        arrived = time.time()
+        if not self.lock.acquire(blocking=False):
+            if not self.lock.acquire(timeout=timeout):
+                raise LockTimeout(f"Timed out waiting for {self.lock.path}")
+            # The run we waited for finished after we arrived: reuse it.
+            # Without a result (it crashed) we compute ourselves.
+            result = self._read_result(arrived)
+            if result is not None:
+                self.lock.release()
+                return result, True
+        try:
+            started = time.time()
+            result = compute()
+            if result is not None:
+                self._write_result(started, result)
+            return result, False
+        finally:
+            self.lock.release()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Signing Store
+Per-block signing record of one validator as compact bitmaps, one bit per
+block height, in history/signing/:
+
+    <address>.fetched   block commit was read (backfill progress)
+    <address>.active    validator was in the validator set at that height
+    <address>.signed    validator's signature is in the commit
+    <address>.json      base height and the height range of every UTC day
+
+Bit i of a plane is height base + i (least significant bit first), so a
+height range maps to a byte slice and counting is a popcount over one int.
+10 million blocks take 1.25 MB per plane.
+
+The fetched plane doubles as the backfill checkpoint: an interrupted
+backfill resumes with exactly the heights still missing.
+
+Uptime reports combine per-day summaries (signed ratio, miss streaks). A
+summary of a closed, fully fetched day never changes and is cached in the
+metadata; recording a block of that day again drops it.
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+PLANES = ('fetched', 'active', 'signed')
+
+# Bumped when recorded bits change meaning; older stores are refetched
+# (version 1 recorded missed blocks as outside the active set)
+FORMAT_VERSION = 2
+
+_NONZERO_BYTES = re.compile(rb'[^\x00]+')
+
+
+class SigningStore:
+    """Signing bitmaps of one validator (consensus address, hex)"""
+
+    def __init__(self, directory: Path, address: str):
+        self.directory = Path(directory)
+        self.address = address.upper()
+        self.base: Optional[int] = None
+        self.days: Dict[str, List[int]] = {}  # 'YYYY-MM-DD' -> [first height, last height]
+        self.summaries: Dict[str, list] = {}  # closed day -> DaySummary fields
+        self.planes: Dict[str, bytearray] = {name: bytearray() for name in PLANES}
+        self._load()
+
+    def _path(self, suffix: str) -> Path:
+        return self.directory / f"{self.address}.{suffix}"
+
+    def _load(self) -> None:
+        try:
+            with open(self._path('json'), 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        if meta.get('version') != FORMAT_VERSION:
+            return
+        self.base = meta.get('base')
+        self.days = meta.get('days', {})
+        self.summaries = meta.get('summaries', {})
+        size = 0
+        for name in PLANES:
+            try:
+                self.planes[name] = bytearray(self._path(name).read_bytes())
+            except OSError:
+                self.planes[name] = bytearray()
+            size = max(size, len(self.planes[name]))
+        for plane in self.planes.values():
+            plane.extend(bytes(size - len(plane)))
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+
+    def _index(self, height: int) -> int:
+        """Bit index of a height, growing the planes as needed"""
+        if self.base is None:
+            self.base = height - height % 8
+        if height < self.base:
+            new_base = height - height % 8
+            pad = bytes((self.base - new_base) // 8)
+            for name in PLANES:
+                self.planes[name][:0] = pad
+            self.base = new_base
+        index = height - self.base
+        size = index // 8 + 1
+        if size > len(self.planes['fetched']):
+            grow = max(size, len(self.planes['fetched']) * 5 // 4) - len(self.planes['fetched'])
+            for plane in self.planes.values():
+                plane.extend(bytes(grow))
+        return index
+
+    def record(self, height: int, active: bool, signed: bool, day: Optional[str] = None) -> None:
+        """Store the signing outcome of one block (day: UTC date of the block)"""
+        index = self._index(height)
+        byte, mask = index >> 3, 1 << (index & 7)
+        self.planes['fetched'][byte] |= mask
+        for name, value in (('active', active), ('signed', signed)):
+            if value:
+                self.planes[name][byte] |= mask
+            else:
+                self.planes[name][byte] &= ~mask & 0xFF
+        if day:
+            self.summaries.pop(day, None)
+            span = self.days.get(day)
+            if span is None:
+                self.days[day] = [height, height]
+            else:
+                span[0] = min(span[0], height)
+                span[1] = max(span[1], height)
+
+    def flush(self) -> None:
+        """Write all planes and the metadata atomically"""
+        if self.base is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name in PLANES:
+            _atomic_write(self._path(name), bytes(self.planes[name]))
+        self.flush_meta()
+
+    def flush_meta(self) -> None:
+        """Write only the metadata (e.g. after caching day summaries)"""
+        if self.base is None:
+            return
+        meta = {
+            'version': FORMAT_VERSION,
+            'address': self.address,
+            'base': self.base,
+            'days': dict(sorted(self.days.items())),
+            'summaries': dict(sorted(self.summaries.items())),
+        }
+        _atomic_write(self._path('json'), json.dumps(meta, separators=(',', ':')).encode())
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def bits(self, name: str, start: int, end: int) -> int:
+        """Bits of heights start..end (inclusive) of a plane as an int, bit 0 = start"""
+        if self.base is None or end < start:
+            return 0
+        lo = max(start, self.base) - self.base
+        hi = end - self.base
+        if hi < 0:
+            return 0
+        plane = self.planes[name]
+        chunk = int.from_bytes(plane[lo >> 3:(hi >> 3) + 1], 'little') >> (lo & 7)
+        value = chunk & ((1 << (hi - lo + 1)) - 1)
+        return value << (lo + self.base - start)
+
+    def missing(self, start: int, end: int) -> Iterator[int]:
+        """Heights in start..end (inclusive) whose commit was not fetched yet"""
+        count = end - start + 1
+        if count <= 0:
+            return
+        todo = ~self.bits('fetched', start, end) & ((1 << count) - 1)
+        for offset, byte in enumerate(todo.to_bytes((count + 7) // 8, 'little')):
+            if byte:
+                for bit in range(8):
+                    if byte >> bit & 1:
+                        yield start + offset * 8 + bit
+
+    def counts(self, start: int, end: int) -> Tuple[int, int, int]:
+        """(fetched, active, signed) block counts in start..end (inclusive)"""
+        return tuple(self.bits(name, start, end).bit_count() for name in PLANES)
+
+    def height_range(self) -> Optional[Tuple[int, int]]:
+        """Lowest and highest fetched height"""
+        fetched = int.from_bytes(self.planes['fetched'], 'little')
+        if not fetched:
+            return None
+        low = (fetched & -fetched).bit_length() - 1
+        return self.base + low, self.base + fetched.bit_length() - 1
+
+
+# =============================================================================
+# UPTIME
+# =============================================================================
+
+class DaySummary(NamedTuple):
+    """Signing of one day's blocks. Runs count consecutive missed blocks."""
+    day: str
+    first: int
+    last: int
+    fetched: int
+    active: int
+    signed: int
+    longest: int    # longest miss streak
+    leading: int    # misses from the first block on
+    trailing: int   # misses up to the last block
+
+
+class UptimeReport(NamedTuple):
+    """Signing over a range of days"""
+    days: List[DaySummary]
+    fetched: int
+    active: int
+    signed: int
+    longest: int
+
+    @property
+    def missed(self) -> int:
+        return self.active - self.signed
+
+    @property
+    def ratio(self) -> float:
+        """Signed share of the blocks the validator had to sign"""
+        return self.signed / self.active if self.active else 0.0
+
+
+def _longest_run(value: int) -> int:
+    """Longest run of 1 bits of a (small) int"""
+    longest = 0
+    while value:
+        lowest = value & -value
+        carried = value + lowest  # clears the lowest run, sets the bit above it
+        longest = max(longest, (carried & -carried).bit_length() - lowest.bit_length())
+        value &= carried
+    return longest
+
+
+def run_lengths(value: int, length: int) -> Tuple[int, int, int]:
+    """
+    (longest run, leading run from bit 0, trailing run ending at bit
+    length - 1) of 1 bits. Runs never cross a zero byte, so only the
+    non-zero byte groups are scanned, each as a small int.
+    """
+    if not value:
+        return 0, 0, 0
+    leading = min(length, ((value + 1) & ~value).bit_length() - 1)
+    gaps = ~value & ((1 << length) - 1)
+    trailing = length - gaps.bit_length()
+    longest = max(
+        _longest_run(int.from_bytes(match.group(), 'little'))
+        for match in _NONZERO_BYTES.finditer(value.to_bytes((length + 7) // 8, 'little'))
+    )
+    return longest, leading, trailing
+
+
+def day_summary(store: SigningStore, day: str, closed: bool) -> Optional[DaySummary]:
+    """Summary of one day, from the cache for closed, fully fetched days"""
+    cached = store.summaries.get(day)
+    if cached:
+        return DaySummary(day, *cached)
+    span = store.days.get(day)
+    if not span:
+        return None
+    first, last = span
+    fetched, active, signed = store.counts(first, last)
+    missed = store.bits('active', first, last) & ~store.bits('signed', first, last)
+    summary = DaySummary(day, first, last, fetched, active, signed, *run_lengths(missed, last - first + 1))
+    if closed and fetched == last - first + 1:
+        store.summaries[day] = list(summary[1:])
+    return summary
+
+
+def uptime_report(store: SigningStore, days: List[str], today: str) -> UptimeReport:
+    """
+    Combine the summaries of the given days (ascending 'YYYY-MM-DD'). Days
+    before today are closed and get cached. Miss streaks continue across
+    midnight when the days' height ranges are adjacent.
+    """
+    summaries = []
+    fetched = active = signed = longest = 0
+    streak = 0  # misses running into the next day
+    previous_last = None
+    for day in days:
+        summary = day_summary(store, day, day < today)
+        if summary is None:
+            streak, previous_last = 0, None
+            continue
+        summaries.append(summary)
+        fetched += summary.fetched
+        active += summary.active
+        signed += summary.signed
+        if previous_last is None or summary.first != previous_last + 1:
+            streak = 0
+        length = summary.last - summary.first + 1
+        longest = max(longest, summary.longest, streak + summary.leading)
+        streak = streak + length if summary.leading == length else summary.trailing
+        previous_last = summary.last
+    return UptimeReport(summaries, fetched, active, signed, longest)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    temp_file = path.with_suffix(path.suffix + '.tmp')
+    with open(temp_file, 'wb') as f:
+        f.write(data)
+    os.replace(temp_file, path)
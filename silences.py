@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Silences & Acknowledgements
+Shared between bot.py (writes) and monitor.py (reads), through
+history/silences.json:
+
+    {"silences": [{"id", "validator", "condition", "until", "by", "created"}],
+     "acks":     [{"validator", "condition", "ts", "by"}]}
+
+- A silence suppresses notifications of matching alerts until it expires;
+  validator/condition '*' match everything
+- An ack is a one-shot request: the monitor applies it to the alert engine
+  (stopping reminders of conditions that were firing at that time) and
+  removes it
+- Every read-modify-write holds silences.lock, so concurrent bot commands
+  and a monitor run taking acks cannot lose each other's changes
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from run_lock import FileLock
+
+ANY = '*'
+
+# Condition names the monitor alerts on (ALERT_RULES in monitor.py)
+CONDITIONS = ('tombstoned', 'jailed', 'missed_rising', 'stuck_height', 'catching_up', 'not_bonded',
+              'disk_filling')
+
+_UNITS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+MAX_SILENCE_SECONDS = 30 * 86400
+LOCK_TIMEOUT = 10
+
+
+def parse_duration(text: str) -> Optional[float]:
+    """Parse '30m', '2h', '1d', '1w' into seconds (max 30 days)"""
+    text = (text or '').strip().lower()
+    if len(text) < 2 or text[-1] not in _UNITS:
+        return None
+    try:
+        seconds = float(text[:-1]) * _UNITS[text[-1]]
+    except ValueError:
+        return None
+    if seconds <= 0 or seconds > MAX_SILENCE_SECONDS:
+        return None
+    return seconds
+
+
+def load(path: Path) -> Dict[str, Any]:
+    """Load silences file, empty structure if missing or unreadable"""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data.setdefault('silences', [])
+            data.setdefault('acks', [])
+            return data
+    except (OSError, ValueError):
+        pass
+    return {'silences': [], 'acks': []}
+
+
+def save(path: Path, data: Dict[str, Any]) -> None:
+    """Write silences file atomically"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = path.with_suffix('.tmp')
+    with open(temp_file, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(temp_file, path)
+
+
+def _locked(path: Path) -> FileLock:
+    return FileLock(Path(path).with_suffix('.lock'), timeout=LOCK_TIMEOUT)
+
+
+def active(data: Dict[str, Any], now: Optional[float] = None) -> List[Dict[str, Any]]:
+    """Silences that have not expired yet"""
+    now = now if now is not None else time.time()
+    return [entry for entry in data.get('silences', []) if entry.get('until', 0) > now]
+
+
+def _matches(entry: Dict[str, Any], validator: str, condition: str) -> bool:
+    return (entry.get('validator', ANY) in (ANY, validator)
+            and entry.get('condition', ANY) in (ANY, condition))
+
+
+def is_silenced(entries: List[Dict[str, Any]], validator: str, condition: str) -> bool:
+    """Whether an alert of validator/condition is covered by one of the (active) silences"""
+    return any(_matches(entry, validator, condition) for entry in entries)
+
+
+def is_global(entries: List[Dict[str, Any]]) -> bool:
+    """Whether everything is silenced (maintenance window)"""
+    return any(entry.get('validator') == ANY and entry.get('condition') == ANY for entry in entries)
+
+
+def add_silence(path: Path, seconds: float, condition: str = ANY, validator: str = ANY,
+                by: str = '', now: Optional[float] = None) -> Dict[str, Any]:
+    """Add a silence window, pruning expired ones. Returns the new entry."""
+    now = now if now is not None else time.time()
+    with _locked(path):
+        data = load(path)
+        data['silences'] = active(data, now)
+        entry = {
+            'id': max((entry.get('id', 0) for entry in data['silences']), default=0) + 1,
+            'validator': validator,
+            'condition': condition,
+            'until': now + seconds,
+            'by': by,
+            'created': now,
+        }
+        data['silences'].append(entry)
+        save(path, data)
+        return entry
+
+
+def clear_silences(path: Path, silence_id: Optional[int] = None) -> int:
+    """Remove one silence (all if silence_id is None). Returns the number removed."""
+    with _locked(path):
+        data = load(path)
+        before = len(data['silences'])
+        if silence_id is None:
+            data['silences'] = []
+        else:
+            data['silences'] = [entry for entry in data['silences'] if entry.get('id') != silence_id]
+        removed = before - len(data['silences'])
+        if removed:
+            save(path, data)
+        return removed
+
+
+def add_ack(path: Path, condition: str = ANY, validator: str = ANY,
+            by: str = '', now: Optional[float] = None) -> Dict[str, Any]:
+    """Queue an acknowledgement for the next monitor run"""
+    now = now if now is not None else time.time()
+    with _locked(path):
+        data = load(path)
+        entry = {'validator': validator, 'condition': condition, 'ts': now, 'by': by}
+        data['acks'].append(entry)
+        save(path, data)
+        return entry
+
+
+def take_acks(path: Path) -> List[Dict[str, Any]]:
+    """Remove and return queued acknowledgements"""
+    with _locked(path):
+        data = load(path)
+        acks = data['acks']
+        if acks:
+            data['acks'] = []
+            save(path, data)
+        return acks
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Message Templates
+Compiled Telegram message templates rendered in one pass into plain text,
+MarkdownV2 and HTML.
+
+- Templates are compiled once at import: each line is split into literal and
+  field parts, and the literals are escaped for every output format up front
+- Rendering formats each field value once and appends it to all three
+  variants, so a fleet of messages costs one pass per message
+- Lines starting with "# " are headings (bold in MarkdownV2/HTML)
+- Timestamps use a configurable timezone and locale (number separators,
+  date format), resolved once per renderer
+"""
+
+import html
+import string
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+# Telegram parse_mode value -> variant
+PARSE_MODES = {'': 'text', 'MarkdownV2': 'markdown', 'HTML': 'html'}
+
+_MARKDOWN_SPECIAL = set('_*[]()~`>#+-=|{}.!\\')
+
+# Locale -> number/date conventions
+LOCALES = {
+    'en': {'thousands': ',', 'decimal': '.', 'date': '%Y-%m-%d %H:%M'},
+    'id': {'thousands': '.', 'decimal': ',', 'date': '%d-%m-%Y %H:%M'},
+    'de': {'thousands': '.', 'decimal': ',', 'date': '%d.%m.%Y %H:%M'},
+}
+
+
+class Rendered(NamedTuple):
+    """One message in every output format"""
+    text: str
+    markdown: str
+    html: str
+
+    def for_parse_mode(self, parse_mode: str) -> str:
+        """Variant matching a Telegram parse_mode ('', 'MarkdownV2', 'HTML')"""
+        return getattr(self, PARSE_MODES.get(parse_mode, 'text'))
+
+
+# =============================================================================
+# ESCAPING
+# =============================================================================
+
+def escape_markdown(value: str) -> str:
+    """Escape text for Telegram MarkdownV2"""
+    return ''.join('\\' + ch if ch in _MARKDOWN_SPECIAL else ch for ch in value)
+
+
+def _escape(value: str) -> Tuple[str, str, str]:
+    return value, escape_markdown(value), html.escape(value, quote=False)
+
+
+# =============================================================================
+# COMPILATION
+# =============================================================================
+
+class Template:
+    """A compiled message template"""
+
+    __slots__ = ('source', '_lines', 'fields')
+
+    def __init__(self, source: str):
+        self.source = source
+        self._lines = []
+        fields = []
+        formatter = string.Formatter()
+        for line in source.split('\n'):
+            heading = line.startswith('# ')
+            if heading:
+                line = line[2:]
+            parts = []
+            for literal, field, spec, conversion in formatter.parse(line):
+                if literal:
+                    parts.append(_escape(literal))
+                if field is not None:
+                    if conversion:
+                        raise ValueError(f"Conversions are not supported: {{{field}!{conversion}}}")
+                    parts.append((field, spec or ''))
+                    fields.append(field)
+            self._lines.append((heading, parts))
+        self.fields = tuple(dict.fromkeys(fields))
+
+    def render(self, context: Mapping[str, Any]) -> Rendered:
+        """Render all output formats in one pass over the compiled parts"""
+        text: List[str] = []
+        markdown: List[str] = []
+        markup: List[str] = []
+        for index, (heading, parts) in enumerate(self._lines):
+            if index:
+                text.append('\n')
+                markdown.append('\n')
+                markup.append('\n')
+            if heading:
+                markdown.append('*')
+                markup.append('<b>')
+            for part in parts:
+                if len(part) == 2:
+                    name, spec = part
+                    part = _escape(format(context[name], spec))
+                text.append(part[0])
+                markdown.append(part[1])
+                markup.append(part[2])
+            if heading:
+                markdown.append('*')
+                markup.append('</b>')
+        return Rendered(''.join(text), ''.join(markdown), ''.join(markup))
+
+
+def compile_templates(sources: Mapping[str, str]) -> Dict[str, Template]:
+    """Compile a name -> source mapping"""
+    return {name: Template(source) for name, source in sources.items()}
+
+
+def render_table(headers: Sequence[str], rows: Sequence[Sequence[Any]], title: str = '') -> Rendered:
+    """
+    Render a compact fixed-width table (code block in MarkdownV2/HTML).
+    Numeric-looking columns are right aligned.
+    """
+    cells = [[str(value) for value in row] for row in rows]
+    widths = [len(header) for header in headers]
+    for row in cells:
+        for i, value in enumerate(row):
+            widths[i] = max(widths[i], len(value))
+    numeric = [all(_is_number(row[i]) for row in cells) and bool(cells) for i in range(len(headers))]
+
+    def line(values):
+        return ' '.join(
+            value.rjust(widths[i]) if numeric[i] else value.ljust(widths[i])
+            for i, value in enumerate(values)
+        ).rstrip()
+
+    body = '\n'.join([line(headers), line(['-' * width for width in widths])] + [line(row) for row in cells])
+    code_markdown = body.replace('\\', '\\\\').replace('`', '\\`')
+    text = f"{title}\n{body}" if title else body
+    markdown = f"*{escape_markdown(title)}*\n```\n{code_markdown}\n```" if title else f"```\n{code_markdown}\n```"
+    markup = f"<pre>{html.escape(body, quote=False)}</pre>"
+    if title:
+        markup = f"<b>{html.escape(title, quote=False)}</b>\n{markup}"
+    return Rendered(text, markdown, markup)
+
+
+def _is_number(value: str) -> bool:
+    return value.replace(',', '').replace('.', '').replace('-', '').replace('%', '').isdigit()
+
+
+# =============================================================================
+# LOCALE & TIMEZONE
+# =============================================================================
+
+def parse_timezone(name: str) -> tzinfo:
+    """IANA name ('Asia/Jakarta') or fixed offset ('UTC+7', '+05:30')"""
+    name = (name or 'UTC').strip()
+    offset = name[3:] if name.upper().startswith('UTC') else name
+    if not offset:
+        return timezone.utc
+    if offset[0] in '+-':
+        sign = -1 if offset[0] == '-' else 1
+        hours, _, minutes = offset[1:].partition(':')
+        delta = timedelta(hours=int(hours), minutes=int(minutes or 0))
+        return timezone(sign * delta, name)
+    return ZoneInfo(name)
+
+
+class Locale:
+    """Number and date formatting for one locale and timezone"""
+
+    __slots__ = ('tz', 'thousands', 'decimal', 'date_format', 'tz_label')
+
+    def __init__(self, locale: str = 'en', tz_name: str = 'UTC', tz_label: Optional[str] = None):
+        conventions = LOCALES.get(locale, LOCALES['en'])
+        self.thousands = conventions['thousands']
+        self.decimal = conventions['decimal']
+        self.date_format = conventions['date']
+        self.tz = parse_timezone(tz_name)
+        self.tz_label = tz_label
+
+    def number(self, value: int) -> str:
+        """Integer with thousands separators"""
+        formatted = f"{value:,}"
+        return formatted if self.thousands == ',' else formatted.replace(',', self.thousands)
+
+    def decimal_text(self, value: str) -> str:
+        """Swap the decimal mark of an already formatted amount"""
+        return value if self.decimal == '.' else value.replace('.', self.decimal)
+
+    def timestamp(self, now: Optional[datetime] = None) -> str:
+        """Local time with zone label, e.g. '2024-01-01 07:00 WIB'"""
+        local = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        label = self.tz_label or local.tzname() or ''
+        return f"{local.strftime(self.date_format)} {label}".rstrip()
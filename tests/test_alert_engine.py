@@ -0,0 +1,193 @@
+"""Alert state machine, reminders, escalation and event sourcing (alert_engine.py)"""
+
+import json
+
+from alert_engine import NOTIFY_KINDS, AlertEngine, Rule
+
+V = 'republicvaloper1x'
+MIN = 60
+HOUR = 3600
+
+
+def kinds(events):
+    return [(event.condition, event.kind, event.level) for event in events]
+
+
+def run(engine, samples, validator=V):
+    """Evaluate (time, observations) samples, returns all events"""
+    events = []
+    for now, observations in samples:
+        events.extend(engine.evaluate(validator, observations, now))
+    return events
+
+
+# -----------------------------------------------------------------------------
+# Transitions
+# -----------------------------------------------------------------------------
+
+def test_pending_firing_clearing_ok():
+    engine = AlertEngine({}, {'catching_up': Rule('WARNING', raise_after=10 * MIN, clear_after=30 * MIN)})
+    assert kinds(engine.evaluate(V, {'catching_up': True}, 0)) == [('catching_up', 'pending', 'WARNING')]
+    assert engine.level(V) == 'HEALTHY'  # pending does not count yet
+    assert engine.firing_since(V, 'catching_up') is None
+    assert engine.evaluate(V, {'catching_up': True}, 5 * MIN) == []
+    assert kinds(engine.evaluate(V, {'catching_up': True}, 10 * MIN)) == [('catching_up', 'raised', 'WARNING')]
+    assert engine.level(V) == 'WARNING'
+    assert engine.firing_since(V, 'catching_up') == 10 * MIN
+
+    assert kinds(engine.evaluate(V, {}, 20 * MIN)) == [('catching_up', 'clearing', 'WARNING')]
+    assert engine.level(V) == 'WARNING'  # still firing while clearing
+    assert engine.evaluate(V, {}, 40 * MIN) == []
+    assert kinds(engine.evaluate(V, {}, 50 * MIN)) == [('catching_up', 'cleared', 'WARNING')]
+    assert engine.level(V) == 'HEALTHY'
+    assert engine.snapshot == {}
+
+
+def test_pending_dropped_before_raise_after():
+    engine = AlertEngine({}, {'not_bonded': Rule('WARNING', raise_after=10 * MIN)})
+    events = run(engine, [(0, {'not_bonded': True}), (5 * MIN, {})])
+    assert kinds(events) == [('not_bonded', 'pending', 'WARNING'), ('not_bonded', 'dropped', 'WARNING')]
+    assert engine.snapshot == {}
+    assert not any(event.kind in NOTIFY_KINDS for event in events)
+
+
+def test_no_raise_after_fires_at_once_and_no_clear_after_clears_at_once():
+    engine = AlertEngine({}, {'jailed': Rule('ALERT')})
+    assert kinds(engine.evaluate(V, {'jailed': True}, 0)) == [('jailed', 'raised', 'ALERT')]
+    assert kinds(engine.evaluate(V, {'jailed': False}, MIN)) == [('jailed', 'cleared', 'ALERT')]
+
+
+def test_flapping_within_clear_after_does_not_notify_again():
+    engine = AlertEngine({}, {'missed_rising': Rule('ALERT', clear_after=30 * MIN)})
+    events = run(engine, [
+        (0, {'missed_rising': True}),
+        (10 * MIN, {}),
+        (20 * MIN, {'missed_rising': True}),
+        (30 * MIN, {}),
+        (50 * MIN, {}),
+    ])
+    assert [event.kind for event in events] == ['raised', 'clearing', 'recovered', 'clearing']
+    assert [event.kind for event in events if event.kind in NOTIFY_KINDS] == ['raised']
+    # The clearing timer restarted at 30 min
+    assert kinds(engine.evaluate(V, {}, 60 * MIN)) == [('missed_rising', 'cleared', 'ALERT')]
+
+
+def test_highest_level_wins():
+    engine = AlertEngine({}, {'catching_up': Rule('WARNING'), 'jailed': Rule('ALERT'),
+                              'tombstoned': Rule('FATAL')})
+    engine.evaluate(V, {'catching_up': True, 'jailed': True}, 0)
+    assert engine.level(V) == 'ALERT'
+    assert engine.active(V) == {'catching_up': 'WARNING', 'jailed': 'ALERT'}
+    engine.evaluate(V, {'catching_up': True, 'jailed': True, 'tombstoned': True}, MIN)
+    assert engine.level(V) == 'FATAL'
+    assert engine.level('republicvaloper1other') == 'HEALTHY'
+
+
+# -----------------------------------------------------------------------------
+# Reminders, acknowledgements, escalation
+# -----------------------------------------------------------------------------
+
+def test_reminders_until_acknowledged():
+    engine = AlertEngine({}, {'jailed': Rule('ALERT', remind_every=4 * HOUR)})
+    engine.evaluate(V, {'jailed': True}, 0)
+    assert engine.evaluate(V, {'jailed': True}, 3 * HOUR) == []
+    assert kinds(engine.evaluate(V, {'jailed': True}, 4 * HOUR)) == [('jailed', 'reminder', 'ALERT')]
+    assert engine.evaluate(V, {'jailed': True}, 7 * HOUR) == []  # counted from the last reminder
+    assert kinds(engine.evaluate(V, {'jailed': True}, 8 * HOUR)) == [('jailed', 'reminder', 'ALERT')]
+    assert engine.reminders(V, 'jailed') == 2
+
+    assert kinds(engine.acknowledge(V, None, 9 * HOUR)) == [('jailed', 'acked', 'ALERT')]
+    assert engine.acknowledge(V, None, 9 * HOUR) == []  # already acknowledged
+    assert run(engine, [(hour * HOUR, {'jailed': True}) for hour in range(10, 40)]) == []
+    assert engine.level(V) == 'ALERT'
+
+
+def test_acknowledgement_ends_with_the_alert():
+    engine = AlertEngine({}, {'jailed': Rule('ALERT', remind_every=HOUR)})
+    engine.evaluate(V, {'jailed': True}, 0)
+    engine.acknowledge(V, 'jailed', MIN)
+    engine.evaluate(V, {}, 2 * MIN)
+    events = run(engine, [(3 * MIN, {'jailed': True}), (3 * MIN + HOUR, {'jailed': True})])
+    assert [event.kind for event in events] == ['raised', 'reminder']
+
+
+def test_acknowledge_only_what_fired_before():
+    engine = AlertEngine({}, {'jailed': Rule('ALERT', remind_every=HOUR),
+                              'stuck_height': Rule('ALERT', remind_every=HOUR)})
+    engine.evaluate(V, {'jailed': True}, 0)
+    engine.evaluate(V, {'jailed': True, 'stuck_height': True}, 10 * MIN)
+    # /ack sent at 5 min, applied at the next check
+    assert kinds(engine.acknowledge(V, None, 20 * MIN, fired_before=5 * MIN)) == [('jailed', 'acked', 'ALERT')]
+    assert kinds(engine.evaluate(V, {'jailed': True, 'stuck_height': True}, 10 * MIN + HOUR)) == \
+        [('stuck_height', 'reminder', 'ALERT')]
+
+
+def test_pending_cannot_be_acknowledged():
+    engine = AlertEngine({}, {'catching_up': Rule('WARNING', raise_after=HOUR)})
+    engine.evaluate(V, {'catching_up': True}, 0)
+    assert engine.acknowledge(V, None, MIN) == []
+
+
+def test_escalation_once_and_resets_reminders():
+    rule = Rule('WARNING', remind_every=HOUR, escalate_after=3 * HOUR, escalate_to='ALERT')
+    engine = AlertEngine({}, {'catching_up': rule})
+    engine.evaluate(V, {'catching_up': True}, 0)
+    engine.acknowledge(V, None, MIN)
+    events = run(engine, [(hour * HOUR, {'catching_up': True}) for hour in range(1, 4)])
+    assert kinds(events) == [('catching_up', 'escalated', 'ALERT')]
+    assert engine.level(V) == 'ALERT'
+    assert engine.reminders(V, 'catching_up') == 0
+    # Escalation is a new notification: the acknowledgement no longer holds
+    assert kinds(engine.evaluate(V, {'catching_up': True}, 4 * HOUR)) == [('catching_up', 'reminder', 'ALERT')]
+    # Never escalated twice
+    events = run(engine, [(hour * HOUR, {'catching_up': True}) for hour in range(5, 12)])
+    assert {event.kind for event in events} == {'reminder'}
+
+
+def test_escalation_counts_from_firing_not_pending():
+    rule = Rule('WARNING', raise_after=HOUR, escalate_after=2 * HOUR, escalate_to='ALERT')
+    engine = AlertEngine({}, {'not_bonded': rule})
+    events = run(engine, [(hour * HOUR, {'not_bonded': True}) for hour in range(0, 4)])
+    assert [event.kind for event in events] == ['pending', 'raised', 'escalated']
+    assert events[-1].ts == 3 * HOUR
+
+
+# -----------------------------------------------------------------------------
+# Event sourcing
+# -----------------------------------------------------------------------------
+
+RULES = {
+    'jailed': Rule('ALERT', remind_every=HOUR),
+    'catching_up': Rule('WARNING', raise_after=10 * MIN, clear_after=30 * MIN,
+                        escalate_after=2 * HOUR, escalate_to='ALERT'),
+}
+
+SAMPLES = [(minute * MIN, {'jailed': 30 <= minute < 200, 'catching_up': minute % 90 < 70})
+           for minute in range(0, 400, 5)]
+
+
+def test_replay_rebuilds_the_snapshot(tmp_path):
+    log_path = tmp_path / 'alert_events.jsonl'
+    engine = AlertEngine({}, RULES, log_path)
+    for now, observations in SAMPLES:
+        engine.evaluate(V, observations, now)
+        engine.evaluate('republicvaloper1other', {'jailed': True}, now)
+        if now == 100 * MIN:
+            engine.acknowledge(V, None, now)
+        engine.flush()
+    assert AlertEngine.replay(log_path, RULES).snapshot == engine.snapshot
+
+
+def test_rotation_keeps_the_state(tmp_path):
+    log_path = tmp_path / 'alert_events.jsonl'
+    engine = AlertEngine({}, RULES, log_path, max_log_bytes=400)
+    for now, observations in SAMPLES:
+        engine.evaluate(V, observations, now)
+        engine.flush()
+    assert any('snapshot' in json.loads(line) for line in log_path.read_text().splitlines()
+               if line.startswith('{'))
+    assert AlertEngine.replay(log_path, RULES).snapshot == engine.snapshot
+
+
+def test_replay_of_missing_log_is_empty(tmp_path):
+    assert AlertEngine.replay(tmp_path / 'none.jsonl', RULES).snapshot == {}
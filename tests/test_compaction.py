@@ -0,0 +1,238 @@
+"""Incremental rollups, retention and crash safety (compaction.py)"""
+
+import csv
+import json
+import shutil
+
+import pytest
+
+import compaction
+from compaction import CHECKPOINT_NAME, compact, load_rollup, rollup_path, upgrade_header
+
+FIELDS = ['timestamp', 'height', 'missed_blocks', 'rewards', 'balance', 'delegated']
+START = 1767225600  # 2026-01-01 00:00 UTC
+STEP = 600
+DAY = 86400
+END = START + 600 * STEP  # just after the last sample
+
+
+def rows(first, last, fields=FIELDS):
+    """Samples first..last-1, every STEP seconds"""
+    for i in range(first, last):
+        values = {
+            'timestamp': compaction._to_iso(START + i * STEP), 'height': 1000 + i * 100,
+            'missed_blocks': i // 7, 'rewards': (i % 50) * 10 ** 15, 'balance': 5 * 10 ** 18,
+            'delegated': 10 ** 21, 'accrued': i * 10 ** 15,
+        }
+        yield [values[name] for name in fields]
+
+
+def append(path, first, last, fields=FIELDS):
+    new = not path.exists()
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if new:
+            writer.writerow(fields)
+        writer.writerows(rows(first, last, fields))
+
+
+def rollups(directory):
+    return {tier: rollup_path(directory, tier).read_text() if rollup_path(directory, tier).exists() else ''
+            for tier in compaction.TIERS}
+
+
+def checkpoint(directory):
+    return json.loads((directory / CHECKPOINT_NAME).read_text())
+
+
+@pytest.fixture
+def reference(tmp_path):
+    """Rollups of samples 0..600 compacted in one run, without retention"""
+    directory = tmp_path / 'reference'
+    directory.mkdir()
+    append(directory / 'history.csv', 0, 600)
+    compact(directory / 'history.csv', directory, 0, now=END)
+    return directory
+
+
+@pytest.fixture
+def live(tmp_path):
+    directory = tmp_path / 'live'
+    directory.mkdir()
+    return directory
+
+
+# -----------------------------------------------------------------------------
+# Incremental runs
+# -----------------------------------------------------------------------------
+
+def test_incremental_runs_match_one_run(reference, live):
+    history = live / 'history.csv'
+    for first, last in [(0, 1), (1, 40), (40, 41), (41, 333), (333, 600)]:
+        append(history, first, last)
+        compact(history, live, 0, now=START + last * STEP)
+    assert rollups(live) == rollups(reference)
+    assert checkpoint(live)['buckets'] == checkpoint(reference)['buckets']
+    assert checkpoint(live)['offset'] == history.stat().st_size
+
+
+def test_closed_buckets_and_open_bucket(reference):
+    hourly = load_rollup(reference, '1h')
+    assert len(hourly) == 100  # 600 samples, 6 per hour; the last one is still open
+    assert all(bucket['samples'] == 6 for bucket in hourly)
+    assert hourly[0]['bucket'] == START
+    assert hourly[-1]['height_last'] == 1000 + 599 * 100
+    assert sum(bucket['missed_delta'] for bucket in hourly) == 599 // 7
+    assert [bucket['bucket'] for bucket in load_rollup(reference, '1h', since=START + 98 * 3600)] == \
+        [START + 98 * 3600, START + 99 * 3600]
+
+
+def test_partial_line_waits_for_the_rest(reference, live):
+    history = live / 'history.csv'
+    append(history, 0, 300)
+    line = ','.join(str(value) for value in next(rows(300, 301))) + '\r\n'
+    with open(history, 'a', newline='') as f:
+        f.write(line[:10])
+    compact(history, live, 0, now=END)
+    with open(history, 'a', newline='') as f:
+        f.write(line[10:])
+    append(history, 301, 600)
+    compact(history, live, 0, now=END)
+    assert rollups(live) == rollups(reference)
+
+
+# -----------------------------------------------------------------------------
+# Retention
+# -----------------------------------------------------------------------------
+
+def test_retention_waits_for_slack_then_cuts(live):
+    history = live / 'history.csv'
+    append(history, 0, 600)  # a bit over 4 days
+    end = START + 600 * STEP
+    compact(history, live, 3.5, now=end)  # 16 hours expired, within the slack
+    assert compaction._first_row(history).startswith(compaction._to_iso(START).encode())
+    append(history, 600, 601)  # retention runs along with new rows
+    compact(history, live, 2, now=end)  # 2 days expired: cut
+    first = compaction._first_row(history).split(b',', 1)[0].decode()
+    assert compaction._to_epoch(first) == end - 2 * DAY
+    assert checkpoint(live)['offset'] == history.stat().st_size
+
+
+def test_retention_keeps_unprocessed_rows(reference, live):
+    history = live / 'history.csv'
+    append(history, 0, 600)
+    line = ','.join(str(value) for value in next(rows(600, 601))) + '\r\n'
+    with open(history, 'a', newline='') as f:
+        f.write(line[:10])
+    # Everything rolled up is expired; the partial row after the offset stays
+    compact(history, live, 0.5, now=START + 900 * STEP)
+    assert rollups(live) == rollups(reference)
+    assert history.read_text().splitlines()[1:] == [line[:10]]
+    assert checkpoint(live)['offset'] == len(history.read_bytes().splitlines(keepends=True)[0])
+    with open(history, 'a', newline='') as f:
+        f.write(line[10:])
+    compact(history, live, 0.5, now=START + 900 * STEP)
+    assert checkpoint(live)['prev']['height'] == 1000 + 600 * 100
+
+
+# -----------------------------------------------------------------------------
+# Crashes
+# -----------------------------------------------------------------------------
+
+def test_crash_before_checkpoint_does_not_duplicate_buckets(reference, live):
+    history = live / 'history.csv'
+    append(history, 0, 300)
+    compact(history, live, 0, now=END)
+    saved = (live / CHECKPOINT_NAME).read_bytes()
+    append(history, 300, 450)
+    compact(history, live, 0, now=END)
+    # As if the run had stopped right after appending the rollups
+    (live / CHECKPOINT_NAME).write_bytes(saved)
+    append(history, 450, 600)
+    compact(history, live, 0, now=END)
+    assert rollups(live) == rollups(reference)
+
+
+def test_crash_between_cut_and_checkpoint(reference, live, monkeypatch):
+    history = live / 'history.csv'
+    append(history, 0, 400)
+    compact(history, live, 0, now=END)
+    append(history, 400, 500)
+
+    real_save = compaction._save_checkpoint
+
+    def crash_after_cut(path, data):
+        if 'trim' not in data:
+            raise KeyboardInterrupt
+        real_save(path, data)
+
+    monkeypatch.setattr(compaction, '_save_checkpoint', crash_after_cut)
+    with pytest.raises(KeyboardInterrupt):
+        compact(history, live, 1, now=START + 500 * STEP)
+    monkeypatch.setattr(compaction, '_save_checkpoint', real_save)
+    assert 'trim' in checkpoint(live)  # cut done, new offset not saved
+
+    append(history, 500, 600)
+    compact(history, live, 1, now=START + 600 * STEP)
+    assert rollups(live)['1d'] == rollups(reference)['1d']
+    assert rollups(live)['1h'] == rollups(reference)['1h']
+    assert checkpoint(live)['buckets'] == checkpoint(reference)['buckets']
+    assert checkpoint(live)['offset'] == history.stat().st_size
+
+
+def test_crash_before_cut_redoes_it(reference, live, monkeypatch):
+    history = live / 'history.csv'
+    append(history, 0, 500)
+
+    def crash(path, removed):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(compaction, '_cut', crash)
+    with pytest.raises(KeyboardInterrupt):
+        compact(history, live, 1, now=START + 500 * STEP)
+    monkeypatch.undo()
+
+    append(history, 500, 600)
+    compact(history, live, 1, now=START + 600 * STEP)
+    assert rollups(live)['1h'] == rollups(reference)['1h']
+    assert checkpoint(live)['buckets'] == checkpoint(reference)['buckets']
+    first = compaction._first_row(history).split(b',', 1)[0].decode()
+    assert compaction._to_epoch(first) == START + 600 * STEP - DAY
+
+
+# -----------------------------------------------------------------------------
+# Header upgrades
+# -----------------------------------------------------------------------------
+
+def test_upgrade_header_moves_the_offset(tmp_path, live):
+    history = live / 'history.csv'
+    append(history, 0, 300)
+    compact(history, live, 0, now=END)
+    old_offset = checkpoint(live)['offset']
+    append(history, 300, 350)  # not compacted yet
+
+    new_fields = FIELDS + ['accrued']
+    upgrade_header(history, new_fields, live)
+    offset = checkpoint(live)['offset']
+    assert offset > old_offset  # every row before it got a column
+    with open(history, 'rb') as f:
+        f.seek(offset)
+        assert f.readline().startswith(compaction._to_iso(START + 300 * STEP).encode())
+    assert history.read_text().splitlines()[1].endswith(',')
+
+    append(history, 350, 600, new_fields)
+    compact(history, live, 0, now=END)
+
+    # Same as compacting the upgraded file in one run
+    reference = tmp_path / 'upgraded'
+    reference.mkdir()
+    shutil.copy(history, reference / 'history.csv')
+    compact(reference / 'history.csv', reference, 0, now=END)
+    assert rollups(live) == rollups(reference)
+
+
+def test_upgrade_header_of_a_rollup_pads_rows(live):
+    path = rollup_path(live, '1h')
+    path.write_text('bucket,samples\r\n2026-01-01T00:00:00,6\r\n')
+    upgrade_header(path, ['bucket', 'samples', 'height_last'])
+    assert path.read_bytes() == b'bucket,samples,height_last\r\n2026-01-01T00:00:00,6,\r\n'
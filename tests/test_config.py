@@ -0,0 +1,101 @@
+"""Settings validation and SIGHUP reload (config.py)"""
+
+import dataclasses
+import os
+import signal
+from pathlib import Path
+
+import pytest
+
+import config
+from config import Config, ConfigError
+
+
+# -----------------------------------------------------------------------------
+# Validation
+# -----------------------------------------------------------------------------
+
+def test_values_are_converted_once():
+    cfg = Config.from_env({
+        'CLI_WORKERS': ' 8 ', 'HEARTBEAT_HOURS': '1.5', 'REPUBLIC_HOME': '/data/node',
+        'QUERY_BACKEND': 'GRPC', 'TG_API_URL': 'http://127.0.0.1:8081/', 'TG_PARSE_MODE': 'HTML',
+        'STUCK_MINUTES': '', 'UNKNOWN_SETTING': 'ignored',
+    })
+    assert (cfg.cli_workers, cfg.heartbeat_hours, cfg.republic_home) == (8, 1.5, Path('/data/node'))
+    assert cfg.query_backend == 'grpc'
+    assert cfg.tg_api_url == 'http://127.0.0.1:8081'
+    assert cfg.tg_parse_mode == 'HTML'
+    assert cfg.stuck_minutes == Config().stuck_minutes  # empty keeps the default
+
+
+def test_all_problems_are_reported_at_once():
+    with pytest.raises(ConfigError) as error:
+        Config.from_env({'CLI_WORKERS': 'four', 'DECIMALS': '1e3', 'BOT_MODE': 'push', 'TG_PARSE_MODE': 'Markdown',
+                         'FLEET_WORKERS': '0', 'RUN_LOCK_TIMEOUT': '-1'})
+    assert error.value.problems == [
+        "DECIMALS='1e3' is not a valid int",
+        "CLI_WORKERS='four' is not a valid int",
+        "BOT_MODE must be one of polling, webhook, got 'push'",
+        "TG_PARSE_MODE must be one of '', MarkdownV2, HTML, got 'Markdown'",
+        "FLEET_WORKERS must be at least 1",
+        "RUN_LOCK_TIMEOUT must not be negative",
+    ]
+    assert isinstance(error.value, ValueError)
+
+
+def test_config_is_immutable():
+    cfg = Config()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        cfg.tg_token = 'x'
+    assert cfg.missing(['tg_token', 'denom']) == ['TG_TOKEN']
+
+
+def test_process_environment_wins_over_env_file(tmp_path, monkeypatch):
+    env_file = tmp_path / '.env'
+    env_file.write_text('TG_TOKEN=from-file\nVALOPER=republicvaloper1file\n')
+    monkeypatch.setattr(config, '_PROCESS_ENV', {'VALOPER': 'republicvaloper1env'})
+    cfg = config.load(env_file)
+    assert (cfg.tg_token, cfg.valoper) == ('from-file', 'republicvaloper1env')
+    assert config.load(tmp_path / 'missing.env').tg_token == ''
+
+
+def test_changed_and_diff():
+    old = Config()
+    new = dataclasses.replace(old, tg_token='x', webhook_workers=8)
+    assert config.changed(old, new, 'denom', 'tg_token')
+    assert not config.changed(old, new, 'denom')
+    assert config.diff(old, new) == ['TG_TOKEN', 'WEBHOOK_WORKERS']
+
+
+# -----------------------------------------------------------------------------
+# Reload
+# -----------------------------------------------------------------------------
+
+@pytest.fixture
+def sighup():
+    previous = signal.getsignal(signal.SIGHUP)
+    config._reload_requested.clear()
+    config.install_reload()
+    yield
+    signal.signal(signal.SIGHUP, previous)
+    config._reload_requested.clear()
+
+
+def test_sighup_is_applied_at_the_next_safe_point(sighup):
+    reloads = []
+    assert not config.apply_reload(lambda: reloads.append(1))
+    os.kill(os.getpid(), signal.SIGHUP)
+    assert config.reload_requested()
+    assert reloads == []  # the handler only notes the request
+    assert config.apply_reload(lambda: reloads.append(1))
+    assert not config.apply_reload(lambda: reloads.append(1))
+    assert reloads == [1]
+
+
+def test_signals_before_the_reload_are_applied_once(sighup):
+    reloads = []
+    for _ in range(3):
+        os.kill(os.getpid(), signal.SIGHUP)
+    config.apply_reload(lambda: reloads.append(1))
+    assert reloads == [1]
+    assert not config.reload_requested()
@@ -0,0 +1,70 @@
+"""Packing lines and messages into Telegram messages (digest.py)"""
+
+import pytest
+
+from digest import pack_blocks, pack_sections
+
+
+# -----------------------------------------------------------------------------
+# Blocks
+# -----------------------------------------------------------------------------
+
+def test_blocks_are_joined_until_the_limit():
+    assert pack_blocks(['aaaa', 'bbbb', 'cccc'], limit=10) == ['aaaa\n\nbbbb', 'cccc']
+    assert pack_blocks(['aaaa', 'bbbb'], limit=10, separator='|') == ['aaaa|bbbb']
+    assert pack_blocks([]) == []
+
+
+def test_oversized_block_is_cut():
+    assert pack_blocks(['x' * 12, 'y'], limit=10) == ['x' * 9 + '…', 'y']
+
+
+# -----------------------------------------------------------------------------
+# Sections
+# -----------------------------------------------------------------------------
+
+SECTIONS = [
+    ('🔴 ALERT', [f"alert-{i}" for i in range(3)]),
+    ('🟡 WARNING', []),
+    ('🟢 HEALTHY', [f"healthy-{i:02d}" for i in range(20)]),
+]
+
+
+def lines_of(messages):
+    return [line for message in messages for line in message.split('\n')]
+
+
+def test_sections_fit_in_one_message():
+    messages = pack_sections(SECTIONS, title='Fleet')
+    assert messages == ['\n'.join(['Fleet', '', '🔴 ALERT', 'alert-0', 'alert-1', 'alert-2', '',
+                                   '🟢 HEALTHY'] + [f"healthy-{i:02d}" for i in range(20)])]
+
+
+@pytest.mark.parametrize('limit', [40, 60, 100, 200])
+def test_split_sections_repeat_their_heading(limit):
+    messages = pack_sections(SECTIONS, title='Fleet', limit=limit)
+    assert len(messages) > 1
+    assert all(len(message) <= limit for message in messages)
+    assert messages[0].startswith('Fleet\n')
+    for message in messages[1:]:
+        assert message.split('\n')[0] in ('🔴 ALERT', '🟢 HEALTHY')
+    # Every line exactly once, in order, and no empty section heading
+    entries = [line for line in lines_of(messages) if line.startswith(('alert', 'healthy'))]
+    assert entries == [line for _, lines in SECTIONS for line in lines]
+    assert '🟡 WARNING' not in lines_of(messages)
+
+
+@pytest.mark.parametrize('max_messages', [1, 2, 3])
+def test_overflow_line_keeps_the_cap(max_messages):
+    messages = pack_sections(SECTIONS, limit=60, max_messages=max_messages,
+                             overflow=lambda count: f"+{count} more")
+    assert len(messages) <= max_messages
+    assert all(len(message) <= 60 for message in messages)
+    kept = [line for line in lines_of(messages) if line.startswith(('alert', 'healthy'))]
+    dropped = int(messages[-1].split('\n')[-1].split()[0][1:])
+    assert kept == [line for _, lines in SECTIONS for line in lines][:len(kept)]
+    assert len(kept) + dropped == 23
+
+
+def test_no_overflow_within_the_cap():
+    assert pack_sections(SECTIONS, max_messages=1) == pack_sections(SECTIONS)
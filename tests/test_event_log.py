@@ -0,0 +1,104 @@
+"""Structured event log: levels, rate limiting and the background writer (event_log.py)"""
+
+import json
+import multiprocessing
+
+import pytest
+
+import event_log
+from event_log import CORRELATION_ENV, RATE_WINDOW, EventLog, format_event
+
+
+def events(log):
+    log.flush()
+    if not log.path.exists():
+        return []
+    return [json.loads(line) for line in log.path.read_text().splitlines()]
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    monkeypatch.delenv(CORRELATION_ENV, raising=False)
+    return EventLog(tmp_path / 'events.jsonl', 'monitor', level='info', echo_level='error', rate_limit=3)
+
+
+def test_levels_fields_and_correlation(log):
+    log.debug("Hidden")
+    log.info("Check finished", validators=2, level='overridden')
+    with log.bound(corr='update-1', update=7):
+        log.warning("Skipping stale update", age=400)
+    written = events(log)
+    assert [event['msg'] for event in written] == ["Check finished", "Skipping stale update"]
+    first, second = written
+    assert (first['level'], first['src'], first['validators']) == ('info', 'monitor', 2)
+    assert first['corr'] == log.correlation and len(log.correlation) == 12
+    assert (second['corr'], second['update'], second['age']) == ('update-1', 7, 400)
+
+
+def test_correlation_is_inherited(tmp_path, monkeypatch):
+    monkeypatch.setenv(CORRELATION_ENV, 'abc123')
+    log = EventLog(tmp_path / 'events.jsonl', 'monitor')
+    assert log.correlation == 'abc123'
+    with log.bound(corr='update-9'):
+        assert log.child_env()[CORRELATION_ENV] == 'update-9'
+
+
+def test_rate_limit_samples_repeated_messages(log):
+    for i in range(250):
+        log.error("RPC call failed", attempt=i)
+    log.error("Another message")
+    written = events(log)
+    failed = [event for event in written if event['msg'] == "RPC call failed"]
+    # 3 per window, then one in SAMPLE_EVERY carrying the count dropped before it
+    assert [event['attempt'] for event in failed] == [0, 1, 2, 102, 202]
+    assert [event.get('dropped') for event in failed] == [None, None, None, 99, 99]
+    assert written[-1]['msg'] == "Another message"
+
+
+def test_rate_limit_window_starts_over(log):
+    for _ in range(5):
+        log.info("Update handled")
+    start, written, dropped = log._rates["Update handled"]
+    log._rates["Update handled"] = (start - RATE_WINDOW, written, dropped)
+    log.info("Update handled")
+    handled = events(log)
+    assert len(handled) == 4
+    assert handled[-1]['dropped'] == 2
+
+
+def test_serious_events_are_echoed(log, capsys):
+    log.warning("Quiet")
+    log.error("RPC call failed", endpoint='/status')
+    log.flush()
+    assert capsys.readouterr().err == "[ERROR] RPC call failed: endpoint=/status\n"
+
+
+def test_rotation(log, monkeypatch):
+    monkeypatch.setattr(event_log, 'MAX_BYTES', 500)
+    for i in range(20):
+        log.info(f"Event {i}")
+        log.flush()
+    rotated = log.path.with_name('events.jsonl.1')
+    assert rotated.exists()
+    lines = rotated.read_text().splitlines() + log.path.read_text().splitlines()
+    assert [json.loads(line)['msg'] for line in lines][-3:] == ["Event 17", "Event 18", "Event 19"]
+
+
+def _log_in_child(log):
+    log.info("From the child")
+    log.flush()
+
+
+def test_forked_child_gets_its_own_writer(log):
+    log.info("From the parent")
+    log.flush()
+    child = multiprocessing.get_context('fork').Process(target=_log_in_child, args=(log,))
+    child.start()
+    child.join()
+    assert [event['msg'] for event in events(log)] == ["From the parent", "From the child"]
+
+
+def test_format_event():
+    line = format_event({'ts': 0, 'level': 'error', 'src': 'bot', 'corr': 'abc', 'msg': 'Failed',
+                         'error': 'timeout', 'dropped': 4})
+    assert line.endswith(" ERROR    bot     abc Failed: error=timeout (+4 similar)")
@@ -0,0 +1,62 @@
+"""Disk growth and CPU trends (host_probe.update_trends)"""
+
+import pytest
+
+from host_probe import GROWTH_MIN_SECONDS, HostSample, update_trends
+
+GB = 1024 ** 3
+HOUR = 3600
+
+
+def sample(used_gb, cpu_seconds=0.0, pid=42, total_gb=100):
+    return HostSample(total_gb * GB, (total_gb - used_gb) * GB, 0.5, 4 * GB, pid, GB, cpu_seconds, 100)
+
+
+def test_first_sample_seeds_only():
+    trend = {}
+    assert update_trends(trend, sample(50), 0) == (0.0, 0.0, 0.0)
+    assert trend['disk_used'] == 50 * GB
+
+
+def test_runs_minutes_apart_do_not_set_a_rate():
+    trend = {}
+    update_trends(trend, sample(50), 0)
+    # A burst of 2 GB between two /status runs a minute apart
+    growth, hours_to_full, _ = update_trends(trend, sample(52), 60)
+    assert (growth, hours_to_full) == (0.0, 0.0)
+    assert 'disk_rate_hour' not in trend
+    # The baseline stays at the first sample until an hour has passed
+    growth, hours_to_full, _ = update_trends(trend, sample(52), HOUR)
+    assert growth == pytest.approx(2 * GB)
+    assert hours_to_full == pytest.approx(48 / 2)
+
+
+def test_rate_is_smoothed_over_hourly_samples():
+    trend = {}
+    update_trends(trend, sample(50), 0)
+    update_trends(trend, sample(51), HOUR)
+    update_trends(trend, sample(51.5), HOUR + 600)  # extra run, ignored for growth
+    growth, _, _ = update_trends(trend, sample(53), 2 * HOUR)
+    assert growth == pytest.approx(0.3 * 2 * GB + 0.7 * GB)
+
+
+def test_shrinking_disk_is_not_filling():
+    trend = {}
+    update_trends(trend, sample(50), 0)
+    growth, hours_to_full, _ = update_trends(trend, sample(40), GROWTH_MIN_SECONDS)
+    assert growth < 0
+    assert hours_to_full == 0.0
+
+
+def test_cpu_percent_between_any_two_samples():
+    trend = {}
+    update_trends(trend, sample(50, cpu_seconds=100), 0)
+    assert update_trends(trend, sample(50, cpu_seconds=130), 60)[2] == pytest.approx(50.0)
+    # Node restarted: no CPU figure for this sample
+    assert update_trends(trend, sample(50, cpu_seconds=1, pid=43), 120)[2] == 0.0
+
+
+def test_state_without_disk_ts_keeps_its_baseline():
+    trend = {'ts': 0, 'disk_used': 50 * GB, 'node_pid': 42, 'node_cpu_seconds': 0.0}
+    growth, _, _ = update_trends(trend, sample(51), HOUR)
+    assert growth == pytest.approx(GB)
@@ -0,0 +1,65 @@
+"""Recent samples ring buffer (ring_buffer.py)"""
+
+import pytest
+
+from ring_buffer import RingBuffer
+
+FIELDS = [('timestamp', 'time'), ('height', 'int'), ('rewards', 'amount'), ('flags', 'flags')]
+
+
+def fill(ring, start, stop):
+    for i in range(start, stop):
+        ring.append({'timestamp': 1000.0 + i * 10, 'height': i, 'rewards': i * 10 ** 20,
+                     'flags': (i % 2 == 0, True)})
+
+
+@pytest.fixture
+def ring(tmp_path):
+    with RingBuffer(tmp_path / 'recent.ring', FIELDS, 16) as ring:
+        yield ring
+
+
+def test_empty(ring):
+    assert len(ring) == 0
+    assert ring.records() == []
+    assert ring.records(since=0) == []
+    assert ring.first() is None and ring.last() is None
+
+
+def test_round_trip(ring):
+    fill(ring, 0, 3)
+    record = ring.records()[1]
+    assert record == {'timestamp': 1010.0, 'height': 1, 'rewards': 10 ** 20, 'flags': 0b10}
+    assert ring.first()['height'] == 0
+    assert ring.last()['height'] == 2
+
+
+def test_wraps_and_keeps_the_newest(ring):
+    fill(ring, 0, 40)
+    assert len(ring) == 16
+    assert [record['height'] for record in ring.records()] == list(range(24, 40))
+    assert ring.first()['height'] == 24
+
+
+@pytest.mark.parametrize('appended', [5, 16, 21, 40])
+def test_since_matches_a_full_scan(ring, appended):
+    fill(ring, 0, appended)
+    everything = ring.records()
+    for since in [0, 1000.0, 1005.0, 1000.0 + (appended - 1) * 10, 1000.0 + appended * 10, 1e12]:
+        assert ring.records(since=since) == [record for record in everything if record['timestamp'] >= since]
+
+
+def test_reopen_keeps_records(tmp_path):
+    with RingBuffer(tmp_path / 'recent.ring', FIELDS, 16) as ring:
+        fill(ring, 0, 20)
+    with RingBuffer(tmp_path / 'recent.ring', FIELDS, 16) as ring:
+        assert [record['height'] for record in ring.records(since=1100.0)] == list(range(10, 20))
+
+
+def test_layout_change_starts_over(tmp_path):
+    with RingBuffer(tmp_path / 'recent.ring', FIELDS, 16) as ring:
+        fill(ring, 0, 5)
+    with RingBuffer(tmp_path / 'recent.ring', FIELDS + [('peers', 'int')], 16) as ring:
+        assert len(ring) == 0
+    with RingBuffer(tmp_path / 'recent.ring', FIELDS, 8) as ring:
+        assert len(ring) == 0
@@ -0,0 +1,123 @@
+"""Cross-process lock and single-flight runs (run_lock.py)"""
+
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from run_lock import FileLock, LockTimeout, SingleFlight
+
+context = multiprocessing.get_context('fork')
+
+
+def _hold(path, seconds, ready, crash=False):
+    lock = FileLock(path)
+    lock.acquire()
+    ready.set()
+    time.sleep(seconds)
+    if crash:
+        os._exit(1)  # never released: the kernel drops the lock
+    lock.release()
+
+
+@pytest.fixture
+def held(tmp_path):
+    """Lock file held by another process for 1.5 s"""
+    path = tmp_path / 'monitor.lock'
+    ready = context.Event()
+    holder = context.Process(target=_hold, args=(path, 1.5, ready))
+    holder.start()
+    assert ready.wait(5)
+    yield path
+    holder.join()
+
+
+# -----------------------------------------------------------------------------
+# FileLock
+# -----------------------------------------------------------------------------
+
+def test_lock_held_elsewhere(held):
+    lock = FileLock(held)
+    assert not lock.acquire(blocking=False)
+    assert not lock.acquire(timeout=0.3)
+    with pytest.raises(LockTimeout):
+        with FileLock(held, timeout=0.3):
+            pass
+    # Blocks until the holder lets go
+    assert lock.acquire()
+    lock.release()
+
+
+def test_lock_of_a_crashed_holder_is_free(tmp_path):
+    path = tmp_path / 'monitor.lock'
+    ready = context.Event()
+    holder = context.Process(target=_hold, args=(path, 0.2, ready, True))
+    holder.start()
+    assert ready.wait(5)
+    holder.join()
+    assert holder.exitcode == 1
+    with FileLock(path, timeout=1):
+        pass
+
+
+def test_lock_is_not_reentrant(tmp_path):
+    lock = FileLock(tmp_path / 'monitor.lock')
+    with lock:
+        with pytest.raises(RuntimeError):
+            lock.acquire()
+    assert lock.acquire(blocking=False)
+    lock.release()
+    lock.release()  # releasing twice is harmless
+
+
+# -----------------------------------------------------------------------------
+# SingleFlight
+# -----------------------------------------------------------------------------
+
+def _flight(directory, value, seconds, started, results):
+    def compute():
+        started.set()
+        time.sleep(seconds)
+        return value
+
+    flight = SingleFlight(directory / 'monitor.lock', directory / 'last_run.json')
+    results.put(flight.run(compute, timeout=10))
+
+
+def test_waiting_run_reuses_the_result(tmp_path):
+    started, results = context.Event(), context.Queue()
+    first = context.Process(target=_flight, args=(tmp_path, {'run': 1}, 1, started, results))
+    first.start()
+    assert started.wait(5)
+
+    flight = SingleFlight(tmp_path / 'monitor.lock', tmp_path / 'last_run.json')
+    calls = []
+    assert flight.run(lambda: calls.append(1) or {'run': 2}, timeout=10) == ({'run': 1}, True)
+    assert calls == []
+    first.join()
+    assert results.get(timeout=5) == ({'run': 1}, False)
+
+
+def test_result_from_before_arrival_is_not_reused(tmp_path):
+    flight = SingleFlight(tmp_path / 'monitor.lock', tmp_path / 'last_run.json')
+    assert flight.run(lambda: {'run': 1}) == ({'run': 1}, False)
+    assert flight.run(lambda: {'run': 2}) == ({'run': 2}, False)
+
+
+def test_waiter_computes_when_the_run_left_no_result(tmp_path, held):
+    flight = SingleFlight(held, tmp_path / 'last_run.json')
+    assert flight.run(lambda: {'run': 2}, timeout=10) == ({'run': 2}, False)
+
+
+def test_wait_times_out(tmp_path, held):
+    flight = SingleFlight(held, tmp_path / 'last_run.json')
+    with pytest.raises(LockTimeout):
+        flight.run(lambda: {'run': 2}, timeout=0.3)
+
+
+def test_lock_released_when_compute_fails(tmp_path):
+    flight = SingleFlight(tmp_path / 'monitor.lock', tmp_path / 'last_run.json')
+    with pytest.raises(ZeroDivisionError):
+        flight.run(lambda: 1 / 0)
+    assert flight.run(lambda: {'run': 2}) == ({'run': 2}, False)
@@ -0,0 +1,198 @@
+"""Signing bitmaps, miss streaks and uptime reports (signing_store.py)"""
+
+import json
+import random
+
+import pytest
+
+from signing_store import FORMAT_VERSION, SigningStore, day_summary, run_lengths, uptime_report
+
+ADDRESS = 'ab' * 20
+
+
+def brute_runs(bits):
+    """(longest, leading, trailing) runs of True in a list"""
+    longest = run = 0
+    for bit in bits:
+        run = run + 1 if bit else 0
+        longest = max(longest, run)
+    leading = next((i for i, bit in enumerate(bits) if not bit), len(bits))
+    trailing = next((i for i, bit in enumerate(reversed(bits)) if not bit), len(bits))
+    return longest, leading, trailing
+
+
+def as_int(bits):
+    return sum(1 << i for i, bit in enumerate(bits) if bit)
+
+
+def fill(store, heights, day, missed=(), inactive=()):
+    for height in heights:
+        store.record(height, height not in inactive, height not in missed and height not in inactive, day)
+
+
+# -----------------------------------------------------------------------------
+# run_lengths
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize('bits', [
+    [],
+    [False] * 20,
+    [True] * 20,
+    [True, True, False, True],
+    [False, True, True, True, False],
+    [True] * 9 + [False] * 16 + [True] * 3,
+    [False] * 7 + [True] * 18 + [False],
+])
+def test_run_lengths_cases(bits):
+    assert run_lengths(as_int(bits), len(bits)) == (brute_runs(bits) if any(bits) else (0, 0, 0))
+
+
+def test_run_lengths_random_against_brute_force():
+    rng = random.Random(7)
+    for _ in range(300):
+        length = rng.randint(1, 400)
+        density = rng.choice([0.01, 0.2, 0.5, 0.9, 0.99])
+        bits = [rng.random() < density for _ in range(length)]
+        expected = brute_runs(bits) if any(bits) else (0, 0, 0)
+        assert run_lengths(as_int(bits), length) == expected
+
+
+# -----------------------------------------------------------------------------
+# SigningStore
+# -----------------------------------------------------------------------------
+
+def test_record_and_count(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, range(100, 200), '2026-01-01', missed={110, 111}, inactive={150})
+    assert store.counts(100, 199) == (100, 99, 97)
+    assert store.counts(110, 111) == (2, 2, 0)
+    assert store.counts(300, 400) == (0, 0, 0)
+    assert store.height_range() == (100, 199)
+
+
+def test_missing_lists_unfetched_heights(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, [10, 11, 13, 20], '2026-01-01')
+    assert list(store.missing(8, 21)) == [8, 9, 12, 14, 15, 16, 17, 18, 19, 21]
+    assert list(store.missing(10, 11)) == []
+
+
+def test_lower_height_moves_base(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, [1000, 1001], '2026-01-02', missed={1001})
+    fill(store, [37], '2026-01-01', missed={37})
+    assert store.base <= 37
+    assert store.counts(37, 37) == (1, 1, 0)
+    assert store.counts(1000, 1001) == (2, 2, 1)
+    assert store.days == {'2026-01-01': [37, 37], '2026-01-02': [1000, 1001]}
+
+
+def test_rerecord_overwrites_outcome(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    store.record(5, True, False, '2026-01-01')
+    store.record(5, True, True, '2026-01-01')
+    assert store.counts(5, 5) == (1, 1, 1)
+
+
+def test_flush_and_reload(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, range(1, 50), '2026-01-01', missed={7, 8})
+    store.flush()
+    loaded = SigningStore(tmp_path, ADDRESS.upper())
+    assert loaded.base == store.base
+    assert loaded.days == store.days
+    assert loaded.counts(1, 49) == (49, 49, 47)
+
+
+def test_old_format_is_discarded(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, range(1, 50), '2026-01-01')
+    store.flush()
+    meta_path = tmp_path / f"{ADDRESS.upper()}.json"
+    meta = json.loads(meta_path.read_text())
+    meta['version'] = FORMAT_VERSION - 1
+    meta_path.write_text(json.dumps(meta))
+    loaded = SigningStore(tmp_path, ADDRESS)
+    assert loaded.base is None
+    assert loaded.height_range() is None
+
+
+# -----------------------------------------------------------------------------
+# Uptime
+# -----------------------------------------------------------------------------
+
+def test_day_summary(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, range(100, 120), '2026-01-01', missed={100, 101, 110, 111, 112, 119}, inactive={105})
+    summary = day_summary(store, '2026-01-01', closed=False)
+    assert (summary.first, summary.last) == (100, 119)
+    assert (summary.fetched, summary.active, summary.signed) == (20, 19, 13)
+    assert (summary.longest, summary.leading, summary.trailing) == (3, 2, 1)
+    assert day_summary(store, '2026-01-02', closed=True) is None
+
+
+def test_closed_full_days_are_cached_and_invalidated(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, range(100, 120), '2026-01-01', missed={105})
+    fill(store, range(120, 130), '2026-01-02')
+    day_summary(store, '2026-01-02', closed=False)
+    assert '2026-01-02' not in store.summaries  # still open
+    day_summary(store, '2026-01-01', closed=True)
+    assert '2026-01-01' in store.summaries
+    store.record(105, True, True, '2026-01-01')
+    assert '2026-01-01' not in store.summaries
+    assert day_summary(store, '2026-01-01', closed=True).signed == 20
+
+
+def test_incomplete_day_is_not_cached(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, [100, 101, 105], '2026-01-01')
+    day_summary(store, '2026-01-01', closed=True)
+    assert store.summaries == {}
+
+
+def test_uptime_report_joins_streaks_across_days(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, range(100, 110), '2026-01-01', missed={107, 108, 109})
+    fill(store, range(110, 120), '2026-01-02', missed=set(range(110, 120)))
+    fill(store, range(120, 130), '2026-01-03', missed={120, 121, 125})
+    report = uptime_report(store, ['2026-01-01', '2026-01-02', '2026-01-03'], today='2026-01-04')
+    assert (report.fetched, report.active, report.signed) == (30, 30, 14)
+    assert report.missed == 16
+    assert report.ratio == pytest.approx(14 / 30)
+    assert report.longest == 3 + 10 + 2
+    assert [day.day for day in report.days] == ['2026-01-01', '2026-01-02', '2026-01-03']
+    # The cache gives the same answer
+    assert set(store.summaries) == {'2026-01-01', '2026-01-02', '2026-01-03'}
+    assert uptime_report(store, ['2026-01-01', '2026-01-02', '2026-01-03'], today='2026-01-04') == report
+
+
+def test_uptime_report_breaks_streaks_on_gaps(tmp_path):
+    store = SigningStore(tmp_path, ADDRESS)
+    fill(store, range(100, 110), '2026-01-01', missed={108, 109})
+    fill(store, range(115, 120), '2026-01-02', missed={115, 116})  # heights 110..114 never fetched
+    fill(store, range(120, 125), '2026-01-04', missed={120})
+    report = uptime_report(store, ['2026-01-01', '2026-01-02', '2026-01-03', '2026-01-04'], today='2026-01-04')
+    assert report.longest == 2
+    assert len(report.days) == 3
+
+
+def test_uptime_report_matches_brute_force(tmp_path):
+    rng = random.Random(3)
+    store = SigningStore(tmp_path, ADDRESS)
+    outcomes = []
+    height = 1000
+    days = [f"2026-02-{day:02d}" for day in range(1, 8)]
+    for day in days:
+        for _ in range(rng.randint(50, 300)):
+            active = rng.random() > 0.05
+            signed = active and rng.random() > 0.15
+            store.record(height, active, signed, day)
+            outcomes.append((active, signed))
+            height += 1
+    report = uptime_report(store, days, today='2026-02-07')
+    # A block outside the active set is not a miss, so it ends a streak
+    missed = [active and not signed for active, signed in outcomes]
+    assert report.active == sum(active for active, _ in outcomes)
+    assert report.signed == sum(signed for _, signed in outcomes)
+    assert report.longest == brute_runs(missed)[0]
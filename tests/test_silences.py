@@ -0,0 +1,115 @@
+"""Silences and acknowledgements shared by the bot and the monitor (silences.py)"""
+
+import multiprocessing
+
+import pytest
+
+import silences
+from silences import ANY
+
+HOUR = 3600
+
+
+def test_parse_duration():
+    assert silences.parse_duration('30m') == 30 * 60
+    assert silences.parse_duration(' 1.5H ') == 1.5 * HOUR
+    assert silences.parse_duration('1w') == 7 * 24 * HOUR
+    for text in ['', '5', 'h', '0h', '-1h', 'xh', '31d', '2y']:
+        assert silences.parse_duration(text) is None
+
+
+def test_matching_and_expiry(tmp_path):
+    path = tmp_path / 'silences.json'
+    silences.add_silence(path, HOUR, 'jailed', now=0)
+    silences.add_silence(path, 2 * HOUR, validator='republicvaloper1x', now=0)
+    entries = silences.active(silences.load(path), now=HOUR - 1)
+    assert silences.is_silenced(entries, 'republicvaloper1other', 'jailed')
+    assert silences.is_silenced(entries, 'republicvaloper1x', 'stuck_height')
+    assert not silences.is_silenced(entries, 'republicvaloper1other', 'stuck_height')
+    assert not silences.is_global(entries)
+
+    entries = silences.active(silences.load(path), now=HOUR)
+    assert not silences.is_silenced(entries, 'republicvaloper1other', 'jailed')
+    assert silences.is_global([{'validator': ANY, 'condition': ANY, 'until': HOUR}])
+
+
+def test_add_prunes_expired_and_numbers_from_the_active(tmp_path):
+    path = tmp_path / 'silences.json'
+    silences.add_silence(path, HOUR, now=0)
+    second = silences.add_silence(path, 3 * HOUR, now=0)
+    third = silences.add_silence(path, HOUR, now=2 * HOUR)
+    assert [entry['id'] for entry in silences.load(path)['silences']] == [2, 3]
+    assert (second['id'], third['id']) == (2, 3)
+
+
+def test_clear(tmp_path):
+    path = tmp_path / 'silences.json'
+    for _ in range(3):
+        silences.add_silence(path, HOUR)
+    assert silences.clear_silences(path, 2) == 1
+    assert silences.clear_silences(path, 2) == 0
+    assert silences.clear_silences(path) == 2
+    assert silences.load(path)['silences'] == []
+
+
+def test_unreadable_file_is_empty(tmp_path):
+    path = tmp_path / 'silences.json'
+    path.write_text('{not json')
+    assert silences.load(path) == {'silences': [], 'acks': []}
+
+
+def test_acks_are_taken_once(tmp_path):
+    path = tmp_path / 'silences.json'
+    silences.add_ack(path, 'jailed', by='alice', now=10)
+    silences.add_silence(path, HOUR)
+    assert silences.take_acks(path) == [{'validator': ANY, 'condition': 'jailed', 'ts': 10, 'by': 'alice'}]
+    assert silences.take_acks(path) == []
+    assert len(silences.load(path)['silences']) == 1
+
+
+# -----------------------------------------------------------------------------
+# Concurrent writers
+# -----------------------------------------------------------------------------
+
+def _add_silences(path, count):
+    for _ in range(count):
+        silences.add_silence(path, HOUR)
+
+
+def _add_acks(path, count):
+    for i in range(count):
+        silences.add_ack(path, by=str(i))
+
+
+def _take_acks(path, count, taken):
+    taken.put(sum(len(silences.take_acks(path)) for _ in range(count)))
+
+
+@pytest.fixture
+def context():
+    return multiprocessing.get_context('fork')
+
+
+def test_concurrent_silences_are_not_lost(tmp_path, context):
+    path = tmp_path / 'silences.json'
+    workers = [context.Process(target=_add_silences, args=(path, 20)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0] * 4
+    ids = [entry['id'] for entry in silences.load(path)['silences']]
+    assert sorted(ids) == list(range(1, 81))
+
+
+def test_acks_taken_while_added_are_not_lost(tmp_path, context):
+    path = tmp_path / 'silences.json'
+    taken = context.Queue()
+    workers = [context.Process(target=_add_acks, args=(path, 25)) for _ in range(3)]
+    workers.append(context.Process(target=_take_acks, args=(path, 30, taken)))
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0] * 4
+    assert taken.get(timeout=10) + len(silences.take_acks(path)) == 75
@@ -0,0 +1,103 @@
+"""Message templates, tables, locales and timezones (templates.py)"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from templates import Locale, Rendered, Template, parse_timezone, render_table
+
+
+# -----------------------------------------------------------------------------
+# Templates
+# -----------------------------------------------------------------------------
+
+def test_literals_and_values_are_escaped_per_format():
+    template = Template("Moniker: {moniker} (v1.2)\nBalance: <{amount}> RAI")
+    rendered = template.render({'moniker': 'a_b*c', 'amount': '1.50'})
+    assert rendered.text == "Moniker: a_b*c (v1.2)\nBalance: <1.50> RAI"
+    assert rendered.markdown == "Moniker: a\\_b\\*c \\(v1\\.2\\)\nBalance: <1\\.50\\> RAI"
+    assert rendered.html == "Moniker: a_b*c (v1.2)\nBalance: &lt;1.50&gt; RAI"
+
+
+def test_headings_are_bold_in_markup_only():
+    rendered = Template("# Status {level}\nbody").render({'level': 'ALERT'})
+    assert rendered.text == "Status ALERT\nbody"
+    assert rendered.markdown == "*Status ALERT*\nbody"
+    assert rendered.html == "<b>Status ALERT</b>\nbody"
+
+
+def test_format_spec_and_fields():
+    template = Template("{pct:.1f}% of {count:>4} ({pct:.0f})")
+    assert template.fields == ('pct', 'count')
+    assert template.render({'pct': 99.25, 'count': 7}).text == "99.2% of    7 (99)"
+
+
+def test_conversions_are_refused():
+    with pytest.raises(ValueError):
+        Template("{name!r}")
+
+
+def test_missing_field_raises():
+    with pytest.raises(KeyError):
+        Template("{name}").render({})
+
+
+def test_variant_for_parse_mode():
+    rendered = Rendered('t', 'm', 'h')
+    assert [rendered.for_parse_mode(mode) for mode in ('', 'MarkdownV2', 'HTML', 'Markdown')] == \
+        ['t', 'm', 'h', 't']
+
+
+# -----------------------------------------------------------------------------
+# Tables
+# -----------------------------------------------------------------------------
+
+def test_table_aligns_numeric_columns_right():
+    rendered = render_table(('Name', 'Missed'), [('alpha', '1,024'), ('b', '7')])
+    assert rendered.text.split('\n') == [
+        'Name  Missed',
+        '----- ------',
+        'alpha  1,024',
+        'b          7',
+    ]
+
+
+def test_table_code_block_and_title_escaping():
+    rendered = render_table(('Name',), [('a`b<c',)], title='Fleet (2)')
+    assert rendered.text == "Fleet (2)\nName\n-----\na`b<c"
+    assert rendered.markdown == "*Fleet \\(2\\)*\n```\nName\n-----\na\\`b<c\n```"
+    assert rendered.html == "<b>Fleet (2)</b>\n<pre>Name\n-----\na`b&lt;c</pre>"
+
+
+def test_empty_table_has_no_numeric_columns():
+    assert render_table(('Day', 'Blocks'), []).text == "Day Blocks\n--- ------"
+
+
+# -----------------------------------------------------------------------------
+# Locale & timezone
+# -----------------------------------------------------------------------------
+
+@pytest.mark.parametrize('name, offset', [
+    ('', timedelta(0)),
+    ('UTC', timedelta(0)),
+    ('UTC+7', timedelta(hours=7)),
+    ('+05:30', timedelta(hours=5, minutes=30)),
+    ('UTC-3', timedelta(hours=-3)),
+    ('Asia/Jakarta', timedelta(hours=7)),
+])
+def test_parse_timezone(name, offset):
+    assert datetime(2026, 1, 1, tzinfo=timezone.utc).astimezone(parse_timezone(name)).utcoffset() == offset
+
+
+def test_locale_numbers():
+    assert Locale('en').number(1234567) == '1,234,567'
+    assert Locale('de').number(1234567) == '1.234.567'
+    assert Locale('id').decimal_text('12.50') == '12,50'
+    assert Locale('xx').number(1000) == '1,000'  # unknown locale: English
+
+
+def test_locale_timestamp():
+    now = datetime(2026, 1, 1, 17, 30, tzinfo=timezone.utc)
+    assert Locale('en', 'UTC+7', 'WIB').timestamp(now) == '2026-01-02 00:30 WIB'
+    assert Locale('de', 'Europe/Berlin').timestamp(now) == '01.01.2026 18:30 CET'
+    assert Locale('id', 'UTC').timestamp(now) == '01-01-2026 17:30 UTC'
@@ -0,0 +1,57 @@
+"""Spool-directory job queue (work_queue.py)"""
+
+import pytest
+
+from work_queue import STAGES, SpoolQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return SpoolQueue(tmp_path / 'queue')
+
+
+def files(queue):
+    return sorted(path.name for stage in STAGES for path in (queue.directory / stage).iterdir())
+
+
+def test_job_round_trip(queue):
+    job_id = queue.put({'shard': 1})
+    assert queue.take(job_id) == (False, None)
+    assert queue.claim() == (job_id, {'shard': 1})
+    assert queue.claim() is None
+    assert queue.complete(job_id, [1, 2])
+    assert queue.take(job_id) == (True, [1, 2])
+    assert files(queue) == []
+
+
+def test_claim_only_among_given_ids(queue):
+    first, second = queue.put(1), queue.put(2)
+    assert queue.claim([second]) == (second, 2)
+    assert queue.claim(['missing', first]) == (first, 1)
+
+
+@pytest.mark.parametrize('claimed', [False, True])
+def test_cancel_before_the_result(queue, claimed):
+    job_id = queue.put(1)
+    if claimed:
+        queue.claim()
+    queue.cancel(job_id)
+    assert queue.claim() is None
+    assert not queue.complete(job_id, 2)
+    assert files(queue) == []
+
+
+def test_result_handed_in_while_cancelled_is_deleted(queue, monkeypatch):
+    job_id = queue.put(1)
+    queue.claim()
+    write = queue._write
+
+    def cancel_first(stage, written_id, data):
+        # The coordinator gives up between the worker's two steps
+        queue.cancel(written_id)
+        write(stage, written_id, data)
+
+    monkeypatch.setattr(queue, '_write', cancel_first)
+    assert not queue.complete(job_id, 2)
+    assert queue.take(job_id) == (False, None)
+    assert files(queue) == []
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Traffic Capture and Replay
+Records the external calls of monitor.py and bot.py (node RPC, LCD,
+republicd queries, Telegram Bot API) with their timing, and serves the
+recordings back later, so incidents and performance problems can be
+reproduced and profiled offline.
+
+- Archive: gzip-compressed JSON lines, one entry per call:
+      {"src": "monitor", "kind": "rpc", "key": "/status",
+       "ts": start time, "dur": seconds, "res": result | "err": error}
+  Every process appends its own gzip members, so the bot and the
+  monitor.py runs it starts can record into the same file.
+- Replay serves the entries of one source in recorded order per
+  (kind, key), so concurrent callers get the same answers however their
+  threads interleave. Each call takes its recorded duration divided by the
+  speed (0: no delay). A call made more often than recorded gets the last
+  answer again; a call never recorded fails with ReplayError.
+- The inputs a run reads from disk (state, silences, query cache) and the
+  host probe are recorded the same way (kind "file" / "host"). A replay
+  runs on the recording's clock (now()) and writes to a scratch directory
+  (replay_dir()), never to the live history/.
+
+Usage:
+    python traffic.py capture.jsonl.gz     # per-call summary of an archive
+"""
+
+import atexit
+import copy
+import gzip
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+REPLAY_DIR_ENV = 'RAI_REPLAY_DIR'
+FLUSH_ENTRIES = 200     # buffered entries before an append
+FLUSH_SECONDS = 10.0    # or age of the oldest buffered entry (checked by a timer)
+
+
+class ReplayError(Exception):
+    """A replayed call failed when recorded, or was never recorded"""
+
+
+class Traffic:
+    """Pass-through: calls go out as usual"""
+
+    @property
+    def done(self) -> bool:
+        """True once a replay has served every recorded call"""
+        return False
+
+    def now(self) -> float:
+        """Current time; during a replay, the time on the recording's clock"""
+        return time.time()
+
+    def call(self, kind: str, key: str, fetch: Callable[[], Any], request: Any = None) -> Any:
+        """Run fetch() (result must be JSON-serializable); request is stored for reference"""
+        return fetch()
+
+    def flush(self) -> None:
+        pass
+
+
+class Recorder(Traffic):
+    """Runs every call and appends it to the archive"""
+
+    def __init__(self, path: Path, source: str):
+        self.path = Path(path)
+        self.source = source
+        self._lock = threading.Lock()
+        self._buffer: List[str] = []
+        self._buffered_since = 0.0
+        atexit.register(self.flush)
+
+    def call(self, kind: str, key: str, fetch: Callable[[], Any], request: Any = None) -> Any:
+        entry: Dict[str, Any] = {'src': self.source, 'kind': kind, 'key': key, 'ts': round(time.time(), 3)}
+        if request is not None:
+            entry['req'] = request
+        started = time.monotonic()
+        try:
+            result = fetch()
+        except Exception as e:
+            entry['dur'] = round(time.monotonic() - started, 4)
+            entry['err'] = f"{type(e).__name__}: {e}"
+            self._add(entry)
+            raise
+        entry['dur'] = round(time.monotonic() - started, 4)
+        entry['res'] = result
+        self._add(entry)
+        return result
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(',', ':'), default=str)
+        with self._lock:
+            if not self._buffer:
+                self._buffered_since = time.monotonic()
+                # Written within FLUSH_SECONDS even if no further call comes
+                timer = threading.Timer(FLUSH_SECONDS, self.flush)
+                timer.daemon = True
+                timer.start()
+            self._buffer.append(line)
+            due = len(self._buffer) >= FLUSH_ENTRIES or time.monotonic() - self._buffered_since >= FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append the buffered entries as one gzip member"""
+        with self._lock:
+            if not self._buffer:
+                return
+            member = gzip.compress(('\n'.join(self._buffer) + '\n').encode())
+            self._buffer = []
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # One O_APPEND write per member: concurrent writers never interleave
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, member)
+            finally:
+                os.close(fd)
+
+
+class Replayer(Traffic):
+    """Serves recorded calls instead of running them"""
+
+    def __init__(self, path: Path, source: str, speed: float = 1.0):
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._queues: Dict[Tuple[str, str], deque] = defaultdict(deque)
+        self._last: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        entries = sorted((entry for entry in read_archive(path) if entry.get('src') == source),
+                         key=lambda entry: entry['ts'])
+        for entry in entries:
+            self._queues[(entry['kind'], entry['key'])].append(entry)
+        self._remaining = len(entries)
+        # The recording's clock: start of the first call, then the end of the
+        # latest call served, so a replay sees the same times every run
+        self._clock = entries[0]['ts'] if entries else time.time()
+
+    @property
+    def done(self) -> bool:
+        return self._remaining == 0
+
+    def now(self) -> float:
+        return self._clock
+
+    def call(self, kind: str, key: str, fetch: Callable[[], Any], request: Any = None) -> Any:
+        with self._lock:
+            queue = self._queues.get((kind, key))
+            if queue:
+                entry = queue.popleft()
+                self._remaining -= 1
+                self._last[(kind, key)] = entry
+                self._clock = max(self._clock, entry['ts'] + entry.get('dur', 0))
+            else:
+                entry = self._last.get((kind, key))
+        if entry is None:
+            raise ReplayError(f"No recording of {kind} {key}")
+        if self.speed > 0:
+            time.sleep(entry.get('dur', 0) / self.speed)
+        if 'err' in entry:
+            raise ReplayError(entry['err'])
+        return copy.deepcopy(entry.get('res'))
+
+
+def open_traffic(source: str, capture_path: str = '', replay_path: str = '', speed: float = 1.0) -> Traffic:
+    """Traffic handler for a process: replay wins over capture, neither = pass-through"""
+    if replay_path:
+        return Replayer(Path(replay_path), source, speed)
+    if capture_path:
+        return Recorder(Path(capture_path), source)
+    return Traffic()
+
+
+def replay_dir() -> Path:
+    """
+    Scratch directory that a replay writes its history to instead of the
+    live one. Created by the first process of a replay and inherited by the
+    monitor.py runs a replayed bot starts.
+    """
+    path = os.environ.get(REPLAY_DIR_ENV)
+    if not path:
+        path = tempfile.mkdtemp(prefix='rai-replay-')
+        os.environ[REPLAY_DIR_ENV] = path
+    return Path(path)
+
+
+def read_archive(path: Path) -> Iterator[Dict[str, Any]]:
+    """All entries of an archive, in file order"""
+    with gzip.open(path, 'rt') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+# =============================================================================
+# SUMMARY
+# =============================================================================
+
+def summarize(path: Path) -> str:
+    """Call count, errors and latency per source, kind and key"""
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(list)
+    for entry in read_archive(path):
+        groups[(entry['src'], entry['kind'], entry['key'])].append(entry)
+    lines = [f"{'source':8} {'kind':9} {'calls':>5} {'errors':>6} {'total ms':>9} {'max ms':>8}  key"]
+    for (source, kind, key), entries in sorted(groups.items(), key=lambda item: -sum(e['dur'] for e in item[1])):
+        durations = [entry['dur'] for entry in entries]
+        errors = sum(1 for entry in entries if 'err' in entry)
+        lines.append(f"{source:8} {kind:9} {len(entries):5} {errors:6} {sum(durations) * 1000:9.1f} "
+                     f"{max(durations) * 1000:8.1f}  {key[:60]}")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print("Usage: python traffic.py <archive.jsonl.gz>", file=sys.stderr)
+        sys.exit(2)
+    print(summarize(Path(sys.argv[1])))
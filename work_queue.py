@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+RAI Sentinel - Work Queue
+Spool-directory job queue between the monitor.py coordinator and its
+workers (`monitor.py --worker`), on one host or several hosts sharing the
+directory (e.g. over NFS):
+
+    jobs/<id>.json       posted, not claimed yet
+    working/<id>.json    claimed by a worker
+    results/<id>.json    finished, waiting for the coordinator
+
+Every step is a single rename, so exactly one worker wins a job and readers
+never see a partial file. A job can be cancelled (the coordinator runs it
+itself) at any stage. A worker that had already handed its job back by
+then finds the cancel mark (results/<id>.cancelled) and deletes its late
+result.
+"""
+
+import json
+import os
+import socket
+import time
+from itertools import count
+from pathlib import Path
+from typing import Any, Iterable, Optional, Tuple
+
+STAGES = ('jobs', 'working', 'results')
+
+_sequence = count()
+
+
+def worker_name() -> str:
+    """Host and PID, unique among the workers of one queue"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SpoolQueue:
+    """Job queue in a directory"""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        for stage in STAGES:
+            (self.directory / stage).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, stage: str, job_id: str) -> Path:
+        return self.directory / stage / f"{job_id}.json"
+
+    def _write(self, stage: str, job_id: str, data: Any) -> None:
+        # Temp names do not end in .json, so nobody lists them
+        temp_file = self.directory / stage / f".{job_id}.{worker_name()}.tmp"
+        with open(temp_file, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_file, self._path(stage, job_id))
+
+    def put(self, payload: Any) -> str:
+        """Post a job, returns its id"""
+        job_id = f"{time.time():.6f}-{worker_name()}-{next(_sequence)}"
+        self._write('jobs', job_id, payload)
+        return job_id
+
+    def claim(self, job_ids: Optional[Iterable[str]] = None) -> Optional[Tuple[str, Any]]:
+        """Take the oldest posted job (only among job_ids if given): (id, payload) or None"""
+        if job_ids is None:
+            candidates = sorted(path.stem for path in (self.directory / 'jobs').glob('*.json'))
+        else:
+            candidates = list(job_ids)
+        for job_id in candidates:
+            try:
+                os.rename(self._path('jobs', job_id), self._path('working', job_id))
+            except FileNotFoundError:
+                continue  # claimed by another worker, or not posted
+            try:
+                with open(self._path('working', job_id), 'r') as f:
+                    return job_id, json.load(f)
+            except (OSError, ValueError):
+                continue  # cancelled meanwhile
+        return None
+
+    def _mark(self, job_id: str) -> Path:
+        return self.directory / 'results' / f"{job_id}.cancelled"
+
+    def complete(self, job_id: str, result: Any) -> bool:
+        """Hand in the result of a claimed job. False if it was cancelled."""
+        try:
+            os.remove(self._path('working', job_id))
+        except FileNotFoundError:
+            return False
+        self._write('results', job_id, result)
+        # Cancelled between the two steps above: cancel() marks the job
+        # before removing the result, so either it removed the result or
+        # the mark is seen here
+        try:
+            os.remove(self._mark(job_id))
+        except FileNotFoundError:
+            return True
+        try:
+            os.remove(self._path('results', job_id))
+        except FileNotFoundError:
+            pass
+        return False
+
+    def take(self, job_id: str) -> Tuple[bool, Any]:
+        """(True, result) once a job is finished (the result is removed), else (False, None)"""
+        path = self._path('results', job_id)
+        try:
+            with open(path, 'r') as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return False, None
+        os.remove(path)
+        return True, result
+
+    def cancel(self, job_id: str) -> None:
+        """Withdraw a job in any stage, including a result still being handed in"""
+        for stage in STAGES[:2]:
+            try:
+                os.remove(self._path(stage, job_id))
+                return  # no worker has it
+            except FileNotFoundError:
+                pass
+        self._mark(job_id).touch()
+        try:
+            os.remove(self._path('results', job_id))
+        except FileNotFoundError:
+            pass
+
+    def purge(self, max_age: float) -> int:
+        """Remove files left behind by crashed coordinators or workers, returns the count"""
+        cutoff = time.time() - max_age
+        removed = 0
+        for stage in STAGES:
+            for path in (self.directory / stage).iterdir():
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed